@@ -2,114 +2,160 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import folium
-from streamlit_folium import folium_static
+import os
 import random
 import warnings
+from alerts import get_alert_engine
+from charts import DEFAULT_WIDTH_PX, line_figure
+from coverage import REUNION_CITIES, CoverageEngine
+from coverage_query import CoverageIndex
+from data_store import DataSnapshot, get_data_store
+from emitter_query import POWER_FILTERS, SORT_KEYS, EmitterQueryEngine
+from fleet_data import (FLEET_DIR, FLEET_ROLLUP_DAYS, SIGNAL_STORE_DIR, read_emitters, rollups_from_store,
+                        save_emitters)
+from interference import InterferenceAnalyzer
+from maintenance_store import get_maintenance_store
+from map_layers import REUNION_CENTER, EmitterMapBuilder, coverage_features, emitter_layer, interference_features
+from poller import get_poller
+from profiling import get_profiler, start_exporters
+from propagation import get_propagation_model
+from rollups import SignalRollups
+from scheduler import PLANNING_HORIZON_DAYS, TECHNICIANS, MaintenanceScheduler
+from signal_store import SignalStore
+from signals import EMITTER_DTYPES, EmitterSignalIndex, generate_signal_history, signal_days, signal_instants
+from telemetry import get_telemetry_ingestor
+from tiles import get_tile_pyramid
 warnings.filterwarnings('ignore')
 
-# Configuration de la page
-st.set_page_config(
-    page_title="Localisation des Émetteurs - Freedom Radio Île de la Réunion",
-    page_icon="📻",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+def configure_page():
+    """Configuration de la page et styles (premier appel Streamlit du script)"""
+    st.set_page_config(
+        page_title="Localisation des Émetteurs - Freedom Radio Île de la Réunion",
+        page_icon="📻",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
 
-# CSS personnalisé
-st.markdown("""
-<style>
-    .main-header {
-        font-size: 2.5rem;
-        background: linear-gradient(45deg, #FF6B00, #FF9500, #FFD700);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        text-align: center;
-        margin-bottom: 2rem;
-        font-weight: bold;
-    }
-    .live-badge {
-        background: linear-gradient(45deg, #FF6B00, #FF9500);
-        color: white;
-        padding: 0.3rem 1rem;
-        border-radius: 20px;
-        font-weight: bold;
-        display: inline-block;
-        animation: pulse 2s infinite;
-    }
-    @keyframes pulse {
-        0% { transform: scale(1); }
-        50% { transform: scale(1.05); }
-        100% { transform: scale(1); }
-    }
-    .emitter-card {
-        background-color: #f0f2f6;
-        padding: 1rem;
-        border-radius: 10px;
-        border-left: 4px solid #FF6B00;
-        margin: 0.5rem 0;
-    }
-    .section-header {
-        color: #FF6B00;
-        border-bottom: 2px solid #FF9500;
-        padding-bottom: 0.5rem;
-        margin-top: 2rem;
-    }
-    .status-active {
-        background-color: #d4edda;
-        border-left: 4px solid #28a745;
-        color: #155724;
-        padding: 0.3rem 0.8rem;
-        border-radius: 5px;
-        font-weight: bold;
-        display: inline-block;
-    }
-    .status-inactive {
-        background-color: #f8d7da;
-        border-left: 4px solid #dc3545;
-        color: #721c24;
-        padding: 0.3rem 0.8rem;
-        border-radius: 5px;
-        font-weight: bold;
-        display: inline-block;
-    }
-    .status-maintenance {
-        background-color: #fff3cd;
-        border-left: 4px solid #ffc107;
-        color: #856404;
-        padding: 0.3rem 0.8rem;
-        border-radius: 5px;
-        font-weight: bold;
-        display: inline-block;
-    }
-</style>
-""", unsafe_allow_html=True)
+    # CSS personnalisé
+    st.markdown("""
+    <style>
+        .main-header {
+            font-size: 2.5rem;
+            background: linear-gradient(45deg, #FF6B00, #FF9500, #FFD700);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+            text-align: center;
+            margin-bottom: 2rem;
+            font-weight: bold;
+        }
+        .live-badge {
+            background: linear-gradient(45deg, #FF6B00, #FF9500);
+            color: white;
+            padding: 0.3rem 1rem;
+            border-radius: 20px;
+            font-weight: bold;
+            display: inline-block;
+            animation: pulse 2s infinite;
+        }
+        @keyframes pulse {
+            0% { transform: scale(1); }
+            50% { transform: scale(1.05); }
+            100% { transform: scale(1); }
+        }
+        .emitter-card {
+            background-color: #f0f2f6;
+            padding: 1rem;
+            border-radius: 10px;
+            border-left: 4px solid #FF6B00;
+            margin: 0.5rem 0;
+        }
+        .section-header {
+            color: #FF6B00;
+            border-bottom: 2px solid #FF9500;
+            padding-bottom: 0.5rem;
+            margin-top: 2rem;
+        }
+        .status-active {
+            background-color: #d4edda;
+            border-left: 4px solid #28a745;
+            color: #155724;
+            padding: 0.3rem 0.8rem;
+            border-radius: 5px;
+            font-weight: bold;
+            display: inline-block;
+        }
+        .status-inactive {
+            background-color: #f8d7da;
+            border-left: 4px solid #dc3545;
+            color: #721c24;
+            padding: 0.3rem 0.8rem;
+            border-radius: 5px;
+            font-weight: bold;
+            display: inline-block;
+        }
+        .status-maintenance {
+            background-color: #fff3cd;
+            border-left: 4px solid #ffc107;
+            color: #856404;
+            padding: 0.3rem 0.8rem;
+            border-radius: 5px;
+            font-weight: bold;
+            display: inline-block;
+        }
+    </style>
+    """, unsafe_allow_html=True)
+
+# Durée de validité des données partagées entre sessions (secondes)
+DATA_TTL_SECONDS = 15 * 60
+
+# Période de rafraîchissement des courbes temps réel (secondes)
+LIVE_REFRESH_SECONDS = 2
+
+# Tailles de page proposées pour la liste des émetteurs
+EMITTER_PAGE_SIZES = [10, 25, 50]
+
+# Résolution de la carte de chaleur de couverture (points par axe)
+COVERAGE_GRID_POINTS = 200
+
+# Conflits de fréquence listés sous la carte (les plus graves d'abord)
+MAX_CONFLICT_ROWS = 500
+
+# Émetteurs listés pour un point cliqué, et au plus par point d'une requête par lot
+MAX_SERVING_EMITTERS = 5
+
+# Interventions passées affichées dans le détail d'un émetteur
+MAINTENANCE_HISTORY_ROWS = 5
+
+# Vues principales du dashboard (une seule construite par rerun)
+DASHBOARD_VIEWS = ["🗺️ Carte", "📻 Émetteurs", "📈 Signaux", "🔧 Maintenance", "ℹ️ À Propos"]
+SIGNAL_VIEWS = ["Qualité du Signal", "Puissance d'Émission", "Couverture", "Temps réel"]
 
 class RadioEmitterDashboard:
-    def __init__(self):
-        self.emitters = self.initialize_emitters()
-        self.signal_data = self.initialize_signal_data()
+    def __init__(self, store=None, emitters=None):
+        self.store = store
+        if store is not None:
+            # Données partagées entre sessions: aucun recalcul lors des reruns
+            self.snapshot = store.snapshot()
+            self.emitters = self.snapshot.emitters
+            # Historique sur disque, lu à la demande pour la période sélectionnée
+            self.signal_store = self.snapshot.signal_store
+            self.signal_data = None
+            self.rollups = self.snapshot.rollups
+        else:
+            self.emitters = self.initialize_emitters() if emitters is None else emitters
+            self.signal_data = self.initialize_signal_data()
+            self.signal_store = None
+            self.rollups = SignalRollups()
+            self.rollups.update(self.signal_data)
+            self.snapshot = DataSnapshot(0, {'emitters': self.emitters, 'signal_data': self.signal_data,
+                                             'rollups': self.rollups})
+        self.date_range = (None, None)
+        self.coverage_engine = CoverageEngine()
         
     def initialize_emitters(self):
         """Initialise les données des 12 émetteurs de radio Freedom à La Réunion"""
         # Coordonnées approximatives des villes principales de La Réunion
-        cities = {
-            'Saint-Denis': (-20.8789, 55.4481),
-            'Saint-Paul': (-21.0073, 55.2854),
-            'Saint-Pierre': (-21.3429, 55.4787),
-            'Le Tampon': (-21.3583, 55.5250),
-            'Saint-André': (-20.9667, 55.6333),
-            'Saint-Louis': (-21.2833, 55.4167),
-            'Sainte-Marie': (-20.9167, 55.5667),
-            'Sainte-Suzanne': (-20.8833, 55.6167),
-            'Le Port': (-20.9333, 55.2833),
-            'La Possession': (-20.9167, 55.3333),
-            'Saint-Joseph': (-21.3667, 55.6167),
-            'Cilaos': (-21.1333, 55.4667)
-        }
+        cities = REUNION_CITIES
         
         emitters = []
         emitter_id = 1
@@ -153,41 +199,49 @@ class RadioEmitterDashboard:
             })
             emitter_id += 1
         
-        return pd.DataFrame(emitters)
+        return pd.DataFrame(emitters).astype(EMITTER_DTYPES)
     
-    def initialize_signal_data(self):
-        """Initialise les données de signal pour chaque émetteur"""
-        signal_data = []
-        
-        for _, emitter in self.emitters.iterrows():
-            # Génération de données de signal pour les 7 derniers jours
-            for day in range(7):
-                date = pd.Timestamp.now() - pd.Timedelta(days=day)
-                
-                # Qualité du signal (0-100%)
-                base_quality = random.uniform(70, 95)
-                
-                # Variations selon l'heure de la journée
-                for hour in range(24):
-                    hourly_quality = base_quality + random.uniform(-10, 10)
-                    
-                    # Périodes de maintenance
-                    if emitter['statut'] == 'Maintenance' and hour in [2, 3, 4]:
-                        hourly_quality = 0
-                    
-                    # Réduction de qualité la nuit
-                    if hour in [0, 1, 2, 3, 4, 5]:
-                        hourly_quality *= 0.9
-                    
-                    signal_data.append({
-                        'emitter_id': emitter['id'],
-                        'date': date,
-                        'heure': hour,
-                        'qualite': max(0, min(100, hourly_quality)),
-                        'puissance': emitter['puissance'] * random.uniform(0.9, 1.1)
-                    })
-        
-        return pd.DataFrame(signal_data)
+    def initialize_signal_data(self, emitters=None, days=7, interval_minutes=60):
+        """Initialise les données de signal pour chaque émetteur (génération vectorisée)"""
+        emitters = self.emitters if emitters is None else emitters
+        return generate_signal_history(emitters, days=days, interval_minutes=interval_minutes)
+    
+    def get_terrain_raster(self, grid_points=COVERAGE_GRID_POINTS):
+        """Raster de couverture avec relief; seuls les émetteurs modifiés sont recalculés"""
+        def compute():
+            active = self.emitters[self.emitters['statut'] == 'Actif']
+            return get_propagation_model().raster(active, grid_points=grid_points)
+        return self.snapshot.memo(('terrain_raster', grid_points), compute)
+    
+    def load_signal_data(self, date_debut=None, date_fin=None):
+        """Historique de signal de la période (seules les partitions de ces jours sont lues)"""
+        if self.signal_store is None:
+            signal_data = self.snapshot.signal_data
+            days = signal_days(signal_data)
+            mask = np.ones(len(signal_data), dtype=bool)
+            if date_debut is not None:
+                mask &= days >= np.datetime64(pd.Timestamp(date_debut).date())
+            if date_fin is not None:
+                mask &= days <= np.datetime64(pd.Timestamp(date_fin).date())
+            signal_data = signal_data[mask]
+        else:
+            signal_data = self.signal_store.load(date_debut, date_fin)
+        get_profiler().count_rows(len(signal_data))
+        return signal_data
+    
+    def get_signal_index(self):
+        """Historique de la période sélectionnée, indexé par émetteur (chargé une fois par version)"""
+        return self.snapshot.memo(
+            ('signal_index',) + tuple(self.date_range),
+            lambda: EmitterSignalIndex(self.load_signal_data(*self.date_range))
+        )
+    
+    def get_coverage_raster(self, grid_points=COVERAGE_GRID_POINTS):
+        """Raster de couverture des émetteurs actifs, calculé une seule fois par version et résolution"""
+        return self.snapshot.memo(
+            ('coverage_raster', grid_points),
+            lambda: self.coverage_engine.compute_for(self.emitters, grid_points=grid_points)
+        )
     
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
@@ -200,8 +254,20 @@ class RadioEmitterDashboard:
                        unsafe_allow_html=True)
             st.markdown("**Cartographie et surveillance des 12 émetteurs de radio Freedom à La Réunion**")
         
-        current_time = pd.Timestamp.now().strftime('%H:%M:%S')
-        st.sidebar.markdown(f"**🕐 Dernière mise à jour: {current_time}**")
+        update_time = pd.Timestamp.fromtimestamp(self.snapshot.created_at).strftime('%H:%M:%S')
+        st.sidebar.markdown(f"**🕐 Dernière mise à jour: {update_time}**")
+    
+    def compute_key_metrics(self):
+        """Indicateurs clés de la flotte, sans affichage"""
+        statuses = self.emitters['statut'].value_counts()
+        return {
+            'emetteurs_total': len(self.emitters),
+            'emetteurs_actifs': int(statuses.get('Actif', 0)),
+            'emetteurs_maintenance': int(statuses.get('Maintenance', 0)),
+            'emetteurs_inactifs': int(statuses.get('Inactif', 0)),
+            'puissance_totale_w': int(self.emitters['puissance'].sum()),
+            'couverture_moyenne_km': float(self.emitters['couverture'].mean())
+        }
     
     def display_key_metrics(self):
         """Affiche les métriques clés des émetteurs"""
@@ -209,12 +275,13 @@ class RadioEmitterDashboard:
                    unsafe_allow_html=True)
         
         # Calcul des métriques
-        total_emitters = len(self.emitters)
-        active_emitters = len(self.emitters[self.emitters['statut'] == 'Actif'])
-        maintenance_emitters = len(self.emitters[self.emitters['statut'] == 'Maintenance'])
-        inactive_emitters = len(self.emitters[self.emitters['statut'] == 'Inactif'])
-        total_power = self.emitters['puissance'].sum()
-        avg_coverage = self.emitters['couverture'].mean()
+        kpis = self.compute_key_metrics()
+        total_emitters = kpis['emetteurs_total']
+        active_emitters = kpis['emetteurs_actifs']
+        maintenance_emitters = kpis['emetteurs_maintenance']
+        inactive_emitters = kpis['emetteurs_inactifs']
+        total_power = kpis['puissance_totale_w']
+        avg_coverage = kpis['couverture_moyenne_km']
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -247,63 +314,144 @@ class RadioEmitterDashboard:
                 f"{maintenance_emitters - 1:+d} vs semaine dernière"
             )
     
-    def create_map_view(self):
+    def get_map_layers(self):
+        """Couche des émetteurs, regroupés au-delà de CLUSTER_THRESHOLD (une fois par version)"""
+        def build():
+            get_profiler().count_rows(len(self.emitters))
+            return emitter_layer(self.emitters)
+        return self.snapshot.memo('map_layers', build)
+    
+    def get_coverage_layer(self):
+        """Couche GeoJSON des zones de couverture, calculée seulement si elle est affichée (une fois par version)"""
+        return self.snapshot.memo('coverage_layer', lambda: coverage_features(self.emitters))
+    
+    def get_interference(self):
+        """Conflits de fréquence entre zones de couverture qui se recouvrent (une fois par version)"""
+        def compute():
+            get_profiler().count_rows(len(self.emitters))
+            return InterferenceAnalyzer().analyze_for(self.emitters)
+        return self.snapshot.memo('interference', compute)
+    
+    def get_interference_layer(self):
+        """Couche GeoJSON des conflits de fréquence (une fois par version)"""
+        return self.snapshot.memo('interference_layer',
+                                  lambda: interference_features(self.emitters, self.get_interference()))
+    
+    def get_coverage_tiles(self):
+        """Pyramide de tuiles de la carte de chaleur, mise à jour une fois par version (tuiles touchées seulement)"""
+        def update():
+            pyramid = get_tile_pyramid()
+            pyramid.update(self.emitters)
+            get_profiler().count_rows(pyramid.rendered)
+            base_url = '/' + (st.get_option('server.baseUrlPath') or '').strip('/')
+            return {'url': pyramid.url_template(base_url), 'bounds': pyramid.bounds,
+                    'min_zoom': pyramid.min_zoom, 'max_zoom': pyramid.max_zoom}
+        return self.snapshot.memo('coverage_tiles', update)
+    
+    def get_map_payload(self, show_coverage=False, show_interference=False, show_heatmap=False):
+        """Charge du composant carte (script Leaflet, HTML, ressources) mise en cache par version et couches"""
+        def render():
+            coverage = self.get_coverage_layer() if show_coverage else None
+            interference = self.get_interference_layer() if show_interference else None
+            tiles = self.get_coverage_tiles() if show_heatmap else None
+            return EmitterMapBuilder().component_payload(self.get_map_layers(), coverage, interference,
+                                                         tiles, key='carte_emetteurs')
+        return self.snapshot.memo(('map_payload', bool(show_coverage), bool(show_interference), bool(show_heatmap)),
+                                  render)
+    
+    def get_coverage_index(self):
+        """Index des zones de couverture pour les requêtes par point (une fois par version)"""
+        def build():
+            get_profiler().count_rows(len(self.emitters))
+            return CoverageIndex(self.emitters)
+        return self.snapshot.memo('coverage_index', build)
+    
+    def create_map_view(self, show_coverage=False, show_interference=True, show_heatmap=True):
         """Crée la vue cartographique des émetteurs"""
+        # Import différé: chargé avec la carte. Fonction interne, version figée dans requirements.txt
+        from streamlit_folium import _component_func as folium_component
+        
         st.markdown('<h3 class="section-header">🗺️ CARTE DES ÉMETTEURS</h3>', 
                    unsafe_allow_html=True)
         
-        # Création de la carte centrée sur La Réunion
-        m = folium.Map(location=[-21.1151, 55.5364], zoom_start=10)
+        # Carte préparée une fois par version des données (comme st_folium, sans reconstruire la carte folium)
+        payload = self.get_map_payload(show_coverage, show_interference, show_heatmap)
+        # Seul un clic relance le script (pas le déplacement ni le zoom)
+        state = folium_component(**payload, width=1200, height=600)
         
-        # Ajout des marqueurs pour chaque émetteur
-        for _, emitter in self.emitters.iterrows():
-            # Couleur selon le statut
-            if emitter['statut'] == 'Actif':
-                color = 'green'
-            elif emitter['statut'] == 'Maintenance':
-                color = 'orange'
-            else:
-                color = 'red'
-            
-            # Utiliser l'ID original pour l'affichage (avec tiret)
-            display_id = emitter['id_original'] if 'id_original' in emitter else emitter['id'].replace('_', '-')
-            
-            # Création du popup avec informations
-            popup_html = f"""
-            <b>{emitter['nom']}</b><br>
-            ID: {display_id}<br>
-            Fréquence: {emitter['frequence']} MHz<br>
-            Puissance: {emitter['puissance']} W<br>
-            Altitude: {emitter['altitude']} m<br>
-            Couverture: {emitter['couverture']} km<br>
-            Statut: {emitter['statut']}<br>
-            Technicien: {emitter['technicien']}<br>
-            Dernière maintenance: {emitter['derniere_maintenance']}
-            """
-            
-            # Ajout du marqueur
-            folium.Marker(
-                location=[emitter['latitude'], emitter['longitude']],
-                popup=folium.Popup(popup_html, max_width=300),
-                tooltip=f"{emitter['nom']} - {emitter['frequence']} MHz",
-                icon=folium.Icon(color=color, icon='broadcast-tower', prefix='fa')
-            ).add_to(m)
-            
-            # Ajout du cercle de couverture
-            folium.Circle(
-                location=[emitter['latitude'], emitter['longitude']],
-                radius=emitter['couverture'] * 1000,  # Conversion en mètres
-                color=color,
-                fill=True,
-                fill_color=color,
-                fill_opacity=0.2,
-                popup=f"Zone de couverture: {emitter['couverture']} km"
-            ).add_to(m)
-        
-        # Affichage de la carte
-        folium_static(m, width=1200, height=600)
-    
-    def create_emitter_details(self):
+        self.display_point_coverage((state or {}).get('last_clicked'))
+        self.display_interference()
+    
+    def display_point_coverage(self, clicked=None):
+        """Émetteurs desservant le point cliqué sur la carte (ou saisi), classés par signal estimé"""
+        st.markdown("#### 📍 Couverture en un point")
+        if clicked and clicked != st.session_state.get('dernier_clic'):
+            st.session_state['dernier_clic'] = clicked
+            st.session_state['point_lat'] = float(clicked['lat'])
+            st.session_state['point_lon'] = float(clicked['lng'])
+        st.session_state.setdefault('point_lat', REUNION_CENTER[0])
+        st.session_state.setdefault('point_lon', REUNION_CENTER[1])
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            lat = st.number_input("Latitude", format="%.5f", step=0.001, key='point_lat')
+        with col2:
+            lon = st.number_input("Longitude", format="%.5f", step=0.001, key='point_lon')
+        
+        index = self.get_coverage_index()
+        serving = index.serving(lat, lon, MAX_SERVING_EMITTERS)
+        if len(serving) == 0:
+            st.warning("Aucun émetteur actif ne dessert ce point")
+        else:
+            st.dataframe(self.describe_serving(serving), hide_index=True)
+        
+        with st.expander("📄 Requête par lot (fichier CSV latitude, longitude)"):
+            uploaded = st.file_uploader("Points à analyser", type='csv', key='points_csv')
+            if uploaded is not None:
+                points = pd.read_csv(uploaded)
+                if not {'latitude', 'longitude'} <= set(points.columns):
+                    st.error("Le fichier doit contenir les colonnes latitude et longitude")
+                    return
+                results = index.query(points['latitude'], points['longitude'], MAX_SERVING_EMITTERS)
+                get_profiler().count_rows(len(points))
+                st.caption(f"{results['point'].nunique()} point(s) desservi(s) sur {len(points)}")
+                st.dataframe(self.describe_serving(results), hide_index=True)
+                st.download_button("Télécharger les résultats", results.to_csv(index=False),
+                                   file_name="couverture_points.csv", mime='text/csv')
+    
+    def describe_serving(self, serving):
+        """Résultats de requête complétés du nom et de la fréquence de chaque émetteur"""
+        details = self.emitters[['id', 'nom', 'frequence']].astype({'id': str})
+        table = serving.astype({'emitter_id': str}).merge(details, left_on='emitter_id', right_on='id', how='left')
+        table['emitter_id'] = table['emitter_id'].str.replace('_', '-')
+        return table.drop(columns='id')
+    
+    def display_interference(self):
+        """Conflits co-canal et de canal adjacent entre émetteurs en service"""
+        conflicts = self.get_interference()
+        st.markdown("#### 📶 Conflits de fréquence")
+        co_channel = int((conflicts['type'] == 'co-canal').sum())
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Conflits co-canal", co_channel)
+        col2.metric("Conflits de canal adjacent", len(conflicts) - co_channel)
+        col3.metric("Émetteurs concernés",
+                    len(set(conflicts['emetteur_a'].astype(str)) | set(conflicts['emetteur_b'].astype(str))))
+        
+        if len(conflicts) == 0:
+            st.success("Aucun conflit de fréquence entre zones de couverture")
+            return
+        table = conflicts.head(MAX_CONFLICT_ROWS).copy()
+        for column in ('emetteur_a', 'emetteur_b'):
+            table[column] = table[column].astype(str).str.replace('_', '-')
+        st.dataframe(table, hide_index=True)
+        if len(conflicts) > MAX_CONFLICT_ROWS:
+            st.caption(f"{MAX_CONFLICT_ROWS} conflits les plus graves sur {len(conflicts)}")
+    
+    def get_query_engine(self):
+        """Moteur de filtrage et de tri de la liste des émetteurs (une fois par version)"""
+        return self.snapshot.memo('emitter_query', lambda: EmitterQueryEngine(self.emitters))
+    
+    def create_emitter_details(self, sidebar_statuses=None):
         """Affiche les détails de chaque émetteur"""
         st.markdown('<h3 class="section-header">📻 DÉTAILS DES ÉMETTEURS</h3>', 
                    unsafe_allow_html=True)
@@ -314,158 +462,250 @@ class RadioEmitterDashboard:
             status_filter = st.selectbox("Filtrer par statut:", 
                                         ['Tous', 'Actif', 'Maintenance', 'Inactif'])
         with col2:
-            power_filter = st.selectbox("Filtrer par puissance:", 
-                                       ['Toutes', '> 1000W', '500-1000W', '< 500W'])
+            power_filter = st.selectbox("Filtrer par puissance:", POWER_FILTERS)
         with col3:
-            sort_by = st.selectbox("Trier par:", 
-                                  ['ID', 'Nom', 'Fréquence', 'Puissance', 'Statut'])
-        
-        # Application des filtres
-        filtered_emitters = self.emitters.copy()
+            sort_by = st.selectbox("Trier par:", list(SORT_KEYS))
         
+        # Statuts: sélection de la barre latérale, restreinte par le filtre de l'onglet
+        statuses = set(self.emitters['statut'].unique()) if sidebar_statuses is None else set(sidebar_statuses)
         if status_filter != 'Tous':
-            filtered_emitters = filtered_emitters[filtered_emitters['statut'] == status_filter]
-        
-        if power_filter == '> 1000W':
-            filtered_emitters = filtered_emitters[filtered_emitters['puissance'] > 1000]
-        elif power_filter == '500-1000W':
-            filtered_emitters = filtered_emitters[
-                (filtered_emitters['puissance'] >= 500) & 
-                (filtered_emitters['puissance'] <= 1000)
-            ]
-        elif power_filter == '< 500W':
-            filtered_emitters = filtered_emitters[filtered_emitters['puissance'] < 500]
-        
-        # Tri
-        if sort_by == 'ID':
-            filtered_emitters = filtered_emitters.sort_values('id')
-        elif sort_by == 'Nom':
-            filtered_emitters = filtered_emitters.sort_values('nom')
-        elif sort_by == 'Fréquence':
-            filtered_emitters = filtered_emitters.sort_values('frequence')
-        elif sort_by == 'Puissance':
-            filtered_emitters = filtered_emitters.sort_values('puissance', ascending=False)
-        elif sort_by == 'Statut':
-            filtered_emitters = filtered_emitters.sort_values('statut')
-        
-        # Affichage des émetteurs
+            statuses &= {status_filter}
+        
+        # Positions des émetteurs retenus (ordres de tri précalculés, résultats en cache)
+        query_engine = self.get_query_engine()
+        positions = query_engine.query(statuses, power_filter, sort_by)
+        get_profiler().count_rows(len(positions))
+        
+        # Pagination: seules les cartes de la page courante sont rendues
+        col1, col2, col3 = st.columns([1, 1, 2])
+        with col1:
+            page_size = st.selectbox("Émetteurs par page:", EMITTER_PAGE_SIZES)
+        with col2:
+            page_count = query_engine.page_count(positions, page_size)
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+        with col3:
+            st.markdown(f"**{len(positions)} émetteur(s)** — page {page}/{page_count}")
+        
+        filtered_emitters = query_engine.page(positions, page, page_size)
+        
+        # Affichage des émetteurs: chaque carte est un fragment, un clic ne relance que sa carte
         for _, emitter in filtered_emitters.iterrows():
-            # Classe CSS pour le statut
-            status_class = ""
-            if emitter['statut'] == 'Actif':
-                status_class = "status-active"
-            elif emitter['statut'] == 'Maintenance':
-                status_class = "status-maintenance"
-            else:
-                status_class = "status-inactive"
+            self.render_emitter_card(emitter)
+    
+    @st.fragment
+    def render_emitter_card(self, emitter):
+        """Carte d'un émetteur avec son panneau de détails repliable"""
+        # Classe CSS pour le statut
+        status_class = ""
+        if emitter['statut'] == 'Actif':
+            status_class = "status-active"
+        elif emitter['statut'] == 'Maintenance':
+            status_class = "status-maintenance"
+        else:
+            status_class = "status-inactive"
+        
+        # ID d'affichage et ID pour session_state (sans caractères spéciaux)
+        display_id = emitter['id_original'] if 'id_original' in emitter else emitter['id'].replace('_', '-')
+        safe_id = emitter['id']  # Déjà avec underscore
+        
+        # Affichage de la carte d'émetteur
+        with st.container():
+            col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
             
-            # ID d'affichage et ID pour session_state (sans caractères spéciaux)
-            display_id = emitter['id_original'] if 'id_original' in emitter else emitter['id'].replace('_', '-')
-            safe_id = emitter['id']  # Déjà avec underscore
+            with col1:
+                st.markdown(f"**{display_id}**")
+                st.markdown(f"<div class='{status_class}'>{emitter['statut']}</div>", 
+                           unsafe_allow_html=True)
             
-            # Affichage de la carte d'émetteur
-            with st.container():
-                col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
-                
-                with col1:
-                    st.markdown(f"**{display_id}**")
-                    st.markdown(f"<div class='{status_class}'>{emitter['statut']}</div>", 
-                               unsafe_allow_html=True)
-                
-                with col2:
-                    st.markdown(f"**{emitter['nom']}**")
-                    st.markdown(f"📍 {emitter['latitude']:.4f}, {emitter['longitude']:.4f}")
-                    st.markdown(f"📅 Installé le {emitter['date_installation']}")
-                
-                with col3:
-                    st.markdown(f"**{emitter['frequence']} MHz**")
-                    st.markdown(f"⚡ {emitter['puissance']} W")
-                    st.markdown(f"📡 Couverture: {emitter['couverture']} km")
+            with col2:
+                st.markdown(f"**{emitter['nom']}**")
+                st.markdown(f"📍 {emitter['latitude']:.4f}, {emitter['longitude']:.4f}")
+                st.markdown(f"📅 Installé le {emitter['date_installation']:%Y-%m-%d}")
+            
+            with col3:
+                st.markdown(f"**{emitter['frequence']} MHz**")
+                st.markdown(f"⚡ {emitter['puissance']} W")
+                st.markdown(f"📡 Couverture: {emitter['couverture']} km")
+            
+            with col4:
+                st.markdown(f"**Technicien:** {emitter['technicien']}")
+                st.markdown(f"**Dernière maintenance:** {emitter['derniere_maintenance']:%Y-%m-%d}")
                 
-                with col4:
-                    st.markdown(f"**Technicien:** {emitter['technicien']}")
-                    st.markdown(f"**Dernière maintenance:** {emitter['derniere_maintenance']}")
+                # Bouton pour voir les détails - utiliser safe_id
+                details_key = f"details_{safe_id}"
+                if st.button(f"Détails {display_id}", key=f"btn_{safe_id}"):
+                    st.session_state[details_key] = not st.session_state.get(details_key, False)
+            
+            # Section de détails (cachée par défaut)
+            if st.session_state.get(f"details_{safe_id}", False):
+                import plotly.express as px  # import différé: chargé au premier graphique affiché
+                with st.expander(f"Informations détaillées - {display_id}", expanded=True):
+                    col1, col2 = st.columns(2)
                     
-                    # Bouton pour voir les détails - utiliser safe_id
-                    details_key = f"details_{safe_id}"
-                    if st.button(f"Détails {display_id}", key=f"btn_{safe_id}"):
-                        st.session_state[details_key] = not st.session_state.get(details_key, False)
-                
-                # Section de détails (cachée par défaut)
-                if st.session_state.get(f"details_{safe_id}", False):
-                    with st.expander(f"Informations détaillées - {display_id}", expanded=True):
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.markdown("**Informations techniques**")
-                            st.markdown(f"- Altitude: {emitter['altitude']} m")
-                            st.markdown(f"- Type d'antenne: Directionnelle")
-                            st.markdown(f"- Azimut: {random.randint(0, 360)}°")
-                            st.markdown(f"- Modèle d'émetteur: FM-{random.randint(1000, 9999)}")
-                        
-                        with col2:
-                            st.markdown("**Historique de maintenance**")
-                            for i in range(3):
-                                date = pd.Timestamp.now() - pd.Timedelta(days=30*i)
-                                st.markdown(f"- {date.strftime('%Y-%m-%d')}: Maintenance {random.choice(['préventive', 'corrective', 'upgrade'])}")
-                        
-                        # Graphique de qualité du signal
-                        emitter_signal = self.signal_data[self.signal_data['emitter_id'] == safe_id]
-                        if not emitter_signal.empty:
-                            # Moyenne par heure pour les 7 derniers jours
-                            hourly_avg = emitter_signal.groupby('heure')['qualite'].mean().reset_index()
-                            
-                            fig = px.line(
-                                hourly_avg, 
-                                x='heure', 
-                                y='qualite',
-                                title=f"Qualité du signal moyenne par heure - {display_id}",
-                                labels={'heure': 'Heure de la journée', 'qualite': 'Qualité du signal (%)'}
-                            )
-                            fig.update_layout(yaxis_range=[0, 100])
-                            st.plotly_chart(fig, use_container_width=True)
-                
-                st.markdown("---")
+                    with col1:
+                        st.markdown("**Informations techniques**")
+                        st.markdown(f"- Altitude: {emitter['altitude']} m")
+                        st.markdown(f"- Type d'antenne: Directionnelle")
+                        st.markdown(f"- Azimut: {random.randint(0, 360)}°")
+                        st.markdown(f"- Modèle d'émetteur: FM-{random.randint(1000, 9999)}")
+                    
+                    with col2:
+                        st.markdown("**Historique de maintenance**")
+                        # Requêtes par plage sur l'index (émetteur, date)
+                        today = pd.Timestamp.now().normalize()
+                        store = get_maintenance_store()
+                        past = store.history(safe_id, end=today, limit=MAINTENANCE_HISTORY_ROWS)
+                        upcoming = store.history(safe_id, start=today + pd.Timedelta(days=1), ascending=True)
+                        if past.empty and upcoming.empty:
+                            st.markdown("Aucune intervention enregistrée")
+                        for row in past.itertuples():
+                            st.markdown(f"- {row.date} {row.heure}: Maintenance {row.type} ({row.technicien})"
+                                        + (f" — {row.taches}" if row.taches else ""))
+                        for row in upcoming.itertuples():
+                            st.markdown(f"- {row.date} {row.heure}: À venir, {row.technicien}"
+                                        + (f" — {row.taches}" if row.taches else ""))
+                    
+                    # Graphique de qualité du signal
+                    # Moyenne par heure sur la période, lue dans les agrégats horaires
+                    hourly_avg = self.rollups.hourly_profile(safe_id, *self.date_range)
+                    if not hourly_avg.empty:
+                        fig = px.line(
+                            hourly_avg, 
+                            x='heure', 
+                            y='qualite',
+                            title=f"Qualité du signal moyenne par heure - {display_id}",
+                            labels={'heure': 'Heure de la journée', 'qualite': 'Qualité du signal (%)'}
+                        )
+                        fig.update_layout(yaxis_range=[0, 100])
+                        st.plotly_chart(fig, use_container_width=True)
+                    
+                    # Historique détaillé: tranche de l'émetteur dans l'index, sans parcours complet
+                    history = self.signal_history([safe_id])
+                    if not history.empty:
+                        self.display_series_chart(history, f"fenetre_{safe_id}",
+                                                  f"Historique de la qualité du signal - {display_id}")
+            
+            st.markdown("---")
+    
+    def signal_history(self, emitter_ids):
+        """Échantillons (instant, qualité) de quelques émetteurs, lus dans l'index de la période"""
+        index = self.get_signal_index()
+        parts = [index.get(emitter_id) for emitter_id in emitter_ids]
+        parts = [part for part in parts if not part.empty]
+        if not parts:
+            return pd.DataFrame({'instant': [], 'qualite': [], 'display_id': []})
+        return pd.DataFrame({
+            'instant': np.concatenate([signal_instants(part).to_numpy() for part in parts]),
+            'qualite': np.concatenate([part['qualite'].to_numpy() for part in parts]),
+            'display_id': np.repeat([str(part['emitter_id'].iloc[0]).replace('_', '-') for part in parts],
+                                    [len(part) for part in parts])
+        })
+    
+    def display_series_chart(self, history, key, title, width_px=DEFAULT_WIDTH_PX):
+        """Courbe de qualité réduite à la largeur affichée; le curseur de fenêtre relit le détail"""
+        chart_area = st.container()
+        window = (None, None)
+        first, last = history['instant'].min(), history['instant'].max()
+        if last > first:
+            window = st.slider("Fenêtre affichée", min_value=first.to_pydatetime(), max_value=last.to_pydatetime(),
+                               value=(first.to_pydatetime(), last.to_pydatetime()),
+                               format="YYYY-MM-DD HH:mm", key=key)
+        fig, (available, shown) = line_figure(
+            history, 'instant', 'qualite',
+            color='display_id' if history['display_id'].nunique() > 1 else None,
+            title=title,
+            labels={'instant': 'Date', 'qualite': 'Qualité du signal (%)', 'display_id': 'Émetteur'},
+            width_px=width_px, x_range=window, y_range=(0, 100)
+        )
+        chart_area.plotly_chart(fig, use_container_width=True)
+        chart_area.caption(f"{shown} point(s) affiché(s) sur {available} dans la fenêtre")
+    
+    def create_live_telemetry(self, auto_refresh=False):
+        """Courbes temps réel lues dans les tampons circulaires de télémétrie"""
+        import plotly.express as px  # import différé: chargé au premier graphique affiché
+        ingestor = get_telemetry_ingestor()
+        buffers = ingestor.buffers
+        if buffers.total == 0:
+            st.info(f"Aucune télémétrie reçue pour l'instant. Agent local de test: "
+                    f"`python telemetry.py --file {ingestor.path}`")
+            return
+        
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            selected = st.multiselect("Émetteurs suivis:", buffers.emitter_ids,
+                                      default=buffers.emitter_ids[:3])
+        with col2:
+            window = st.slider("Fenêtre (échantillons):", min_value=60, max_value=buffers.capacity,
+                               value=min(300, buffers.capacity), step=60)
+        
+        def render_live_chart():
+            # Lecture des derniers échantillons seulement: O(fenêtre) par émetteur
+            frames = []
+            for emitter_id in selected:
+                latest = buffers.latest(emitter_id, window)
+                latest['emitter_id'] = emitter_id.replace('_', '-')
+                frames.append(latest)
+            if not frames:
+                return
+            live = pd.concat(frames, ignore_index=True)
+            live['instant'] = pd.to_datetime(live['t'], unit='s')
+            
+            fig = px.line(
+                live,
+                x='instant',
+                y='qualite',
+                color='emitter_id',
+                title="Qualité du signal en temps réel",
+                labels={'instant': 'Heure', 'qualite': 'Qualité du signal (%)', 'emitter_id': 'Émetteur'}
+            )
+            fig.update_layout(yaxis_range=[0, 100])
+            st.plotly_chart(fig, use_container_width=True)
+            
+            last_receive = pd.Timestamp.fromtimestamp(ingestor.last_receive).strftime('%H:%M:%S')
+            st.caption(f"{buffers.total} mesures reçues — dernière réception à {last_receive}")
+        
+        st.fragment(render_live_chart, run_every=LIVE_REFRESH_SECONDS if auto_refresh else None)()
     
-    def create_signal_analysis(self):
+    def get_current_quality(self):
+        """Qualité courante de chaque émetteur, interrogée en parallèle auprès des agents"""
+        sweep = get_poller().sweep_sync(self.emitters['id'].tolist())
+        quality = self.emitters[['id', 'nom', 'statut']].rename(columns={'id': 'emitter_id'}).merge(
+            sweep[['emitter_id', 'qualite', 'latence_ms', 'erreur']], on='emitter_id', how='left'
+        )
+        # Émetteur coupé ou agent injoignable: pas de signal
+        quality.loc[quality['statut'] == 'Inactif', 'qualite'] = 0.0
+        quality['qualite'] = quality['qualite'].fillna(0.0)
+        quality['emitter_id'] = quality['emitter_id'].str.replace('_', '-')
+        return quality
+
+    def create_signal_analysis(self, auto_refresh=False):
         """Analyse des signaux des émetteurs"""
+        import plotly.express as px  # import différé: chargé au premier graphique affiché
         st.markdown('<h3 class="section-header">📈 ANALYSE DES SIGNAUX</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Qualité du Signal", "Puissance d'Émission", "Couverture"])
+        # Sous-vues: seule celle affichée calcule ses graphiques
+        sub_view = st.segmented_control("Analyse", SIGNAL_VIEWS, default=SIGNAL_VIEWS[0],
+                                        key='vue_signaux', label_visibility='collapsed') or SIGNAL_VIEWS[0]
         
-        with tab1:
+        if sub_view == SIGNAL_VIEWS[0]:
             # Qualité du signal par émetteur
             col1, col2 = st.columns(2)
             
             with col1:
-                # Qualité actuelle par émetteur
-                current_quality = []
-                for _, emitter in self.emitters.iterrows():
-                    # Qualité actuelle simulée
-                    if emitter['statut'] == 'Actif':
-                        quality = random.uniform(70, 95)
-                    elif emitter['statut'] == 'Maintenance':
-                        quality = random.uniform(0, 50)
-                    else:
-                        quality = 0
-                    
-                    display_id = emitter['id_original'] if 'id_original' in emitter else emitter['id'].replace('_', '-')
-                    
-                    current_quality.append({
-                        'emitter_id': display_id,
-                        'nom': emitter['nom'],
-                        'qualite': quality,
-                        'statut': emitter['statut']
-                    })
-                
-                quality_df = pd.DataFrame(current_quality)
+                # Qualité actuelle par émetteur, relevée auprès des agents de site
+                quality_df = self.get_current_quality()
+                unreachable = int(quality_df['erreur'].notna().sum())
+                if unreachable:
+                    st.caption(f"⚠️ {unreachable} agent(s) injoignable(s) sur {len(quality_df)} "
+                               f"(lancer `python mock_agent.py` en local)")
                 
                 fig = px.bar(
                     quality_df, 
                     x='nom', 
                     y='qualite',
                     color='statut',
+                    hover_data=['emitter_id', 'latence_ms'],
                     title="Qualité actuelle du signal par émetteur",
                     labels={'qualite': 'Qualité du signal (%)', 'nom': 'Émetteur'},
                     color_discrete_map={'Actif': 'green', 'Maintenance': 'orange', 'Inactif': 'red'}
@@ -474,30 +714,24 @@ class RadioEmitterDashboard:
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                # Évolution de la qualité sur 7 jours
-                daily_avg = self.signal_data.groupby(['emitter_id', 'date'])['qualite'].mean().reset_index()
+                # Évolution de la qualité sur la période, échantillon par échantillon
+                # Sélection de quelques émetteurs pour la lisibilité, stable d'un rerun à l'autre
+                # (le zoom relit la même sélection)
+                ids = list(self.emitters['id'].unique())
+                selected_emitters = [e for e in st.session_state.get('emetteurs_evolution', []) if e in set(ids)]
+                if not selected_emitters:
+                    selected_emitters = random.sample(ids, min(5, len(ids)))
+                    st.session_state['emetteurs_evolution'] = selected_emitters
                 
-                # Sélection de quelques émetteurs pour la lisibilité
-                selected_emitters = random.sample(list(self.emitters['id'].unique()), min(5, len(self.emitters)))
-                filtered_data = daily_avg[daily_avg['emitter_id'].isin(selected_emitters)]
-                
-                # Remplacer les IDs pour l'affichage
-                filtered_data['display_id'] = filtered_data['emitter_id'].apply(
-                    lambda x: x.replace('_', '-') if '_' in x else x
-                )
-                
-                fig = px.line(
-                    filtered_data, 
-                    x='date', 
-                    y='qualite',
-                    color='display_id',
-                    title="Évolution de la qualité du signal (7 derniers jours)",
-                    labels={'qualite': 'Qualité du signal (%)', 'date': 'Date'}
-                )
-                fig.update_layout(yaxis_range=[0, 100])
-                st.plotly_chart(fig, use_container_width=True)
+                history = self.signal_history(selected_emitters)
+                if history.empty:
+                    st.info("Aucune donnée de signal sur la période")
+                else:
+                    self.display_series_chart(history, 'fenetre_evolution',
+                                              "Évolution de la qualité du signal (7 derniers jours)",
+                                              width_px=DEFAULT_WIDTH_PX // 2)
         
-        with tab2:
+        elif sub_view == SIGNAL_VIEWS[1]:
             # Analyse de la puissance d'émission
             col1, col2 = st.columns(2)
             
@@ -537,7 +771,7 @@ class RadioEmitterDashboard:
                 )
                 st.plotly_chart(fig, use_container_width=True)
         
-        with tab3:
+        elif sub_view == SIGNAL_VIEWS[2]:
             # Analyse de la couverture
             col1, col2 = st.columns(2)
             
@@ -557,146 +791,184 @@ class RadioEmitterDashboard:
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                # Carte de chaleur de couverture
-                # Création d'une grille pour la carte de chaleur
-                lat_min, lat_max = -21.4, -20.8
-                lon_min, lon_max = 55.2, 55.7
-                
-                # Génération de points sur une grille
-                grid_points = 30  # Réduit pour les performances
-                lats = np.linspace(lat_min, lat_max, grid_points)
-                lons = np.linspace(lon_min, lon_max, grid_points)
-                
-                heatmap_data = []
-                for lat in lats:
-                    for lon in lons:
-                        # Calcul de la force du signal à ce point
-                        signal_strength = 0
-                        for _, emitter in self.emitters.iterrows():
-                            if emitter['statut'] == 'Actif':
-                                # Distance simple (approximation)
-                                distance = np.sqrt((lat - emitter['latitude'])**2 + (lon - emitter['longitude'])**2)
-                                # Signal décroît avec la distance
-                                emitter_signal = max(0, 100 - distance * 100 / emitter['couverture'])
-                                signal_strength = max(signal_strength, emitter_signal)
-                        
-                        heatmap_data.append([lat, lon, signal_strength])
-                
-                heatmap_df = pd.DataFrame(heatmap_data, columns=['lat', 'lon', 'signal'])
+                # Carte de chaleur de couverture: cercles théoriques ou modèle avec relief
+                coverage_model = st.radio("Modèle de couverture:", ["Cercles", "Relief"], horizontal=True)
+                if coverage_model == "Relief":
+                    raster = self.get_terrain_raster()
+                    title = "Couverture radio avec relief (visibilité et diffraction)"
+                else:
+                    raster = self.get_coverage_raster()
+                    title = "Carte de chaleur de la couverture radio"
                 
-                fig = px.density_heatmap(
-                    heatmap_df, 
-                    x='lon', 
-                    y='lat', 
-                    z='signal',
-                    title="Carte de chaleur de la couverture radio",
-                    labels={'lon': 'Longitude', 'lat': 'Latitude', 'signal': 'Force du signal (%)'},
+                fig = px.imshow(
+                    raster.signal,
+                    x=raster.lons,
+                    y=raster.lats,
+                    origin='lower',
+                    aspect='auto',
+                    zmin=0,
+                    zmax=100,
+                    title=title,
+                    labels={'x': 'Longitude', 'y': 'Latitude', 'color': 'Force du signal (%)'},
                     color_continuous_scale='Viridis'
                 )
                 st.plotly_chart(fig, use_container_width=True)
+        
+        else:
+            self.create_live_telemetry(auto_refresh)
+    
+    def get_maintenance_plan(self):
+        """Plan de maintenance de toute la flotte: technicien, nuit et horaire (une fois par version)"""
+        def compute():
+            get_profiler().count_rows(len(self.emitters))
+            return MaintenanceScheduler().plan_for(self.emitters)
+        return self.snapshot.memo('maintenance_plan', compute)
+    
+    def build_maintenance_schedule(self):
+        """Tableau des maintenances à venir, trié par priorité puis par date"""
+        plan = self.get_maintenance_plan()
+        emitters = self.emitters
+        if 'id_original' in emitters:
+            display_ids = emitters['id_original'].astype(str)
+        else:
+            display_ids = emitters['id'].str.replace('_', '-')
+        planned = plan['date'].notna().to_numpy()
+        
+        maintenance_df = pd.DataFrame({
+            'emitter_id': emitters['id'].to_numpy(),  # ID safe pour session_state
+            'display_id': display_ids.to_numpy(),     # ID pour affichage
+            'nom': emitters['nom'].to_numpy(),
+            'statut': emitters['statut'].to_numpy(),
+            'derniere_maintenance': emitters['derniere_maintenance'].dt.strftime('%Y-%m-%d').to_numpy(),
+            'prochaine_maintenance': np.where(planned, plan['date'].dt.strftime('%Y-%m-%d'), "Non planifiée"),
+            'creneau': np.where(planned, plan['debut'] + '–' + plan['fin'], ''),
+            'priorite': plan['priorite'].to_numpy(),
+            'technicien': plan['technicien'].astype(str).where(planned, '—').to_numpy(),
+            'taches': plan['tache'].to_numpy()
+        })
+        get_profiler().count_rows(len(maintenance_df))
+        
+        # Tri par priorité et date
+        priority_order = {"Élevée": 0, "Moyenne": 1, "Basse": 2}
+        maintenance_df['priorite_order'] = maintenance_df['priorite'].map(priority_order)
+        return maintenance_df.sort_values(['priorite_order', 'prochaine_maintenance'])
     
     def create_maintenance_view(self):
         """Vue de maintenance des émetteurs"""
         st.markdown('<h3 class="section-header">🔧 PLANIFICATION DE LA MAINTENANCE</h3>', 
                    unsafe_allow_html=True)
         
-        # Tableau de maintenance
-        maintenance_schedule = []
+        maintenance_df = self.build_maintenance_schedule()
+        plan = self.get_maintenance_plan()
+        planned = plan[plan['date'].notna()]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Maintenances planifiées", len(planned))
+        col2.metric("Non planifiées (horizon dépassé)", len(plan) - len(planned))
+        col3.metric("En retard sur l'échéance", int((planned['retard_j'] > 0).sum()))
+        col4.metric("Trajets entre sites", f"{planned['trajet_min'].sum() / 60:.1f} h")
+        
+        # Interventions déjà réservées de toutes les lignes, lues en une requête
+        today = pd.Timestamp.now().normalize()
+        bookings = get_maintenance_store().next_bookings(maintenance_df['emitter_id'], today)
+        st.session_state['interventions_reservees'] = bookings.to_dict('index')
         
-        for _, emitter in self.emitters.iterrows():
-            # Prochaine maintenance planifiée
-            if emitter['statut'] == 'Maintenance':
-                next_maintenance = pd.Timestamp.now()
-                priority = "Élevée"
+        # Affichage du tableau: chaque ligne est un fragment, planifier ne relance que sa ligne
+        for _, maintenance in maintenance_df.iterrows():
+            self.render_maintenance_row(maintenance)
+        
+        self.display_recorded_interventions()
+    
+    def display_recorded_interventions(self):
+        """Interventions enregistrées autour d'aujourd'hui, lues par plage de dates"""
+        today = pd.Timestamp.now().normalize()
+        with st.expander("Interventions enregistrées"):
+            col1, col2 = st.columns(2)
+            start = col1.date_input("Du", value=today - pd.Timedelta(days=30), key="interventions_debut")
+            end = col2.date_input("Au", value=today + pd.Timedelta(days=PLANNING_HORIZON_DAYS),
+                                  key="interventions_fin")
+            technicien = st.selectbox("Technicien", ["Tous", *TECHNICIANS], key="interventions_technicien")
+            recorded = get_maintenance_store().between(start, end, None if technicien == "Tous" else technicien)
+            if recorded.empty:
+                st.info("Aucune intervention sur cette période")
             else:
-                days_until = random.randint(1, 90)
-                next_maintenance = pd.Timestamp.now() + pd.Timedelta(days=days_until)
-                
-                if days_until < 7:
-                    priority = "Élevée"
-                elif days_until < 30:
-                    priority = "Moyenne"
-                else:
-                    priority = "Basse"
-            
-            display_id = emitter['id_original'] if 'id_original' in emitter else emitter['id'].replace('_', '-')
-            
-            maintenance_schedule.append({
-                'emitter_id': emitter['id'],  # ID safe pour session_state
-                'display_id': display_id,      # ID pour affichage
-                'nom': emitter['nom'],
-                'statut': emitter['statut'],
-                'derniere_maintenance': emitter['derniere_maintenance'],
-                'prochaine_maintenance': next_maintenance.strftime('%Y-%m-%d'),
-                'priorite': priority,
-                'technicien': emitter['technicien'],
-                'taches': random.choice(["Vérification antenne", "Calibrage fréquence", "Remplacement pièces", "Mise à jour logiciel"])
-            })
+                st.dataframe(recorded.drop(columns=['id']), hide_index=True, use_container_width=True)
+    
+    @st.fragment
+    def render_maintenance_row(self, maintenance):
+        """Ligne du planning avec son formulaire de planification"""
+        col1, col2, col3, col4, col5 = st.columns([1, 2, 1, 1, 1])
         
-        maintenance_df = pd.DataFrame(maintenance_schedule)
+        with col1:
+            st.markdown(f"**{maintenance['display_id']}**")
+            if maintenance['statut'] == 'Maintenance':
+                st.markdown('<div class="status-maintenance">En cours</div>', unsafe_allow_html=True)
+            elif maintenance['priorite'] == 'Élevée':
+                st.markdown('<div class="status-inactive">Urgent</div>', unsafe_allow_html=True)
+            else:
+                st.markdown('<div class="status-active">Planifié</div>', unsafe_allow_html=True)
         
-        # Tri par priorité et date
-        priority_order = {"Élevée": 0, "Moyenne": 1, "Basse": 2}
-        maintenance_df['priorite_order'] = maintenance_df['priorite'].map(priority_order)
-        maintenance_df = maintenance_df.sort_values(['priorite_order', 'prochaine_maintenance'])
+        with col2:
+            st.markdown(f"**{maintenance['nom']}**")
+            st.markdown(f"Tâche: {maintenance['taches']}")
         
-        # Affichage du tableau
-        for _, maintenance in maintenance_df.iterrows():
-            col1, col2, col3, col4, col5 = st.columns([1, 2, 1, 1, 1])
-            
-            with col1:
-                st.markdown(f"**{maintenance['display_id']}**")
-                if maintenance['statut'] == 'Maintenance':
-                    st.markdown('<div class="status-maintenance">En cours</div>', unsafe_allow_html=True)
-                elif maintenance['priorite'] == 'Élevée':
-                    st.markdown('<div class="status-inactive">Urgent</div>', unsafe_allow_html=True)
-                else:
-                    st.markdown('<div class="status-active">Planifié</div>', unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"**{maintenance['nom']}**")
-                st.markdown(f"Tâche: {maintenance['taches']}")
-            
-            with col3:
+        # Intervention planifiée à la main: prioritaire sur la proposition du planificateur
+        booking = st.session_state.get('interventions_reservees', {}).get(maintenance['emitter_id'])
+        
+        with col3:
+            if booking is not None:
+                st.markdown(f"**{booking['date']}**")
+                st.markdown(f"Planifiée à {booking['heure']} ({booking['technicien']})")
+            else:
                 st.markdown(f"**{maintenance['prochaine_maintenance']}**")
-                st.markdown(f"Dernière: {maintenance['derniere_maintenance']}")
-            
-            with col4:
-                st.markdown(f"**Priorité:** {maintenance['priorite']}")
-                st.markdown(f"**Technicien:** {maintenance['technicien']}")
-            
-            with col5:
-                # Utiliser l'ID safe pour la clé de session
-                plan_key = f"plan_{maintenance['emitter_id']}"
-                if st.button(f"Planifier", key=f"btn_plan_{maintenance['emitter_id']}"):
-                    st.session_state[plan_key] = True
-            
-            # Formulaire de planification (caché par défaut)
-            if st.session_state.get(plan_key, False):
-                with st.expander(f"Planification de maintenance - {maintenance['display_id']}", expanded=True):
-                    with st.form(key=f"maintenance_form_{maintenance['emitter_id']}"):
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            date = st.date_input("Date de maintenance", value=pd.Timestamp.now())
-                            heure = st.time_input("Heure de maintenance", value=pd.Timestamp.now().time())
-                            technicien = st.selectbox("Technicien", [f"Tech-{i:02d}" for i in range(1, 6)])
-                        
-                        with col2:
-                            duree = st.number_input("Durée estimée (heures)", min_value=1, max_value=24, value=2)
-                            taches = st.multiselect("Tâches à effectuer", [
-                                "Vérification antenne", "Calibrage fréquence", "Remplacement pièces", 
-                                "Mise à jour logiciel", "Nettoyage équipement", "Test de signal"
-                            ])
-                            notes = st.text_area("Notes additionnelles")
-                        
-                        submitted = st.form_submit_button("Confirmer la planification")
-                        if submitted:
-                            st.success(f"Maintenance planifiée pour {maintenance['display_id']} le {date} à {heure}")
-                            st.session_state[plan_key] = False
-                            st.rerun()
-            
-            st.markdown("---")
+                if maintenance['creneau']:
+                    st.markdown(f"Créneau: {maintenance['creneau']}")
+            st.markdown(f"Dernière: {maintenance['derniere_maintenance']}")
+        
+        with col4:
+            st.markdown(f"**Priorité:** {maintenance['priorite']}")
+            st.markdown(f"**Technicien:** {maintenance['technicien']}")
+        
+        with col5:
+            # Utiliser l'ID safe pour la clé de session
+            plan_key = f"plan_{maintenance['emitter_id']}"
+            if st.button(f"Planifier", key=f"btn_plan_{maintenance['emitter_id']}"):
+                st.session_state[plan_key] = True
+        
+        # Formulaire de planification (caché par défaut)
+        if st.session_state.get(plan_key, False):
+            with st.expander(f"Planification de maintenance - {maintenance['display_id']}", expanded=True):
+                with st.form(key=f"maintenance_form_{maintenance['emitter_id']}"):
+                    col1, col2 = st.columns(2)
+                    
+                    with col1:
+                        date = st.date_input("Date de maintenance", value=pd.Timestamp.now())
+                        heure = st.time_input("Heure de maintenance", value=pd.Timestamp.now().time())
+                        technicians = list(TECHNICIANS)
+                        assigned = maintenance['technicien']
+                        technicien = st.selectbox("Technicien", technicians,
+                                                  index=technicians.index(assigned) if assigned in technicians else 0)
+                    
+                    with col2:
+                        duree = st.number_input("Durée estimée (heures)", min_value=1, max_value=24, value=2)
+                        taches = st.multiselect("Tâches à effectuer", [
+                            "Vérification antenne", "Calibrage fréquence", "Remplacement pièces", 
+                            "Mise à jour logiciel", "Nettoyage équipement", "Test de signal"
+                        ])
+                        notes = st.text_area("Notes additionnelles")
+                    
+                    submitted = st.form_submit_button("Confirmer la planification")
+                    if submitted:
+                        store = get_maintenance_store()
+                        store.add(maintenance['emitter_id'], date, heure, technicien, duree, taches=taches, notes=notes)
+                        # Seule la réservation de cette ligne est relue pour le rerun du fragment
+                        booked = store.next_bookings([maintenance['emitter_id']], pd.Timestamp.now().normalize())
+                        st.session_state.setdefault('interventions_reservees', {}).update(booked.to_dict('index'))
+                        st.success(f"Maintenance planifiée pour {maintenance['display_id']} le {date} à {heure}")
+                        st.session_state[plan_key] = False
+                        st.rerun(scope="fragment")
+        
+        st.markdown("---")
     
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
@@ -720,10 +992,16 @@ class RadioEmitterDashboard:
         # Options d'affichage
         st.sidebar.markdown("### ⚙️ Options")
         auto_refresh = st.sidebar.checkbox("Rafraîchissement automatique", value=True)
-        show_coverage = st.sidebar.checkbox("Afficher zones de couverture", value=True)
+        # Carte de chaleur en tuiles précalculées; les cercles par émetteur restent disponibles
+        show_heatmap = st.sidebar.checkbox("Carte de chaleur de couverture", value=True)
+        show_coverage = st.sidebar.checkbox("Afficher zones de couverture", value=False)
+        show_interference = st.sidebar.checkbox("Afficher les conflits de fréquence", value=True)
+        debug = st.sidebar.checkbox("Panneau de profilage", value=False)
         
         # Bouton de rafraîchissement manuel
         if st.sidebar.button("🔄 Rafraîchir les données"):
+            if self.store is not None:
+                self.store.invalidate()
             st.rerun()
         
         # Informations système
@@ -736,10 +1014,19 @@ class RadioEmitterDashboard:
             len(self.emitters)
         )
         
+        # Alertes évaluées en continu sur la télémétrie reçue
+        alert_engine = get_alert_engine(get_telemetry_ingestor())
         st.sidebar.metric(
             "Alertes actives",
-            random.randint(0, 3)
+            alert_engine.active_count()
         )
+        active_alerts = alert_engine.active_alerts()
+        if len(active_alerts):
+            with st.sidebar.expander(f"🚨 Détail des alertes ({len(active_alerts)})"):
+                active_alerts['emitter_id'] = active_alerts['emitter_id'].str.replace('_', '-')
+                active_alerts['valeur'] = active_alerts['valeur'].round(1)
+                active_alerts['depuis'] = active_alerts['depuis'].dt.strftime('%H:%M:%S')
+                st.dataframe(active_alerts, hide_index=True)
         
         st.sidebar.metric(
             "Mises à jour aujourd'hui",
@@ -751,73 +1038,167 @@ class RadioEmitterDashboard:
             'date_fin': date_fin,
             'statuts_selectionnes': statuts_selectionnes,
             'auto_refresh': auto_refresh,
-            'show_coverage': show_coverage
+            'show_coverage': show_coverage,
+            'show_heatmap': show_heatmap,
+            'show_interference': show_interference,
+            'debug': debug
         }
 
     def run_dashboard(self):
         """Exécute le dashboard complet"""
+        profiler = get_profiler()
+        with profiler.run() as run:
+            controls = self.render_sections(profiler)
+        if controls['debug']:
+            self.display_debug_panel(run)
+    
+    def render_sections(self, profiler):
+        """Barre latérale, en-tête, métriques et onglets, chacun mesuré comme une section"""
         # Sidebar
-        controls = self.create_sidebar()
+        with profiler.section('barre_laterale'):
+            controls = self.create_sidebar()
+        self.date_range = (controls['date_debut'], controls['date_fin'])
         
         # Header
-        self.display_header()
+        with profiler.section('en_tete'):
+            self.display_header()
         
         # Métriques clés
-        self.display_key_metrics()
-        
-        # Navigation par onglets
-        tab1, tab2, tab3, tab4, tab5 = st.tabs([
-            "🗺️ Carte", 
-            "📻 Émetteurs", 
-            "📈 Signaux", 
-            "🔧 Maintenance",
-            "ℹ️ À Propos"
-        ])
-        
-        with tab1:
-            self.create_map_view()
-        
-        with tab2:
-            self.create_emitter_details()
-        
-        with tab3:
-            self.create_signal_analysis()
-        
-        with tab4:
-            self.create_maintenance_view()
-        
-        with tab5:
-            st.markdown("## 📋 À propos de ce dashboard")
-            st.markdown("""
-            Ce dashboard présente une vue d'ensemble des 12 émetteurs de radio Freedom 
-            situés sur l'île de La Réunion.
-            
-            **Fonctionnalités:**
-            - Cartographie des émetteurs avec zones de couverture
-            - Surveillance en temps réel du statut des émetteurs
-            - Analyse de la qualité du signal
-            - Planification des maintenances
-            
-            **Données affichées:**
-            - Localisation géographique précise
-            - Fréquences et puissances d'émission
-            - Statut opérationnel
-            - Historique de maintenance
-            
-            **⚠️ Avertissement:** 
-            Les données présentées sont simulées pour la démonstration.
-            Les coordonnées et informations techniques sont des exemples.
-            """)
-            
-            st.markdown("---")
-            st.markdown("""
-            **📞 Contact:**
-            - Service technique: tech@freedomradio.re
-            - Urgence: +262 262 123 456
-            - Siège: Saint-Denis, La Réunion
-            """)
+        with profiler.section('metriques'):
+            self.display_key_metrics()
+        
+        # Navigation: seule la vue sélectionnée est construite à chaque rerun
+        view = st.segmented_control("Vue", DASHBOARD_VIEWS, default=DASHBOARD_VIEWS[0],
+                                    key='vue_active', label_visibility='collapsed') or DASHBOARD_VIEWS[0]
+        
+        if view == "🗺️ Carte":
+            with profiler.section('carte'):
+                self.create_map_view(controls['show_coverage'], controls['show_interference'],
+                                     controls['show_heatmap'])
+        elif view == "📻 Émetteurs":
+            with profiler.section('emetteurs'):
+                self.create_emitter_details(controls['statuts_selectionnes'])
+        elif view == "📈 Signaux":
+            with profiler.section('signaux'):
+                self.create_signal_analysis(controls['auto_refresh'])
+        elif view == "🔧 Maintenance":
+            with profiler.section('maintenance'):
+                self.create_maintenance_view()
+        else:
+            self.display_about()
+        
+        return controls
+    
+    def display_about(self):
+        """Présentation du dashboard"""
+        st.markdown("## 📋 À propos de ce dashboard")
+        st.markdown("""
+        Ce dashboard présente une vue d'ensemble des 12 émetteurs de radio Freedom 
+        situés sur l'île de La Réunion.
+        
+        **Fonctionnalités:**
+        - Cartographie des émetteurs avec zones de couverture
+        - Surveillance en temps réel du statut des émetteurs
+        - Analyse de la qualité du signal
+        - Planification des maintenances
+        
+        **Données affichées:**
+        - Localisation géographique précise
+        - Fréquences et puissances d'émission
+        - Statut opérationnel
+        - Historique de maintenance
+        
+        **⚠️ Avertissement:** 
+        Les données présentées sont simulées pour la démonstration.
+        Les coordonnées et informations techniques sont des exemples.
+        """)
+        
+        st.markdown("---")
+        st.markdown("""
+        **📞 Contact:**
+        - Service technique: tech@freedomradio.re
+        - Urgence: +262 262 123 456
+        - Siège: Saint-Denis, La Réunion
+        """)
+    
+    def display_debug_panel(self, run):
+        """Durées de ce rerun par section, cumuls du processus et taux de succès des caches"""
+        sections, cache = get_profiler().summary()
+        with st.expander(f"🛠️ Profilage — rerun en {run.duration * 1000:.0f} ms", expanded=True):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**Ce rerun**")
+                st.dataframe(run.frame().round(1), hide_index=True)
+                st.markdown("**Caches**")
+                st.dataframe(cache.round(3), hide_index=True)
+            with col2:
+                st.markdown("**Depuis le démarrage**")
+                st.dataframe(sections.round(1), hide_index=True)
+                st.markdown("**Démarrage du processus**")
+                st.dataframe(get_profiler().startup_frame().round(3), hide_index=True)
+
+
+def load_dashboard_data():
+    """Chargeur du magasin partagé: émetteurs enregistrés (tirés au premier chargement) et historique simulé"""
+    if FLEET_DIR:
+        return load_generated_fleet(FLEET_DIR)
+    # Sites tirés une seule fois puis conservés: d'une version à l'autre, seules les tuiles des
+    # émetteurs réellement modifiés sont recalculées; l'historique simulé est, lui, régénéré
+    saved = read_emitters()
+    dashboard = RadioEmitterDashboard(emitters=saved)
+    signal_store = SignalStore(SIGNAL_STORE_DIR)
+    signal_store.write(dashboard.signal_data)
+    if saved is None:
+        # Table relue telle quelle par les outils en ligne de commande (fleet_data.load_saved_data)
+        save_emitters(dashboard.emitters)
+    get_maintenance_store().seed(dashboard.emitters)
+    # Agrégats de cette version tenus à jour par la télémétrie temps réel
+    dashboard.rollups.follow(get_telemetry_ingestor())
+    # Alertes des émetteurs sortis de la flotte levées
+    get_alert_engine(get_telemetry_ingestor()).retain(dashboard.emitters['id'])
+    return {'emitters': dashboard.emitters, 'signal_store': signal_store, 'rollups': dashboard.rollups}
+
+
+def load_generated_fleet(path, rollup_days=FLEET_ROLLUP_DAYS):
+    """Chargeur du magasin partagé sur une flotte générée: volumes de production, historique laissé sur disque"""
+    from generate_fleet import load_fleet  # import différé: seulement pour les tests de charge
+    
+    emitters, signal_store = load_fleet(path)
+    rollups = rollups_from_store(signal_store, rollup_days)
+    get_maintenance_store().seed(emitters)
+    rollups.follow(get_telemetry_ingestor())
+    get_alert_engine(get_telemetry_ingestor()).retain(emitters['id'])
+    return {'emitters': emitters, 'signal_store': signal_store, 'rollups': rollups}
+
+
+def prewarm(store):
+    """Construit d'avance les données partagées et les caches de la vue par défaut"""
+    dashboard = RadioEmitterDashboard(store)
+    # Même période que les valeurs par défaut de la barre latérale
+    now = pd.Timestamp.now()
+    dashboard.date_range = ((now - pd.Timedelta(days=7)).date(), now.date())
+    dashboard.get_map_layers()
+    dashboard.get_interference_layer()
+    dashboard.get_coverage_index()
+    dashboard.get_coverage_tiles()
+    # Carte de la vue par défaut (chaleur et conflits affichés, cercles masqués)
+    dashboard.get_map_payload(show_coverage=False, show_interference=True, show_heatmap=True)
+    dashboard.get_query_engine()
+    dashboard.get_signal_index()
+    get_alert_engine(get_telemetry_ingestor())
+    # Bibliothèques des graphiques et de la carte chargées hors du chemin du premier rendu
+    import plotly.express  # noqa: F401
+    import streamlit_folium  # noqa: F401
+    return dashboard
 
 # Lancement du dashboard
 if __name__ == "__main__":
-    dashboard = RadioEmitterDashboard()
+    configure_page()
+    store = get_data_store('dashboard', load_dashboard_data, ttl_seconds=DATA_TTL_SECONDS)
+    # Suivi de la télémétrie et évaluation des alertes en tâche de fond, une fois par processus
+    get_alert_engine(get_telemetry_ingestor())
+    start_exporters()  # /metrics et/ou fichier Prometheus si configurés
+    # Démarrage à froid sans préchauffage: la page affiche l'attente plutôt qu'un écran vide
+    with st.spinner("Préparation des données des émetteurs..."):
+        dashboard = RadioEmitterDashboard(store)
     dashboard.run_dashboard()
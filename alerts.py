@@ -0,0 +1,257 @@
+# alerts.py
+"""Moteur d'alertes sur fenêtres glissantes, évalué pour tous les émetteurs à la fois"""
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# Échantillons par fenêtre glissante
+DEFAULT_WINDOW = 30
+# Lissage exponentiel de la référence (≈ 10 min à 1 Hz)
+BASELINE_SPAN = 600
+# Un émetteur muet depuis plus longtemps ne compte plus d'alerte active (horodatages epoch)
+STALE_AFTER_SECONDS = 300
+
+# type 'seuil': moyenne glissante hors de [min, max]
+# type 'variation': pente sur la fenêtre (unités/min) hors de [min, max]
+# type 'ecart': moyenne glissante à plus de `sigmas` écarts-types de la référence
+ALERT_RULES = [
+    {'nom': 'Qualité basse', 'metrique': 'qualite', 'type': 'seuil', 'min': 60.0},
+    {'nom': 'Chute de qualité', 'metrique': 'qualite', 'type': 'variation', 'min': -30.0},
+    {'nom': 'Dérive de qualité', 'metrique': 'qualite', 'type': 'ecart', 'sigmas': 4.0},
+    {'nom': 'Puissance anormale', 'metrique': 'puissance', 'type': 'ecart', 'sigmas': 4.0},
+]
+
+METRICS = ('qualite', 'puissance')
+
+
+class AlertEngine:
+    """Évaluation incrémentale des règles d'alerte
+
+    Chaque lot reçu met à jour, en opérations vectorisées, des sommes
+    glissantes et des références lissées par émetteur: seuls les nouveaux
+    échantillons sont traités, le coût ne dépend pas de l'historique.
+    Les alertes d'un émetteur muet depuis `stale_after` secondes, ou
+    retiré de la flotte (`retain`), sont levées.
+    """
+
+    def __init__(self, rules=ALERT_RULES, window=DEFAULT_WINDOW, baseline_span=BASELINE_SPAN,
+                 stale_after=STALE_AFTER_SECONDS):
+        self.rules = list(rules)
+        self.window = window
+        self.stale_after = stale_after
+        self.alpha = 2.0 / (baseline_span + 1)
+        self.emitter_ids = []
+        self._index = {}
+        n_rules = len(self.rules)
+        self.win_t = np.zeros((0, window))
+        self.win = {m: np.zeros((0, window)) for m in METRICS}
+        self.sums = {m: np.zeros(0) for m in METRICS}
+        self.base_mean = {m: np.zeros(0) for m in METRICS}
+        self.base_var = {m: np.zeros(0) for m in METRICS}
+        self.head = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.seen = np.zeros(0, dtype=np.int64)
+        self.active = np.zeros((0, n_rules), dtype=bool)
+        self.since = np.zeros((0, n_rules))
+        self.value = np.zeros((0, n_rules))
+        self.evaluated = 0
+        self._lock = threading.Lock()
+
+    def update(self, batch):
+        """Intègre un lot de télémétrie (colonnes t, emitter_id, qualite, puissance)"""
+        if len(batch) == 0:
+            return
+        with self._lock:
+            codes, uniques = pd.factorize(batch['emitter_id'].to_numpy())
+            self._add_emitters([e for e in uniques if e not in self._index])
+            rows = np.array([self._index[e] for e in uniques], dtype=np.int64)[codes]
+            t = batch['t'].to_numpy(dtype=float)
+            values = {m: batch[m].to_numpy(dtype=float) for m in METRICS}
+
+            # Échantillons regroupés par émetteur (ordre chronologique conservé) et rang de chacun
+            order = np.argsort(rows, kind='stable')
+            rows, t = rows[order], t[order]
+            values = {m: v[order] for m, v in values.items()}
+            starts = np.searchsorted(rows, rows, side='left')
+            rank = np.arange(len(rows)) - starts
+            touched, n_new = np.unique(rows, return_counts=True)
+            last = np.cumsum(n_new) - 1
+
+            self._push(rows, rank, touched, n_new, last, t, values)
+            self._evaluate(touched)
+            self.evaluated += len(batch)
+
+    def _push(self, rows, rank, touched, n_new, last, t, values):
+        """Intègre des échantillons groupés par émetteur, sans boucle sur le temps
+
+        Fenêtres: seuls les `window` derniers échantillons de chaque émetteur
+        sont écrits, à leur place dans le tampon. Références: les récurrences
+        linéaires de la moyenne et de la variance exponentielles sont
+        résolues par balayage préfixe (`_linear_scan`).
+        """
+        segment = np.repeat(np.arange(len(touched)), n_new)
+        keep = rank >= n_new[segment] - self.window
+        cols = (self.head[rows] + rank) % self.window
+        decay = 1.0 - self.alpha
+        growth = decay ** (rank + 1)
+        unseen = self.seen[touched] == 0
+        for metric, x in values.items():
+            win = self.win[metric]
+            win[rows[keep], cols[keep]] = x[keep]
+            self.sums[metric][touched] = win[touched].sum(axis=1)
+
+            # Moyenne: m_k = (1 - a) m_(k-1) + a x_k, un émetteur nouveau partant de son premier échantillon
+            prev_mean = np.where(unseen, x[last - n_new + 1], self.base_mean[metric][touched])
+            mean = _linear_scan(self.alpha * x, rank, decay) + growth * prev_mean[segment]
+            # Variance: v_k = (1 - a) (v_(k-1) + a (x_k - m_(k-1))^2)
+            before = np.where(rank == 0, prev_mean[segment], np.roll(mean, 1))
+            var = (_linear_scan(decay * self.alpha * (x - before) ** 2, rank, decay)
+                   + growth * self.base_var[metric][touched][segment])
+            self.base_mean[metric][touched] = mean[last]
+            self.base_var[metric][touched] = var[last]
+        self.win_t[rows[keep], cols[keep]] = t[keep]
+        self.head[touched] = (self.head[touched] + n_new) % self.window
+        self.count[touched] = np.minimum(self.count[touched] + n_new, self.window)
+        self.seen[touched] += n_new
+
+    def _evaluate(self, rows):
+        count = self.count[rows]
+        newest = (self.head[rows] - 1) % self.window
+        oldest = (self.head[rows] - count) % self.window
+        span_min = (self.win_t[rows, newest] - self.win_t[rows, oldest]) / 60.0
+        warm = count >= self.window // 2
+        now = self.win_t[rows, newest]
+
+        for j, rule in enumerate(self.rules):
+            metric = rule['metrique']
+            mean = self.sums[metric][rows] / np.maximum(count, 1)
+            if rule['type'] == 'seuil':
+                value = mean
+                firing = warm & ((value < rule.get('min', -np.inf)) | (value > rule.get('max', np.inf)))
+            elif rule['type'] == 'variation':
+                win = self.win[metric]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    value = np.where(span_min > 0, (win[rows, newest] - win[rows, oldest]) / span_min, 0.0)
+                firing = warm & ((value < rule.get('min', -np.inf)) | (value > rule.get('max', np.inf)))
+            else:
+                std = np.sqrt(self.base_var[metric][rows])
+                value = (mean - self.base_mean[metric][rows]) / np.maximum(std, 1e-6)
+                firing = (self.seen[rows] >= 2 * self.window) & (np.abs(value) > rule['sigmas'])
+
+            started = firing & ~self.active[rows, j]
+            self.since[rows[started], j] = now[started]
+            self.active[rows, j] = firing
+            self.value[rows, j] = value
+
+    def retain(self, emitter_ids):
+        """Oublie l'état des émetteurs absents de `emitter_ids` (retirés de la flotte)
+
+        Leurs alertes sont levées; s'ils réapparaissent, fenêtres et
+        références repartent de zéro.
+        """
+        with self._lock:
+            gone = ~np.isin(np.asarray(self.emitter_ids, dtype=object), np.asarray(emitter_ids, dtype=object))
+            if not gone.any():
+                return
+            self.active[gone] = False
+            self.count[gone] = 0
+            self.seen[gone] = 0
+            self.head[gone] = 0
+            self.win_t[gone] = 0.0
+            for metric in METRICS:
+                self.win[metric][gone] = 0.0
+                self.sums[metric][gone] = 0.0
+                self.base_mean[metric][gone] = 0.0
+                self.base_var[metric][gone] = 0.0
+
+    def _expire(self, now):
+        """Lève les alertes des émetteurs sans échantillon depuis `stale_after` secondes"""
+        now = time.time() if now is None else now
+        newest = self.win_t[np.arange(len(self.head)), (self.head - 1) % self.window]
+        self.active[newest < now - self.stale_after] = False
+
+    def active_count(self, now=None):
+        with self._lock:
+            self._expire(now)
+            return int(self.active.sum())
+
+    def active_alerts(self, now=None):
+        """Alertes en cours: émetteur, règle, valeur mesurée, début"""
+        with self._lock:
+            self._expire(now)
+            rows, rules = np.nonzero(self.active)
+            return pd.DataFrame({
+                'emitter_id': [self.emitter_ids[i] for i in rows],
+                'regle': [self.rules[j]['nom'] for j in rules],
+                'valeur': self.value[rows, rules],
+                'depuis': pd.to_datetime(self.since[rows, rules], unit='s')
+            })
+
+    def _add_emitters(self, new_ids):
+        if not new_ids:
+            return
+        for emitter_id in new_ids:
+            self._index[emitter_id] = len(self.emitter_ids)
+            self.emitter_ids.append(emitter_id)
+        extra = len(new_ids)
+        n_rules = len(self.rules)
+        self.win_t = np.vstack([self.win_t, np.zeros((extra, self.window))])
+        for metric in METRICS:
+            self.win[metric] = np.vstack([self.win[metric], np.zeros((extra, self.window))])
+            self.sums[metric] = np.concatenate([self.sums[metric], np.zeros(extra)])
+            self.base_mean[metric] = np.concatenate([self.base_mean[metric], np.zeros(extra)])
+            self.base_var[metric] = np.concatenate([self.base_var[metric], np.zeros(extra)])
+        self.head = np.concatenate([self.head, np.zeros(extra, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.seen = np.concatenate([self.seen, np.zeros(extra, dtype=np.int64)])
+        self.active = np.vstack([self.active, np.zeros((extra, n_rules), dtype=bool)])
+        self.since = np.vstack([self.since, np.zeros((extra, n_rules))])
+        self.value = np.vstack([self.value, np.zeros((extra, n_rules))])
+
+
+def _linear_scan(b, rank, decay):
+    """y_k = decay * y_(k-1) + b_k au sein de chaque émetteur (rang 0 en tête, y_(-1) = 0)
+
+    Balayage préfixe de Hillis-Steele: log2(rang maximal) passes vectorisées.
+    """
+    y = np.array(b, dtype=np.float64)
+    shift = 1
+    top = int(rank.max()) if len(rank) else 0
+    while shift <= top:
+        inside = rank[shift:] >= shift
+        y[shift:] = np.where(inside, y[shift:] + decay ** shift * y[:-shift], y[shift:])
+        shift *= 2
+    return y
+
+
+def buffered_batch(buffers, window):
+    """Contenu récent des tampons circulaires sous forme de lot chronologique"""
+    t, qualite, puissance, valid = buffers.window_matrix(window)
+    ids = np.asarray(buffers.emitter_ids, dtype=object)
+    mask = np.arange(t.shape[1])[None, :] >= t.shape[1] - valid[:, None]
+    batch = pd.DataFrame({
+        't': t[mask],
+        'emitter_id': np.broadcast_to(ids[:, None], t.shape)[mask],
+        'qualite': qualite[mask],
+        'puissance': puissance[mask]
+    })
+    return batch.sort_values('t', kind='stable')
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_alert_engine(ingestor):
+    """Moteur d'alertes abonné une seule fois à un ingesteur de télémétrie"""
+    with _engines_lock:
+        key = id(ingestor)
+        if key not in _engines:
+            engine = AlertEngine()
+            # Amorçage sur les tampons existants et abonnement aux lots suivants, sans lot intercalé
+            ingestor.subscribe('alerts', engine.update,
+                               prime=lambda buffers: engine.update(buffered_batch(buffers, BASELINE_SPAN)))
+            _engines[key] = engine
+        return _engines[key]
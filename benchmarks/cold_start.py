@@ -0,0 +1,62 @@
+# benchmarks/cold_start.py
+"""Mesure du démarrage à froid: imports, préchauffage et premier rendu, chacun dans un processus neuf
+
+Usage:
+    python benchmarks/cold_start.py
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD_PATH = os.path.join(ROOT, 'Dashboard.py')
+# Bibliothèques dont le chargement doit rester différé jusqu'à la première vue qui les utilise
+DEFERRED_MODULES = ('plotly.express', 'folium', 'streamlit_folium')
+
+
+def child(prewarm):
+    """Un démarrage complet mesuré dans ce processus; résultat en JSON sur stdout"""
+    os.environ['FREEDOM_START_TIME'] = repr(time.time())
+    sys.path.insert(0, ROOT)
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    import Dashboard
+    from data_store import get_data_store
+    from profiling import get_profiler
+
+    result = {'import_s': time.perf_counter() - started,
+              'differes_charges': [m for m in DEFERRED_MODULES if m in sys.modules]}
+    if prewarm:
+        started = time.perf_counter()
+        Dashboard.prewarm(get_data_store('dashboard', Dashboard.load_dashboard_data,
+                                         ttl_seconds=Dashboard.DATA_TTL_SECONDS))
+        get_profiler().record_startup('prechauffage', time.perf_counter() - started)
+
+    AppTest.from_file(DASHBOARD_PATH, default_timeout=300).run()
+    result.update(get_profiler().startup)
+    print(json.dumps(result))
+
+
+def main():
+    rows = []
+    for prewarm in (False, True):
+        out = subprocess.run([sys.executable, __file__, '--child', '1' if prewarm else '0'],
+                             capture_output=True, text=True, check=True, cwd=ROOT)
+        row = json.loads(out.stdout.strip().splitlines()[-1])
+        rows.append(row)
+        print(f"{'préchauffé' if prewarm else 'à froid':<11} import {row['import_s']:6.2f} s  "
+              f"préchauffage {row.get('prechauffage', 0.0):6.2f} s  "
+              f"première exécution {row['premiere_execution']:6.2f} s  "
+              f"premier rendu {row['premier_rendu']:6.2f} s  "
+              f"(différés chargés à l'import: {', '.join(row['differes_charges']) or 'aucun'})")
+    return 1 if any(row['differes_charges'] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        child(sys.argv[2] == '1')
+    else:
+        sys.exit(main())
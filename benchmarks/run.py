@@ -0,0 +1,347 @@
+# benchmarks/run.py
+"""Banc de mesure des calculs et rendus du dashboard sur des flottes synthétiques
+
+Usage:
+    python benchmarks/run.py                       # compare aux références enregistrées
+    python benchmarks/run.py --sizes 12,1000       # tailles de flotte choisies
+    python benchmarks/run.py --update-baseline     # enregistre les nouvelles références
+    python benchmarks/run.py --fleet data/flotte-10k  # flotte générée par generate_fleet.py
+"""
+import argparse
+import gc
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Exécution hors `streamlit run`: les appels st.* sont inertes, leurs avertissements inutiles
+logging.getLogger('streamlit').setLevel(logging.ERROR)
+
+import plotly.express as px  # noqa: E402
+
+from charts import line_figure  # noqa: E402
+from coverage import EARTH_RADIUS_KM, REUNION_BOUNDS  # noqa: E402
+from coverage_query import CoverageIndex  # noqa: E402
+from Dashboard import RadioEmitterDashboard  # noqa: E402
+from data_store import DataStore  # noqa: E402
+from emitter_query import POWER_FILTERS, SORT_KEYS, EmitterQueryEngine  # noqa: E402
+from generate_fleet import load_fleet  # noqa: E402
+from interference import InterferenceAnalyzer  # noqa: E402
+from map_layers import EmitterMapBuilder  # noqa: E402
+from rollups import SignalRollups  # noqa: E402
+from signals import EMITTER_DTYPES, generate_signal_history, signal_instants  # noqa: E402
+from tiles import CoverageTilePyramid  # noqa: E402
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+DEFAULT_SIZES = [12, 1000, 10000, 100000]
+
+# Régression: plus lent ou plus gourmand que la référence au-delà de ce facteur
+DEFAULT_TOLERANCE = 1.5
+# En dessous de ces valeurs, les écarts relèvent du bruit de mesure
+MIN_SECONDS = 0.01
+MIN_PEAK_MB = 1.0
+
+# Charge de calibration (tri NumPy, boucle Python, factorisation pandas): les références sont
+# rapportées à la vitesse de la machine qui les a enregistrées
+CALIBRATION_SIZE = 1_000_000
+CALIBRATION_REPEATS = 5
+
+# Zones synthétiques: rayon ∝ √puissance, dimensionné pour que chaque point de l'emprise soit
+# couvert en moyenne par COVERAGE_OVERLAP émetteurs, quelle que soit la taille de la flotte
+COVERAGE_OVERLAP = 3
+
+# Points par requête de couverture par lot
+POINT_QUERY_SIZE = 100_000
+
+# Courbes superposées du graphique de signal (historique à la minute)
+CHART_SERIES = 5
+
+
+def synthetic_fleet(n, seed=0):
+    """Flotte de `n` émetteurs répartis sur l'emprise de La Réunion, mêmes colonnes que la flotte réelle
+
+    Les rayons de couverture suivent la densité de la flotte (recouvrement
+    moyen constant): une flotte dense a des zones plus petites, comme un
+    réseau réel, et la taille des résultats croît comme n, non comme n².
+    """
+    rng = np.random.default_rng(seed)
+    lat_min, lat_max, lon_min, lon_max = REUNION_BOUNDS
+    power = rng.choice([100, 250, 500, 1000, 2000, 5000], n)
+    spread = rng.uniform(0.8, 1.2, n)
+    area_km2 = ((lat_max - lat_min) * np.radians(EARTH_RADIUS_KM)
+                * (lon_max - lon_min) * np.radians(EARTH_RADIUS_KM) * np.cos(np.radians((lat_min + lat_max) / 2)))
+    scale = np.sqrt(COVERAGE_OVERLAP * area_km2 / (np.pi * np.sum(power * spread ** 2)))
+    fleet = pd.DataFrame({
+        'id': [f"FR_{i:06d}" for i in range(1, n + 1)],
+        'id_original': [f"FR-{i:06d}" for i in range(1, n + 1)],
+        'nom': [f"Freedom Radio - Site {i}" for i in range(1, n + 1)],
+        'ville': rng.choice(['Saint-Denis', 'Saint-Paul', 'Saint-Pierre', 'Le Tampon', 'Cilaos'], n),
+        'latitude': rng.uniform(lat_min, lat_max, n),
+        'longitude': rng.uniform(lon_min, lon_max, n),
+        'frequence': np.round(rng.uniform(88.0, 108.0, n), 1),
+        'puissance': power,
+        'altitude': rng.integers(100, 1500, n),
+        'date_installation': pd.Timestamp('2005-01-01') + pd.to_timedelta(rng.integers(0, 6500, n), unit='D'),
+        'statut': rng.choice(['Actif', 'Actif', 'Actif', 'Maintenance', 'Inactif'], n),
+        'couverture': np.round(scale * np.sqrt(power) * spread, 2),
+        'technicien': [f"Tech-{i:02d}" for i in rng.integers(1, 6, n)],
+        'derniere_maintenance': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 700, n), unit='D')
+    })
+    return fleet.astype(EMITTER_DTYPES)
+
+
+def fleet_dashboard(fleet):
+    """Dashboard branché sur une flotte donnée, sans historique ni cache préalable"""
+    store = DataStore(lambda: {'emitters': fleet, 'signal_store': None, 'rollups': SignalRollups()},
+                      ttl_seconds=None)
+    return RadioEmitterDashboard(store)
+
+
+# Chaque cas prépare (hors mesure) et renvoie la fonction à mesurer
+def case_initialize_emitters(fleet):
+    dashboard = fleet_dashboard(fleet)
+    return dashboard.initialize_emitters
+
+
+def case_initialize_signal_data(fleet):
+    dashboard = fleet_dashboard(fleet)
+    return lambda: dashboard.initialize_signal_data(fleet)
+
+
+def case_coverage_heatmap(fleet):
+    dashboard = fleet_dashboard(fleet)
+
+    def run():
+        raster = dashboard.get_coverage_raster()
+        return px.imshow(raster.signal, x=raster.lons, y=raster.lats, origin='lower',
+                         aspect='auto', zmin=0, zmax=100, color_continuous_scale='Viridis')
+    return run
+
+
+def case_map_build(fleet):
+    dashboard = fleet_dashboard(fleet)
+    # Zones de couverture masquées comme dans la barre latérale (conflits et tuiles: cas dédiés)
+    return lambda: dashboard.get_map_payload()
+
+
+def case_emitter_filters(fleet):
+    statuses = set(fleet['statut'].unique())
+
+    def run():
+        engine = EmitterQueryEngine(fleet)
+        for power_filter in POWER_FILTERS:
+            for sort_by in SORT_KEYS:
+                for subset in (statuses, {'Actif'}):
+                    positions = engine.query(subset, power_filter, sort_by)
+                    engine.page(positions, 1, 10)
+        return engine
+    return run
+
+
+def case_maintenance_schedule(fleet):
+    dashboard = fleet_dashboard(fleet)
+    return dashboard.build_maintenance_schedule
+
+
+def case_interference(fleet):
+    return lambda: InterferenceAnalyzer().analyze_for(fleet)
+
+
+def case_point_query(fleet):
+    rng = np.random.default_rng(0)
+    lat_min, lat_max, lon_min, lon_max = REUNION_BOUNDS
+    lats = rng.uniform(lat_min, lat_max, POINT_QUERY_SIZE)
+    lons = rng.uniform(lon_min, lon_max, POINT_QUERY_SIZE)
+    index = CoverageIndex(fleet)
+    return lambda: index.query(lats, lons, max_results=5)
+
+
+def case_signal_chart(fleet):
+    # Taille = jours d'historique à la minute de chaque courbe (et non nombre d'émetteurs)
+    history = generate_signal_history(fleet.head(CHART_SERIES), days=len(fleet), interval_minutes=1,
+                                      rng=np.random.default_rng(0))
+    frame = pd.DataFrame({'instant': signal_instants(history), 'qualite': history['qualite'].to_numpy(),
+                          'display_id': history['emitter_id'].to_numpy()})
+    return lambda: line_figure(frame, 'instant', 'qualite', color='display_id', y_range=(0, 100))[0].to_json()
+
+
+def case_coverage_tiles(fleet):
+    root = tempfile.mkdtemp(prefix='tuiles-')
+
+    def run():
+        # Pyramide complète, depuis un dossier vide
+        shutil.rmtree(root, ignore_errors=True)
+        return CoverageTilePyramid(root).update(fleet)
+    return run
+
+
+def case_coverage_tiles_update(fleet):
+    # Un émetteur local (4 km) dont le rayon passe à 2 km puis revient: seules ses tuiles sont refaites
+    base = fleet.copy()
+    base.loc[base.index[0], ['statut', 'couverture']] = ['Actif', 4.0]
+    pyramid = CoverageTilePyramid(tempfile.mkdtemp(prefix='tuiles-'))
+    pyramid.update(base)
+    changed = base.copy()
+    state = {'flip': False}
+
+    def run():
+        state['flip'] = not state['flip']
+        changed.loc[changed.index[0], 'couverture'] = 2.0 if state['flip'] else 4.0
+        return pyramid.update(changed)
+    return run
+
+
+# nom -> (préparation, tailles de flotte retenues; None = toutes)
+CASES = {
+    # Toujours les 12 sites réels: la taille de flotte ne s'applique pas
+    'initialize_emitters': (case_initialize_emitters, [12]),
+    'initialize_signal_data': (case_initialize_signal_data, None),
+    'coverage_heatmap': (case_coverage_heatmap, None),
+    'map_build': (case_map_build, None),
+    'emitter_filters': (case_emitter_filters, None),
+    'maintenance_schedule': (case_maintenance_schedule, None),
+    'interference': (case_interference, None),
+    'point_query': (case_point_query, None),
+    # Jours d'historique à la minute par courbe: la charge envoyée au navigateur reste bornée
+    'signal_chart': (case_signal_chart, [12, 1000]),
+    'coverage_tiles': (case_coverage_tiles, None),
+    'coverage_tiles_update': (case_coverage_tiles_update, None),
+}
+
+
+def measure(prepare, fleet, repeats):
+    """Meilleur temps sur `repeats` exécutions, puis pic mémoire Python/NumPy d'une exécution tracée"""
+    best = float('inf')
+    for _ in range(repeats):
+        run = prepare(fleet)
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+        del run
+
+    run = prepare(fleet)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2 ** 20
+
+
+def calibrate(repeats=CALIBRATION_REPEATS):
+    """Meilleur temps d'une charge fixe: la vitesse de la machine, en secondes"""
+    values = np.random.default_rng(0).random(CALIBRATION_SIZE)
+    labels = (values * 1000).astype(np.int64).astype(str)
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        np.sort(values)
+        pd.factorize(labels)
+        sum(i * i for i in range(CALIBRATION_SIZE // 5))
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def compare(results, baselines, tolerance, calibration):
+    """Résultats annotés de l'écart à la référence; liste des régressions
+
+    Le temps de référence est ramené à la machine courante par le rapport
+    des calibrations (courante / celle de l'enregistrement).
+    """
+    regressions = []
+    for row in results:
+        ref = baselines.get(row['key'])
+        speed = calibration / ref.get('calibration', calibration) if ref else 1.0
+        row['ref_s'] = ref['seconds'] * speed if ref else None
+        row['ref_mb'] = ref['peak_mb'] if ref else None
+        if ref is None:
+            row['verdict'] = 'nouveau'
+            continue
+        slow = row['seconds'] > max(row['ref_s'] * tolerance, MIN_SECONDS)
+        heavy = row['peak_mb'] > max(ref['peak_mb'] * tolerance, MIN_PEAK_MB)
+        row['verdict'] = 'RÉGRESSION' if slow or heavy else 'ok'
+        if slow or heavy:
+            regressions.append(row['key'])
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de mesure du dashboard Freedom Radio")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="tailles de flotte séparées par des virgules")
+    parser.add_argument('--cases', default=','.join(CASES), help="cas à exécuter")
+    parser.add_argument('--repeats', type=int, default=3, help="répétitions (1 seule au-delà de 10 000 émetteurs)")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true', help="enregistre les mesures comme références")
+    parser.add_argument('--fleet', default=None,
+                        help="dossier d'une flotte générée (generate_fleet.py) mesurée à la place des flottes synthétiques")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    names = [n.strip() for n in args.cases.split(',')]
+    unknown = set(names) - set(CASES)
+    if unknown:
+        parser.error(f"cas inconnus: {', '.join(sorted(unknown))}")
+
+    if args.fleet:
+        # Flotte générée: références propres au dossier; les cas à tailles imposées ne s'appliquent pas
+        fleet = load_fleet(args.fleet)[0]
+        fleets = [(f"{len(fleet)}:{os.path.basename(os.path.normpath(args.fleet))}", fleet, None)]
+    else:
+        fleets = ((str(size), synthetic_fleet(size), size) for size in sizes)
+
+    calibration = calibrate()
+    print(f"Calibration: {calibration * 1000:.1f} ms", flush=True)
+
+    results = []
+    for label, fleet, size in fleets:
+        for name in names:
+            prepare, allowed = CASES[name]
+            if allowed is not None and size not in allowed:
+                continue
+            repeats = 1 if len(fleet) > 10000 else args.repeats
+            seconds, peak_mb = measure(prepare, fleet, repeats)
+            results.append({'key': f"{name}@{label}", 'cas': name, 'emetteurs': len(fleet),
+                            'seconds': seconds, 'peak_mb': peak_mb})
+            print(f"{name:<24} {len(fleet):>7} émetteurs  {seconds * 1000:10.1f} ms  {peak_mb:9.1f} Mo", flush=True)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    if args.update_baseline:
+        for row in results:
+            baselines[row['key']] = {'seconds': round(row['seconds'], 6), 'peak_mb': round(row['peak_mb'], 3),
+                                     'calibration': round(calibration, 6)}
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(sorted(baselines.items())), f, indent=2)
+        print(f"\n{len(results)} référence(s) enregistrée(s) dans {args.baseline}")
+        return 0
+
+    regressions = compare(results, baselines, args.tolerance, calibration)
+    report = pd.DataFrame(results)[['cas', 'emetteurs', 'seconds', 'ref_s', 'peak_mb', 'ref_mb', 'verdict']]
+    print()
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    if regressions:
+        print(f"\n{len(regressions)} régression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
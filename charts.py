@@ -0,0 +1,129 @@
+# charts.py
+"""Courbes temporelles à charge bornée: sous-échantillonnage fidèle à la forme et tracés WebGL"""
+import numpy as np
+import pandas as pd
+
+# Largeur de tracé visée (pixels): au plus un point affiché par pixel et par courbe
+DEFAULT_WIDTH_PX = 1200
+# Au-delà de ce nombre de points affichés, les courbes passent en WebGL (Scattergl)
+WEBGL_THRESHOLD = 5000
+# Présélection min/max avant LTTB: points conservés par point final
+MINMAX_RATIO = 4
+
+
+def minmax_indices(y, n_buckets):
+    """Indices du minimum et du maximum de chaque tranche (vectorisé, extrêmes conservés)"""
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    # Tranches de taille égale (la dernière complétée par des NaN): un seul argmin/argmax par axe
+    size = -(-n // n_buckets)
+    rows = -(-n // size)
+    padded = np.full(rows * size, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(rows, size)
+    base = np.arange(rows) * size
+    # Tranches entièrement vides (trou de mesure): écartées plutôt que de faire échouer nanargmin
+    missing = np.isnan(blocks)
+    filled = ~missing.all(axis=1)
+    lowest = np.where(missing, np.inf, blocks).argmin(axis=1)
+    highest = np.where(missing, -np.inf, blocks).argmax(axis=1)
+    return np.unique(np.concatenate([(base + lowest)[filled], (base + highest)[filled], [0, n - 1]]))
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-Triangle-Three-Buckets: indices des `n_out` points qui préservent le mieux la forme"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # Moyenne de chaque tranche, calculée d'avance pour le « troisième » point du triangle
+    counts = np.maximum(np.diff(edges), 1)
+    mean_x = np.add.reduceat(x[:n - 1], edges[:-1]) / counts
+    mean_y = np.add.reduceat(y[:n - 1], edges[:-1]) / counts
+    mean_x = np.append(mean_x[1:], x[-1])
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], max(edges[b + 1], edges[b] + 1)
+        px, py = x[previous], y[previous]
+        area = np.abs((px - mean_x[b]) * (y[lo:hi] - py) - (px - x[lo:hi]) * (mean_y[b] - py))
+        previous = lo + int(np.argmax(area))
+        selected[b + 1] = previous
+    return selected
+
+
+def downsample_indices(x, y, n_out):
+    """MinMax puis LTTB: extrêmes garantis, coût linéaire même pour de très longues séries
+
+    Les points non finis (mesures manquantes) sont écartés avant la réduction.
+    """
+    finite = np.isfinite(y)
+    if not finite.all():
+        kept = np.flatnonzero(finite)
+        return kept[downsample_indices(x[kept], y[kept], n_out)]
+    if len(x) <= n_out:
+        return np.arange(len(x))
+    candidates = minmax_indices(y, max(n_out * MINMAX_RATIO // 2, 1))
+    keep = lttb_indices(x[candidates], y[candidates], n_out)
+    return candidates[keep]
+
+
+def series_window(t, start=None, end=None):
+    """Bornes (lo, hi) des lignes d'une série triée comprises dans [start, end]"""
+    lo = 0 if start is None else int(np.searchsorted(t, start, side='left'))
+    hi = len(t) if end is None else int(np.searchsorted(t, end, side='right'))
+    return lo, hi
+
+
+def line_figure(frame, x, y, color=None, title=None, labels=None, width_px=DEFAULT_WIDTH_PX,
+                x_range=None, y_range=None):
+    """Figure plotly en lignes, une courbe par valeur de `color`, chacune réduite à `width_px` points
+
+    Seule la fenêtre `x_range` est tracée (zoom relu côté serveur): le
+    volume envoyé au navigateur ne dépend que de la largeur et du nombre
+    de courbes, jamais de la longueur de l'historique. Renvoie la figure
+    et le nombre de points (disponibles, affichés).
+    """
+    import plotly.graph_objects as go  # import différé: chargé au premier graphique affiché
+
+    labels = labels or {}
+    if x_range is not None and pd.api.types.is_datetime64_any_dtype(frame[x]):
+        x_range = tuple(None if v is None else pd.Timestamp(v).to_datetime64() for v in x_range)
+    groups = frame.groupby(color, observed=True, sort=True) if color else [(None, frame)]
+    series = []
+    available = 0
+    for name, group in groups:
+        t = group[x].to_numpy()
+        values = group[y].to_numpy(dtype=np.float64)
+        if len(t) > 1 and np.any(t[1:] < t[:-1]):
+            order = np.argsort(t, kind='stable')
+            t, values = t[order], values[order]
+        lo, hi = series_window(t, *(x_range or (None, None)))
+        t, values = t[lo:hi], values[lo:hi]
+        available += len(t)
+        keep = downsample_indices(_as_float(t), values, width_px)
+        series.append((name, t[keep], values[keep]))
+
+    shown = sum(len(v) for _, _, v in series)
+    trace = go.Scattergl if shown > WEBGL_THRESHOLD else go.Scatter
+    fig = go.Figure([trace(x=t, y=v, mode='lines', name=str(name) if name is not None else y,
+                           showlegend=name is not None) for name, t, v in series])
+    fig.update_layout(title=title, xaxis_title=labels.get(x, x), yaxis_title=labels.get(y, y),
+                      legend_title_text=labels.get(color, color) if color else None)
+    if y_range is not None:
+        fig.update_layout(yaxis_range=list(y_range))
+    if x_range is not None and None not in x_range:
+        fig.update_layout(xaxis_range=list(x_range))
+    return fig, (available, shown)
+
+
+def _as_float(t):
+    if np.issubdtype(t.dtype, np.datetime64):
+        return t.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return np.asarray(t, dtype=np.float64)
@@ -0,0 +1,202 @@
+# coverage.py
+"""Moteur de calcul de la couverture radio sur une grille géographique"""
+import numpy as np
+import pandas as pd
+
+# Rayon terrestre moyen (km)
+EARTH_RADIUS_KM = 6371.0088
+
+# Emprise de La Réunion utilisée par la carte de chaleur
+REUNION_BOUNDS = (-21.4, -20.8, 55.2, 55.7)  # lat_min, lat_max, lon_min, lon_max
+
+# Contour simplifié du littoral de La Réunion (latitude, longitude), dans le sens horaire depuis Saint-Denis
+REUNION_OUTLINE = (
+    (-20.862, 55.448), (-20.872, 55.540), (-20.868, 55.625), (-20.950, 55.670), (-21.030, 55.720),
+    (-21.110, 55.780), (-21.200, 55.825), (-21.290, 55.805), (-21.365, 55.750), (-21.385, 55.640),
+    (-21.370, 55.560), (-21.345, 55.480), (-21.300, 55.410), (-21.240, 55.330), (-21.170, 55.280),
+    (-21.080, 55.220), (-21.010, 55.250), (-20.922, 55.268), (-20.898, 55.340), (-20.875, 55.400)
+)
+
+# Coordonnées approximatives des villes principales de La Réunion
+REUNION_CITIES = {
+    'Saint-Denis': (-20.8789, 55.4481),
+    'Saint-Paul': (-21.0073, 55.2854),
+    'Saint-Pierre': (-21.3429, 55.4787),
+    'Le Tampon': (-21.3583, 55.5250),
+    'Saint-André': (-20.9667, 55.6333),
+    'Saint-Louis': (-21.2833, 55.4167),
+    'Sainte-Marie': (-20.9167, 55.5667),
+    'Sainte-Suzanne': (-20.8833, 55.6167),
+    'Le Port': (-20.9333, 55.2833),
+    'La Possession': (-20.9167, 55.3333),
+    'Saint-Joseph': (-21.3667, 55.6167),
+    'Cilaos': (-21.1333, 55.4667)
+}
+
+MAX_GRID_POINTS = 1000
+
+# Nombre maximal d'éléments (lignes x colonnes x émetteurs) calculés par bloc
+DEFAULT_BLOCK_ELEMENTS = 4_000_000
+
+# Côté des tuiles de grille sur lesquelles les émetteurs inutiles sont écartés
+DEFAULT_TILE_SIZE = 64
+
+
+def inside_outline(lat, lon, outline=REUNION_OUTLINE):
+    """Points (degrés) situés à l'intérieur d'un contour polygonal (lancer de rayon vectorisé)"""
+    vertices = np.asarray(outline, dtype=np.float64)
+    lat0, lon0 = vertices[:, 0], vertices[:, 1]
+    lat1, lon1 = np.roll(lat0, -1), np.roll(lon0, -1)
+    lat = np.asarray(lat, dtype=np.float64)[:, None]
+    lon = np.asarray(lon, dtype=np.float64)[:, None]
+    crosses = (lat0 > lat) != (lat1 > lat)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lon_at = lon0 + (lat - lat0) * (lon1 - lon0) / (lat1 - lat0)
+    return (crosses & (lon < lon_at)).sum(axis=1) % 2 == 1
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distance orthodromique en km (vectorisée, entrées en degrés)"""
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = np.radians(lon2) - np.radians(lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class CoverageRaster:
+    """Grille de force du signal (%) réutilisable par les vues"""
+
+    def __init__(self, lats, lons, signal, bounds):
+        self.lats = lats
+        self.lons = lons
+        self.signal = signal  # tableau (len(lats), len(lons))
+        self.bounds = bounds
+
+    @property
+    def shape(self):
+        return self.signal.shape
+
+    def coverage_ratio(self, threshold=0):
+        """Part de la grille dont le signal dépasse le seuil"""
+        return float((self.signal > threshold).mean())
+
+    def to_frame(self):
+        """Format long (lat, lon, signal) comme l'ancienne carte de chaleur"""
+        lat_grid, lon_grid = np.meshgrid(self.lats, self.lons, indexing='ij')
+        return pd.DataFrame({
+            'lat': lat_grid.ravel(),
+            'lon': lon_grid.ravel(),
+            'signal': self.signal.ravel()
+        })
+
+
+class CoverageEngine:
+    """Calcule la carte de couverture de toute une flotte en une passe vectorisée
+
+    Les distances utilisent une projection équirectangulaire locale (latitude
+    moyenne de chaque couple point/émetteur), précise à mieux que 0,1 % à
+    l'échelle de l'île. La grille est traitée par tuiles: seuls les émetteurs
+    capables d'y dominer sont évalués, par blocs de taille bornée pour limiter
+    la mémoire quelle que soit la résolution ou la taille de la flotte.
+    """
+
+    def __init__(self, bounds=REUNION_BOUNDS, block_elements=DEFAULT_BLOCK_ELEMENTS,
+                 tile_size=DEFAULT_TILE_SIZE):
+        self.bounds = bounds
+        self.block_elements = block_elements
+        self.tile_size = tile_size
+
+    def grid(self, grid_points):
+        """Axes de latitude et longitude de la grille"""
+        if np.isscalar(grid_points):
+            n_lat = n_lon = int(grid_points)
+        else:
+            n_lat, n_lon = (int(n) for n in grid_points)
+        if not (2 <= n_lat <= MAX_GRID_POINTS and 2 <= n_lon <= MAX_GRID_POINTS):
+            raise ValueError(f"Résolution de grille invalide: {n_lat}x{n_lon} "
+                             f"(entre 2 et {MAX_GRID_POINTS} points par axe)")
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        return np.linspace(lat_min, lat_max, n_lat), np.linspace(lon_min, lon_max, n_lon)
+
+    def compute(self, latitudes, longitudes, radii_km, grid_points=200):
+        """Force du signal maximale en chaque point: max(0, 100 - 100 * d / rayon)"""
+        lats, lons = self.grid(grid_points)
+        signal = self.compute_on(lats, lons, latitudes, longitudes, radii_km)
+        return CoverageRaster(lats, lons, signal, self.bounds)
+
+    def compute_on(self, lats, lons, latitudes, longitudes, radii_km):
+        """Même calcul sur des axes quelconques (croissants), par exemple les pixels d'une tuile"""
+        signal = np.zeros((len(lats), len(lons)), dtype=np.float32)
+
+        lat_e = np.asarray(latitudes, dtype=np.float64)
+        lon_e = np.asarray(longitudes, dtype=np.float64)
+        radii = np.asarray(radii_km, dtype=np.float64)
+        valid = radii > 0
+        lat_e, lon_e, radii = lat_e[valid], lon_e[valid], radii[valid]
+
+        if len(radii) > 0:
+            self._accumulate(signal, np.asarray(lats), np.asarray(lons), lat_e, lon_e, radii)
+        return signal
+
+    def compute_for(self, emitters, grid_points=200, statuses=('Actif',)):
+        """Raccourci à partir du DataFrame des émetteurs (émetteurs actifs seulement)"""
+        subset = emitters[emitters['statut'].isin(statuses)]
+        return self.compute(subset['latitude'].to_numpy(),
+                            subset['longitude'].to_numpy(),
+                            subset['couverture'].to_numpy(),
+                            grid_points)
+
+    def _accumulate(self, signal, lats, lons, lat_e, lon_e, radii):
+        n_lat, n_lon = signal.shape
+        phi_rows = np.radians(lats).astype(np.float32)
+        lam_cols = np.radians(lons).astype(np.float32)
+        phi_e = np.radians(lat_e).astype(np.float32)
+        lam_e = np.radians(lon_e).astype(np.float32)
+        radii = radii.astype(np.float32)
+        inv_r = (100.0 / radii).astype(np.float32)
+
+        # Facteurs d'échelle est-ouest extrêmes, pour des bornes de distance sûres
+        all_phi = np.concatenate([phi_rows, phi_e])
+        kx_min = EARTH_RADIUS_KM * np.cos(np.abs(all_phi).max())
+        kx_max = EARTH_RADIUS_KM * np.cos(np.abs(all_phi).min())
+
+        tile = self.tile_size
+        col_starts = np.arange(0, n_lon, tile)
+        col_lo = lam_cols[col_starts]
+        col_hi = lam_cols[np.minimum(col_starts + tile, n_lon) - 1]
+
+        for r0 in range(0, n_lat, tile):
+            rows = phi_rows[r0:r0 + tile]
+
+            # Bornes de distance entre chaque émetteur et chaque tuile de cette bande
+            dy_min = np.maximum(0, np.maximum(rows[0] - phi_e, phi_e - rows[-1])) * EARTH_RADIUS_KM
+            dy_max = np.maximum(np.abs(rows[0] - phi_e), np.abs(rows[-1] - phi_e)) * EARTH_RADIUS_KM
+            gap = np.maximum(0, np.maximum(col_lo[:, None] - lam_e, lam_e - col_hi[:, None]))
+            span = np.maximum(np.abs(col_lo[:, None] - lam_e), np.abs(col_hi[:, None] - lam_e))
+            d_min = np.sqrt(dy_min ** 2 + (kx_min * gap) ** 2)
+            d_max = np.sqrt(dy_max ** 2 + (kx_max * span) ** 2)
+
+            # Un émetteur ne peut pas l'emporter sur une tuile si son meilleur signal
+            # possible reste sous le signal garanti par un autre émetteur
+            best_possible = 100.0 - d_min * inv_r
+            guaranteed = np.maximum(0, (100.0 - d_max * inv_r).max(axis=1))
+            useful = best_possible > guaranteed[:, None]
+
+            for t, c0 in enumerate(col_starts):
+                candidates = np.flatnonzero(useful[t])
+                if len(candidates) == 0:
+                    continue
+                cols = lam_cols[c0:c0 + tile]
+                out = signal[r0:r0 + len(rows), c0:c0 + len(cols)]
+                per_block = max(1, self.block_elements // out.size)
+
+                for e0 in range(0, len(candidates), per_block):
+                    idx = candidates[e0:e0 + per_block]
+                    dy = EARTH_RADIUS_KM * (rows[:, None] - phi_e[idx][None, :])
+                    kx = EARTH_RADIUS_KM * np.cos((rows[:, None] + phi_e[idx][None, :]) / 2)
+                    dlam = cols[:, None] - lam_e[idx][None, :]
+
+                    dist = np.sqrt(dy[:, None, :] ** 2 + (kx[:, None, :] * dlam[None, :, :]) ** 2)
+                    strength = 100.0 - dist * inv_r[idx]
+                    np.maximum(out, strength.max(axis=2), out=out)
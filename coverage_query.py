@@ -0,0 +1,203 @@
+# coverage_query.py
+"""Émetteurs desservant un point: index spatial précalculé et requêtes par lots
+
+Usage:
+    python coverage_query.py points.csv --output couverture.csv   # colonnes latitude, longitude
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from coverage import EARTH_RADIUS_KM
+
+# Nombre maximal de cellules de la grille par axe
+MAX_GRID_CELLS = 512
+# Nombre maximal de couples (point, émetteur candidat) examinés par bloc (borne la mémoire)
+DEFAULT_BLOCK_PAIRS = 1_000_000
+# Marge sur les rayons dans l'index: la projection plane ne doit écarter aucun émetteur
+INDEX_MARGIN = 1.005
+
+RESULT_COLUMNS = ['point', 'latitude', 'longitude', 'rang', 'emitter_id', 'distance_km', 'signal']
+
+
+class CoverageIndex:
+    """Index des zones de couverture pour les requêtes « quels émetteurs desservent ce point ? »
+
+    Construit une fois par version des données: chaque zone est inscrite
+    dans les cellules d'une grille que couvre son rectangle englobant
+    (tableaux triés par cellule, sans structure Python par cellule). Une
+    requête ne calcule la distance qu'aux émetteurs de la cellule de
+    chaque point; le signal estimé suit le modèle de la carte de chaleur
+    (100 % au pied de l'émetteur, 0 % au bord de la zone).
+    """
+
+    def __init__(self, emitters, statuses=('Actif',), cell_km=None, block_pairs=DEFAULT_BLOCK_PAIRS):
+        subset = emitters[emitters['statut'].isin(statuses)]
+        self.emitter_ids = subset['id'].astype(str).to_numpy(dtype=object)
+        self.lat = subset['latitude'].to_numpy(dtype=np.float64)
+        self.lon = subset['longitude'].to_numpy(dtype=np.float64)
+        self.radii = subset['couverture'].to_numpy(dtype=np.float64)
+        self.cell_km = cell_km
+        self.block_pairs = block_pairs
+        self.unit = _unit_vectors(self.lat, self.lon)
+        self.cos_radius = np.cos(self.radii / EARTH_RADIUS_KM)
+        self._build()
+
+    def _build(self):
+        n = len(self.radii)
+        if n == 0:
+            self.cell = 1.0
+            self.n_cx = self.n_cy = 0
+            self.cell_starts = np.zeros(1, dtype=np.int64)
+            self.cell_emitters = np.zeros(0, dtype=np.int64)
+            return
+
+        # Projection plane minorant les distances, de même origine pour l'index et les requêtes
+        r_deg = self.radii * INDEX_MARGIN / EARTH_RADIUS_KM
+        lat_lo = np.degrees(np.radians(self.lat) - r_deg)
+        lat_hi = np.degrees(np.radians(self.lat) + r_deg)
+        self.phi_max = np.radians(np.abs(np.concatenate([lat_lo, lat_hi])).clip(max=89.0).max())
+        self.origin = (lat_lo.min(), (self.lon - np.degrees(r_deg / np.cos(self.phi_max))).min())
+        x, y = self._project(self.lat, self.lon)
+        r = self.radii * INDEX_MARGIN
+        x0, x1, y0, y1 = x - r, x + r, np.maximum(y - r, 0), y + r
+
+        extent = max(x1.max(), y1.max(), 1e-6)
+        self.cell = self.cell_km or max(float(np.median(r)), extent / MAX_GRID_CELLS)
+        self.n_cx = int(x1.max() // self.cell) + 1
+        self.n_cy = int(y1.max() // self.cell) + 1
+        cx0, cx1 = (np.maximum(x0, 0) // self.cell).astype(np.int64), (x1 // self.cell).astype(np.int64)
+        cy0, cy1 = (y0 // self.cell).astype(np.int64), (y1 // self.cell).astype(np.int64)
+
+        # Une entrée par (émetteur, cellule couverte), puis tri par cellule (format CSR)
+        span_x = cx1 - cx0 + 1
+        counts = span_x * (cy1 - cy0 + 1)
+        emitter = np.repeat(np.arange(n), counts)
+        local = np.arange(len(emitter)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (cx0[emitter] + local % span_x[emitter]) * self.n_cy + cy0[emitter] + local // span_x[emitter]
+        order = np.argsort(cells, kind='stable')
+        self.cell_emitters = emitter[order]
+        self.cell_starts = np.searchsorted(cells[order], np.arange(self.n_cx * self.n_cy + 1))
+
+    def _project(self, lat, lon):
+        x = EARTH_RADIUS_KM * np.cos(self.phi_max) * np.radians(np.asarray(lon, dtype=np.float64) - self.origin[1])
+        y = EARTH_RADIUS_KM * np.radians(np.asarray(lat, dtype=np.float64) - self.origin[0])
+        return x, y
+
+    def __len__(self):
+        return len(self.cell_emitters)
+
+    def query(self, latitudes, longitudes, max_results=None):
+        """Émetteurs desservant chaque point, du meilleur signal au plus faible
+
+        Format long: une ligne par (point, émetteur), `point` étant la
+        position du point dans l'entrée. Les points hors couverture
+        n'apparaissent pas. Les points sont traités par blocs de taille
+        bornée en nombre de couples candidats.
+        """
+        lat = np.atleast_1d(np.asarray(latitudes, dtype=np.float64))
+        lon = np.atleast_1d(np.asarray(longitudes, dtype=np.float64))
+        none = np.zeros(0, dtype=np.int64)
+        if self.n_cx == 0 or len(lat) == 0:
+            return _result_frame(lat, lon, none, none, np.zeros(0), np.zeros(0), none, self.emitter_ids)
+
+        x, y = self._project(lat, lon)
+        cx = np.floor(x / self.cell).astype(np.int64)
+        cy = np.floor(y / self.cell).astype(np.int64)
+        points = np.flatnonzero((cx >= 0) & (cx < self.n_cx) & (cy >= 0) & (cy < self.n_cy))
+        cell = cx[points] * self.n_cy + cy[points]
+        starts = self.cell_starts[cell]
+        counts = self.cell_starts[cell + 1] - starts
+        unit = _unit_vectors(lat, lon)
+
+        parts = []
+        cum = np.cumsum(counts)
+        cuts = np.searchsorted(cum, np.arange(self.block_pairs, cum[-1] if len(cum) else 0, self.block_pairs),
+                               side='right')
+        edges = np.unique(np.concatenate([[0], cuts, [len(points)]]))
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            parts.append(self._query_block(points[lo:hi], starts[lo:hi], counts[lo:hi], unit, max_results))
+        point, emitter, distance, signal, rank = (np.concatenate([p[k] for p in parts]) for k in range(5))
+        return _result_frame(lat, lon, point, emitter, distance, signal, rank, self.emitter_ids)
+
+    def _query_block(self, points, starts, counts, unit, max_results):
+        # Candidats: les émetteurs inscrits dans la cellule de chaque point
+        point = np.repeat(points, counts)
+        local = np.arange(len(point)) - np.repeat(np.cumsum(counts) - counts, counts)
+        emitter = self.cell_emitters[np.repeat(starts, counts) + local]
+
+        # Produit scalaire des vecteurs unitaires: test exact sur la sphère, sans trigonométrie par couple
+        dot = np.einsum('ij,ij->i', unit[point], self.unit[emitter])
+        served = dot > self.cos_radius[emitter]
+        point, emitter, dot = point[served], emitter[served], dot[served]
+        chord = np.sqrt(np.maximum(2.0 - 2.0 * dot, 0.0))
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+        signal = 100.0 * (1.0 - distance / self.radii[emitter])
+
+        # Points déjà croissants: un seul tri sur (point, signal décroissant)
+        order = np.argsort(point * 256.0 + (100.0 - signal), kind='stable')
+        point, emitter, distance, signal = point[order], emitter[order], distance[order], signal[order]
+        position = np.arange(len(point))
+        first = np.r_[True, point[1:] != point[:-1]] if len(point) else np.zeros(0, dtype=bool)
+        rank = position - np.maximum.accumulate(np.where(first, position, 0))
+        if max_results is not None:
+            keep = rank < max_results
+            point, emitter, distance, signal, rank = point[keep], emitter[keep], distance[keep], signal[keep], rank[keep]
+        return point, emitter, distance, signal, rank
+
+    def serving(self, latitude, longitude, max_results=None):
+        """Émetteurs desservant un seul point, classés par signal estimé"""
+        return self.query([latitude], [longitude], max_results).drop(columns=['point', 'latitude', 'longitude'])
+
+
+def _unit_vectors(lat, lon):
+    phi, lam = np.radians(lat), np.radians(lon)
+    return np.stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)], axis=1)
+
+
+def _result_frame(lat, lon, point, emitter, distance, signal, rank, emitter_ids):
+    return pd.DataFrame({
+        'point': point,
+        'latitude': lat[point],
+        'longitude': lon[point],
+        'rang': rank + 1,
+        'emitter_id': pd.Categorical.from_codes(emitter, categories=pd.Index(emitter_ids.astype(str))),
+        'distance_km': np.round(distance, 2),
+        'signal': np.round(signal, 1)
+    }, columns=RESULT_COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Émetteurs Freedom Radio desservant une liste de points")
+    parser.add_argument('points', help="fichier CSV avec les colonnes latitude et longitude")
+    parser.add_argument('--output', default=None, help="fichier CSV de résultats (par défaut: sortie standard)")
+    parser.add_argument('--max-results', type=int, default=None, help="émetteurs retenus au plus par point")
+    args = parser.parse_args(argv)
+
+    points = pd.read_csv(args.points)
+    missing = {'latitude', 'longitude'} - set(points.columns)
+    if missing:
+        parser.error(f"colonnes manquantes: {', '.join(sorted(missing))}")
+
+    # Table des émetteurs écrite par le dashboard, relue sans rien régénérer (ni charger Streamlit)
+    from fleet_data import load_saved_emitters
+    try:
+        emitters = load_saved_emitters()
+    except FileNotFoundError as exc:
+        parser.error(str(exc))
+    index = CoverageIndex(emitters)
+    started = time.perf_counter()
+    results = index.query(points['latitude'], points['longitude'], args.max_results)
+    elapsed = time.perf_counter() - started
+    results.to_csv(args.output or sys.stdout, index=False)
+    if args.output:
+        print(f"{len(points)} point(s), {results['point'].nunique()} desservi(s), "
+              f"{len(results)} ligne(s) dans {args.output} en {elapsed * 1000:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
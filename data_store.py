@@ -0,0 +1,109 @@
+# data_store.py
+"""Magasin de données partagé par toutes les sessions du processus Streamlit"""
+import threading
+import time
+
+import pandas as pd
+
+from profiling import get_profiler
+
+# Avec le Copy-on-Write de pandas, une copie superficielle d'un snapshot ne
+# partage plus ses modifications avec l'original (comportement par défaut en 3.x)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+DEFAULT_TTL_SECONDS = 15 * 60
+
+
+class DataSnapshot:
+    """Version figée des données, distribuée en lecture seule aux sessions
+
+    Chaque accès à une table renvoie une copie superficielle: le coût est nul
+    et une session qui modifie son DataFrame n'altère jamais le snapshot
+    partagé. Les résultats dérivés (raster, agrégats...) se mémorisent avec
+    `memo` et vivent aussi longtemps que la version.
+    """
+
+    def __init__(self, version, tables, created_at=None):
+        self.version = version
+        self.created_at = created_at if created_at is not None else time.time()
+        self._tables = dict(tables)
+        self._memo = {}
+        # Réentrant: un résultat dérivé peut s'appuyer sur un autre résultat mémorisé
+        self._lock = threading.RLock()
+
+    def __getattr__(self, name):
+        tables = self.__dict__.get('_tables', {})
+        if name not in tables:
+            raise AttributeError(name)
+        return self.table(name)
+
+    def table(self, name):
+        value = self._tables[name]
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return value.copy(deep=False)
+        return value
+
+    @property
+    def age(self):
+        return time.time() - self.created_at
+
+    def memo(self, key, factory):
+        """Calcule une seule fois un résultat dérivé de cette version"""
+        with self._lock:
+            hit = key in self._memo
+            get_profiler().cache_lookup(key[0] if isinstance(key, tuple) else key, hit)
+            if not hit:
+                self._memo[key] = factory()
+            return self._memo[key]
+
+
+class DataStore:
+    """Source de snapshots versionnés avec expiration (TTL) et invalidation manuelle"""
+
+    def __init__(self, loader, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._snapshot = None
+        self._version = 0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    @property
+    def version(self):
+        return self._version
+
+    def is_stale(self):
+        snapshot = self._snapshot
+        if self._stale or snapshot is None:
+            return True
+        return self.ttl_seconds is not None and snapshot.age > self.ttl_seconds
+
+    def snapshot(self):
+        """Snapshot courant, rechargé une seule fois s'il a expiré ou été invalidé"""
+        if not self.is_stale():
+            return self._snapshot
+        with self._lock:
+            # Une autre session a pu recharger pendant l'attente du verrou
+            if self.is_stale():
+                tables = self.loader()
+                self._version += 1
+                self._snapshot = DataSnapshot(self._version, tables)
+                self._stale = False
+            return self._snapshot
+
+    def invalidate(self):
+        """Force le rechargement au prochain accès"""
+        self._stale = True
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_data_store(name, loader, ttl_seconds=DEFAULT_TTL_SECONDS):
+    """Magasin nommé, unique pour tout le processus (survit aux reruns Streamlit)"""
+    with _stores_lock:
+        if name not in _stores:
+            _stores[name] = DataStore(loader, ttl_seconds)
+        return _stores[name]
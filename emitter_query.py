@@ -0,0 +1,95 @@
+# emitter_query.py
+"""Filtrage, tri et pagination de la liste des émetteurs sans copie de la table"""
+import threading
+
+import numpy as np
+
+from profiling import get_profiler
+
+# Critère de tri -> (colonne, ordre croissant)
+SORT_KEYS = {
+    'ID': ('id', True),
+    'Nom': ('nom', True),
+    'Fréquence': ('frequence', True),
+    'Puissance': ('puissance', False),
+    'Statut': ('statut', True)
+}
+
+POWER_FILTERS = ['Toutes', '> 1000W', '500-1000W', '< 500W']
+
+MAX_CACHED_QUERIES = 64
+
+
+class EmitterQueryEngine:
+    """Moteur de requêtes sur la table des émetteurs
+
+    Les ordres de tri sont calculés une fois à la construction et les
+    résultats (positions de lignes) sont mis en cache par combinaison de
+    filtres. Seules les lignes de la page affichée sont matérialisées.
+    Le moteur est partagé par les sessions (mémorisé par version): ses
+    caches sont remplis sous verrou, chaque résultat n'est calculé qu'une fois.
+    """
+
+    def __init__(self, emitters):
+        self.emitters = emitters
+        self._status = emitters['statut'].to_numpy()
+        self._power = emitters['puissance'].to_numpy(dtype=float)
+        self._orders = {}
+        for label, (column, ascending) in SORT_KEYS.items():
+            values = emitters[column].to_numpy()
+            if not ascending:
+                # Tri sur les rangs opposés plutôt que sur l'ordre inversé: les ex aequo gardent leur ordre d'origine
+                values = -np.unique(values, return_inverse=True)[1]
+            self._orders[label] = np.argsort(values, kind='stable')
+        self._masks = {}
+        self._results = {}
+        self.hits = 0
+        self.misses = 0
+        # Réentrant: `query` s'appuie sur le cache de `mask`
+        self._lock = threading.RLock()
+
+    def mask(self, statuses=None, power_filter='Toutes'):
+        key = (None if statuses is None else frozenset(statuses), power_filter)
+        with self._lock:
+            if key not in self._masks:
+                mask = np.ones(len(self._status), dtype=bool)
+                if statuses is not None:
+                    mask &= np.isin(self._status, list(statuses))
+                if power_filter == '> 1000W':
+                    mask &= self._power > 1000
+                elif power_filter == '500-1000W':
+                    mask &= (self._power >= 500) & (self._power <= 1000)
+                elif power_filter == '< 500W':
+                    mask &= self._power < 500
+                self._remember(self._masks, key, mask)
+            return self._masks[key]
+
+    def query(self, statuses=None, power_filter='Toutes', sort_by='ID'):
+        """Positions des lignes correspondantes, dans l'ordre de tri demandé"""
+        key = (None if statuses is None else frozenset(statuses), power_filter, sort_by)
+        with self._lock:
+            hit = key in self._results
+            get_profiler().cache_lookup('emitter_query', hit)
+            if hit:
+                self.hits += 1
+                return self._results[key]
+            self.misses += 1
+            order = self._orders[sort_by]
+            positions = order[self.mask(statuses, power_filter)[order]]
+            self._remember(self._results, key, positions)
+            return positions
+
+    def page(self, positions, page, page_size):
+        """Lignes de la page demandée (numérotée à partir de 1)"""
+        start = (page - 1) * page_size
+        return self.emitters.iloc[positions[start:start + page_size]]
+
+    @staticmethod
+    def page_count(positions, page_size):
+        return max(1, -(-len(positions) // page_size))
+
+    @staticmethod
+    def _remember(cache, key, value):
+        if len(cache) >= MAX_CACHED_QUERIES:
+            cache.pop(next(iter(cache)))
+        cache[key] = value
@@ -0,0 +1,82 @@
+# fleet_data.py
+"""Emplacements des données du dashboard et chargement en lecture seule (outils en ligne de commande)"""
+import os
+
+import pandas as pd
+
+from rollups import SignalRollups
+from signal_store import SignalStore
+from signals import EMITTER_DTYPES
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Emplacement du stockage colonnaire de l'historique de signal
+SIGNAL_STORE_DIR = os.environ.get('FREEDOM_SIGNAL_STORE', os.path.join(DATA_DIR, 'signal_store'))
+
+# Table des émetteurs du dashboard, conservée d'un chargement à l'autre
+EMITTERS_PATH = os.environ.get('FREEDOM_EMITTERS_FILE', os.path.join(DATA_DIR, 'emitters.parquet'))
+
+# Flotte générée par generate_fleet.py à charger à la place des 12 émetteurs simulés (tests de charge)
+FLEET_DIR = os.environ.get('FREEDOM_FLEET_DIR')
+# Jours les plus récents d'une flotte repris dans les agrégats (tables horaires denses)
+FLEET_ROLLUP_DAYS = 7
+
+
+def read_emitters(path=EMITTERS_PATH):
+    """Table des émetteurs enregistrée (None si elle n'existe pas encore)"""
+    if not os.path.exists(path):
+        return None
+    return pd.read_parquet(path).astype(EMITTER_DTYPES)
+
+
+def save_emitters(emitters, path=EMITTERS_PATH):
+    """Enregistre la table des émetteurs (fichier remplacé d'un bloc: un lecteur ne voit jamais d'écriture partielle)"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    emitters.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def rollups_from_store(signal_store, days=FLEET_ROLLUP_DAYS):
+    """Agrégats des `days` derniers jours du magasin, alimentés jour par jour (un seul jour en mémoire)"""
+    rollups = SignalRollups()
+    for day in signal_store.days()[-days:]:
+        rollups.update(signal_store.load(day, day))
+    return rollups
+
+
+def saved_paths(fleet_dir=FLEET_DIR):
+    """(table des émetteurs, dossier de l'historique) du dashboard ou de la flotte générée `fleet_dir`"""
+    if fleet_dir:
+        from generate_fleet import EMITTERS_FILE, SIGNALS_DIR  # import différé: flottes de test de charge
+        return os.path.join(fleet_dir, EMITTERS_FILE), os.path.join(fleet_dir, SIGNALS_DIR)
+    return EMITTERS_PATH, SIGNAL_STORE_DIR
+
+
+def load_saved_emitters(fleet_dir=FLEET_DIR):
+    """Table des émetteurs enregistrée par le dashboard (ou de la flotte générée), en lecture seule"""
+    emitters_path, _ = saved_paths(fleet_dir)
+    emitters = read_emitters(emitters_path)
+    if emitters is None:
+        raise FileNotFoundError(f"Table des émetteurs introuvable ({emitters_path}): "
+                                f"lancer le dashboard une fois ou générer une flotte (generate_fleet.py)")
+    return emitters
+
+
+def load_saved_data(fleet_dir=FLEET_DIR, rollup_days=FLEET_ROLLUP_DAYS):
+    """Chargeur en lecture seule des données du dashboard (rapport, requêtes de couverture, tuiles)
+
+    Relit la table des émetteurs et l'historique tels que le dashboard les a
+    écrits (ou la flotte générée de `fleet_dir`), sans rien régénérer ni
+    écrire: ni historique, ni reprise de la base de maintenance, ni suivi
+    de la télémétrie. Les agrégats ne reflètent donc que l'historique sur
+    disque.
+    """
+    emitters = load_saved_emitters(fleet_dir)
+    _, store_dir = saved_paths(fleet_dir)
+    if not os.path.isdir(store_dir):
+        raise FileNotFoundError(f"Historique de signal introuvable ({store_dir}): "
+                                f"lancer le dashboard une fois ou générer une flotte (generate_fleet.py)")
+    signal_store = SignalStore(store_dir)
+    return {'emitters': emitters, 'signal_store': signal_store,
+            'rollups': rollups_from_store(signal_store, rollup_days)}
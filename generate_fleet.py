@@ -0,0 +1,201 @@
+# generate_fleet.py
+"""Flotte synthétique reproductible pour les tests de charge: émetteurs et historique de signal sur disque
+
+Usage:
+    python generate_fleet.py --emitters 10000 --days 365 --interval 60 --seed 42 --output data/flotte-10k
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from coverage import REUNION_BOUNDS, REUNION_CITIES, inside_outline
+from signal_store import SignalStore
+from signals import EMITTER_DTYPES, generate_signal_history, samples_per_day
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'flotte')
+EMITTERS_FILE = 'emitters.parquet'
+SIGNALS_DIR = 'signals'
+
+# Part des émetteurs groupés autour des villes (le reste est dispersé sur toute l'île)
+URBAN_SHARE = 0.7
+# Dispersion (degrés) des émetteurs autour de leur ville
+URBAN_SPREAD_DEG = 0.04
+# Villes des émetteurs principaux (forte puissance)
+MAIN_CITIES = ('Saint-Denis', 'Saint-Paul', 'Saint-Pierre')
+
+# Échantillons générés au plus par tâche du pool (borne la mémoire de chaque processus)
+MAX_TASK_SAMPLES = 2_000_000
+
+
+def generate_emitters(n, seed=0):
+    """Table de `n` émetteurs sur le littoral et dans les terres, mêmes colonnes que la flotte du dashboard
+
+    Environ 70 % des sites sont tirés autour des villes principales, le
+    reste uniformément sur l'emprise de l'île; les tirages hors du contour
+    de l'île sont rejetés. Mêmes lois que `initialize_emitters` pour la
+    fréquence, la puissance, le statut et les dates.
+    """
+    rng = np.random.default_rng([seed, 0])
+    names = list(REUNION_CITIES)
+    centers = np.array(list(REUNION_CITIES.values()))
+    lat, lon = _island_points(n, centers, rng)
+
+    # Ville de rattachement: la plus proche (distance plane suffisante à cette échelle)
+    city = ((lat[:, None] - centers[None, :, 0]) ** 2
+            + ((lon[:, None] - centers[None, :, 1]) * np.cos(np.radians(lat[:, None]))) ** 2).argmin(axis=1)
+    main = np.isin(np.array(names)[city], MAIN_CITIES)
+    power = np.where(main, rng.choice([1000, 2000, 5000], n), rng.choice([100, 250, 500], n))
+
+    width = max(3, len(str(n)))
+    numbers = np.arange(1, n + 1)
+    fleet = pd.DataFrame({
+        'id': [f"FR_{i:0{width}d}" for i in numbers],
+        'id_original': [f"FR-{i:0{width}d}" for i in numbers],
+        'nom': [f"Freedom Radio - {names[c]} {i}" for c, i in zip(city, numbers)],
+        'ville': pd.Categorical.from_codes(city, categories=names),
+        'latitude': lat,
+        'longitude': lon,
+        'frequence': np.round(rng.uniform(88.0, 108.0, n), 1),
+        'puissance': power,
+        'altitude': rng.integers(100, 1501, n),
+        'date_installation': _random_dates(rng, n, '2005-01-01', '2022-12-28'),
+        'statut': rng.choice(['Actif', 'Actif', 'Actif', 'Maintenance', 'Inactif'], n),
+        'couverture': np.round(power * rng.uniform(0.8, 1.2, n) / 10, 1),
+        'technicien': [f"Tech-{i:02d}" for i in rng.integers(1, 6, n)],
+        'derniere_maintenance': _random_dates(rng, n, '2023-01-01', '2024-12-28')
+    })
+    return fleet.astype(EMITTER_DTYPES)
+
+
+def _island_points(n, centers, rng):
+    lat_min, lat_max, lon_min, lon_max = REUNION_BOUNDS
+    lat, lon = np.zeros(0), np.zeros(0)
+    while len(lat) < n:
+        # Tirage par lots avec rejet hors du contour, jusqu'à n points retenus
+        batch = 2 * (n - len(lat)) + 16
+        urban = rng.random(batch) < URBAN_SHARE
+        anchor = centers[rng.integers(0, len(centers), batch)]
+        cand_lat = np.where(urban, anchor[:, 0] + rng.normal(0, URBAN_SPREAD_DEG, batch),
+                            rng.uniform(lat_min, lat_max, batch))
+        cand_lon = np.where(urban, anchor[:, 1] + rng.normal(0, URBAN_SPREAD_DEG, batch),
+                            rng.uniform(lon_min, lon_max, batch))
+        keep = inside_outline(cand_lat, cand_lon)
+        lat = np.concatenate([lat, cand_lat[keep]])
+        lon = np.concatenate([lon, cand_lon[keep]])
+    return lat[:n], lon[:n]
+
+
+def _random_dates(rng, n, start, end):
+    start = pd.Timestamp(start)
+    return start + pd.to_timedelta(rng.integers(0, (pd.Timestamp(end) - start).days + 1, n), unit='D')
+
+
+def signal_tasks(emitters, days, interval_minutes, end, seed, max_task_samples=MAX_TASK_SAMPLES):
+    """Découpage (émetteurs x jours) en tâches d'au plus `max_task_samples` échantillons
+
+    Chaque tâche a sa propre graine dérivée de (seed, bloc d'émetteurs,
+    bloc de jours): le résultat ne dépend pas du nombre de processus.
+    """
+    per_day = samples_per_day(interval_minutes)
+    per_task = max(1, min(len(emitters), max_task_samples // per_day))
+    days_per_task = max(1, min(days, max_task_samples // (per_task * per_day)))
+    end = pd.Timestamp(end).normalize()
+    columns = emitters[['id', 'statut', 'puissance']]
+
+    tasks = []
+    for block, lo in enumerate(range(0, len(emitters), per_task)):
+        chunk = columns.iloc[lo:lo + per_task]
+        # Blocs de jours du plus récent au plus ancien, comme generate_signal_history
+        for day_block, offset in enumerate(range(0, days, days_per_task)):
+            tasks.append((chunk, min(days_per_task, days - offset), interval_minutes,
+                          end - pd.Timedelta(days=offset), [seed, 1, block, day_block], f"gen-{block:05d}"))
+    return tasks
+
+
+def _signal_task(task):
+    """Génère un bloc (émetteurs x jours) et l'écrit aussitôt en segments du magasin"""
+    root, (chunk, days, interval_minutes, now, seed, segment) = task
+    frame = generate_signal_history(chunk, days=days, interval_minutes=interval_minutes, now=now,
+                                    rng=np.random.default_rng(seed))
+    SignalStore(root).write(frame, segment=segment)
+    return len(frame)
+
+
+def generate_fleet(output_dir, n_emitters, days, interval_minutes=60, end=None, seed=0, workers=None,
+                   max_task_samples=MAX_TASK_SAMPLES, progress=None):
+    """Écrit `emitters.parquet` et l'historique `signals/` (SignalStore); renvoie (émetteurs, échantillons)
+
+    Les tâches sont réparties sur un pool de processus; chacune écrit ses
+    propres segments (un par bloc d'émetteurs et par jour), si bien que ni
+    le processus principal ni un processus du pool ne détient plus d'un
+    bloc de l'historique à la fois.
+    """
+    samples_per_day(interval_minutes)
+    if n_emitters < 1 or days < 1:
+        raise ValueError("Il faut au moins un émetteur et un jour d'historique")
+    end = pd.Timestamp.now() if end is None else pd.Timestamp(end)
+
+    os.makedirs(output_dir, exist_ok=True)
+    emitters = generate_emitters(n_emitters, seed)
+    emitters.to_parquet(os.path.join(output_dir, EMITTERS_FILE), index=False)
+
+    root = os.path.join(output_dir, SIGNALS_DIR)
+    SignalStore(root)
+    tasks = [(root, task) for task in signal_tasks(emitters, days, interval_minutes, end, seed, max_task_samples)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        return emitters, _count_samples(map(_signal_task, tasks), len(tasks), progress)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return emitters, _count_samples(pool.map(_signal_task, tasks), len(tasks), progress)
+
+
+def _count_samples(results, total, progress):
+    samples = 0
+    for done, rows in enumerate(results, 1):
+        samples += rows
+        if progress:
+            progress(done, total, samples)
+    return samples
+
+
+def load_fleet(output_dir):
+    """Flotte générée: (table des émetteurs, magasin de l'historique)"""
+    emitters = pd.read_parquet(os.path.join(output_dir, EMITTERS_FILE)).astype(EMITTER_DTYPES)
+    return emitters, SignalStore(os.path.join(output_dir, SIGNALS_DIR))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Flotte Freedom Radio synthétique pour les tests de charge")
+    parser.add_argument('--emitters', type=int, default=10_000, help="nombre d'émetteurs")
+    parser.add_argument('--days', type=int, default=365, help="jours d'historique de signal")
+    parser.add_argument('--interval', type=int, default=60, help="pas d'échantillonnage (minutes)")
+    parser.add_argument('--end', default=None, help="dernier jour de l'historique (AAAA-MM-JJ, par défaut aujourd'hui)")
+    parser.add_argument('--seed', type=int, default=0, help="graine: mêmes paramètres, mêmes données")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR, help="dossier de sortie")
+    parser.add_argument('--workers', type=int, default=None, help="processus de génération (par défaut: nombre de cœurs)")
+    parser.add_argument('--max-task-samples', type=int, default=MAX_TASK_SAMPLES,
+                        help="échantillons au plus par tâche (borne la mémoire)")
+    args = parser.parse_args(argv)
+
+    def progress(done, total, samples):
+        print(f"\r{done}/{total} bloc(s), {samples:,} échantillon(s)".replace(',', ' '), end='', flush=True)
+
+    started = time.perf_counter()
+    try:
+        emitters, samples = generate_fleet(args.output, args.emitters, args.days, args.interval, args.end,
+                                           args.seed, args.workers, args.max_task_samples, progress)
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(f"\n{len(emitters)} émetteur(s), {samples} échantillon(s) dans {args.output} "
+          f"en {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,184 @@
+# interference.py
+"""Détection des conflits de fréquence entre émetteurs dont les zones de couverture se recouvrent"""
+import numpy as np
+import pandas as pd
+
+from coverage import EARTH_RADIUS_KM, haversine_km
+
+# Écart de fréquence maximal (MHz) d'un conflit co-canal, puis d'un conflit de canal adjacent
+CO_CHANNEL_MHZ = 0.05
+ADJACENT_CHANNEL_MHZ = 0.2
+
+# Émetteurs pris en compte: ceux qui émettent ou vont réémettre
+TRANSMITTING_STATUSES = ('Actif', 'Maintenance')
+
+# Nombre maximal de cellules de la grille par axe
+MAX_GRID_CELLS = 256
+# Nombre maximal de couples candidats examinés par bloc (borne la mémoire)
+DEFAULT_BLOCK_PAIRS = 2_000_000
+# Marge sur les rayons dans l'index: la projection plane ne doit écarter aucun vrai recouvrement
+INDEX_MARGIN = 1.005
+
+CONFLICT_TYPES = ('co-canal', 'canal adjacent')
+CONFLICT_COLUMNS = ['emetteur_a', 'emetteur_b', 'frequence_a', 'frequence_b', 'ecart_mhz',
+                    'distance_km', 'recouvrement_km', 'type']
+
+
+class InterferenceAnalyzer:
+    """Couples d'émetteurs en conflit co-canal ou de canal adjacent
+
+    Chaque zone de couverture est inscrite, sous la clé (tranche de
+    fréquence, cellule), dans les cellules d'une grille (hachage spatial)
+    que couvre son rectangle englobant. Seuls les émetteurs d'une même
+    cellule et de tranches voisines sont comparés, et un couple n'est
+    retenu que dans la cellule du coin de l'intersection de leurs
+    rectangles: ni comparaison de tous les couples, ni dédoublonnage.
+    Les candidats sont confirmés par distance orthodromique.
+    """
+
+    def __init__(self, co_channel_mhz=CO_CHANNEL_MHZ, adjacent_mhz=ADJACENT_CHANNEL_MHZ,
+                 cell_km=None, block_pairs=DEFAULT_BLOCK_PAIRS):
+        if not 0 <= co_channel_mhz <= adjacent_mhz:
+            raise ValueError("Seuils invalides: il faut 0 <= co-canal <= canal adjacent")
+        self.co_channel_mhz = co_channel_mhz
+        self.adjacent_mhz = adjacent_mhz
+        self.cell_km = cell_km
+        self.block_pairs = block_pairs
+        self.candidates = 0  # couples examinés lors de la dernière analyse
+
+    def analyze_for(self, emitters, statuses=TRANSMITTING_STATUSES):
+        """Raccourci à partir du DataFrame des émetteurs (émetteurs en service seulement)"""
+        subset = emitters[emitters['statut'].isin(statuses)]
+        return self.analyze(subset['id'].astype(str).to_numpy(),
+                            subset['latitude'].to_numpy(),
+                            subset['longitude'].to_numpy(),
+                            subset['frequence'].to_numpy(),
+                            subset['couverture'].to_numpy())
+
+    def analyze(self, ids, latitudes, longitudes, frequencies, radii_km):
+        """Conflits triés par gravité: co-canal d'abord, puis recouvrement décroissant"""
+        lat = np.asarray(latitudes, dtype=np.float64)
+        lon = np.asarray(longitudes, dtype=np.float64)
+        freq = np.asarray(frequencies, dtype=np.float64)
+        radii = np.asarray(radii_km, dtype=np.float64)
+        ids = np.asarray(ids, dtype=object)
+        self.candidates = 0
+        if len(lat) < 2:
+            none = np.zeros(0, dtype=np.int64)
+            return _conflict_frame(ids, freq, radii, none, none, np.zeros(0), self.co_channel_mhz)
+
+        # Projection plane minorant les distances (échelle est-ouest de la latitude la plus forte)
+        phi = np.radians(lat)
+        x = EARTH_RADIUS_KM * np.cos(np.abs(phi).max()) * np.radians(lon - lon.min())
+        y = EARTH_RADIUS_KM * (phi - phi.min())
+        r = radii * INDEX_MARGIN
+
+        # Rectangles englobants réduits à l'emprise des centres: deux disques qui se
+        # recouvrent ont un point commun sur le segment qui joint leurs centres
+        x_max, y_max = x.max(), y.max()
+        x0, x1 = np.maximum(x - r, 0), np.minimum(x + r, x_max)
+        y0, y1 = np.maximum(y - r, 0), np.minimum(y + r, y_max)
+
+        cell = self.cell_km or max(2 * float(np.median(radii)), max(x_max, y_max) / MAX_GRID_CELLS, 1e-3)
+        n_cx = int(x_max // cell) + 1
+        n_cy = int(y_max // cell) + 1
+        cx0, cx1 = (x0 // cell).astype(np.int64), (x1 // cell).astype(np.int64)
+        cy0, cy1 = (y0 // cell).astype(np.int64), (y1 // cell).astype(np.int64)
+
+        # Une entrée par (émetteur, cellule couverte par son rectangle)
+        span_x = cx1 - cx0 + 1
+        counts = span_x * (cy1 - cy0 + 1)
+        entry = np.repeat(np.arange(len(lat)), counts)
+        local = np.arange(len(entry)) - np.repeat(np.cumsum(counts) - counts, counts)
+        entry_cx = cx0[entry] + local % span_x[entry]
+        entry_cy = cy0[entry] + local // span_x[entry]
+
+        # Tranches un peu plus larges que le seuil: un conflit relie au plus deux tranches voisines
+        band = np.floor(freq / (self.adjacent_mhz + 1e-6)).astype(np.int64)
+        band -= band.min()
+        stride = n_cx * n_cy
+        keys = band[entry] * stride + entry_cx * n_cy + entry_cy
+        order = np.argsort(keys, kind='stable')
+        entry, entry_cx, entry_cy, keys = entry[order], entry_cx[order], entry_cy[order], keys[order]
+        group_keys, starts, sizes = np.unique(keys, return_index=True, return_counts=True)
+
+        # Groupes comparés: chaque clé avec elle-même, puis avec la même cellule de la tranche suivante
+        nxt = np.searchsorted(group_keys, group_keys + stride)
+        has_next = nxt < len(group_keys)
+        has_next[has_next] = group_keys[nxt[has_next]] == group_keys[has_next] + stride
+        self_groups = sizes > 1
+        a_start = np.concatenate([starts[self_groups], starts[has_next]])
+        a_size = np.concatenate([sizes[self_groups], sizes[has_next]])
+        b_start = np.concatenate([starts[self_groups], starts[nxt[has_next]]])
+        b_size = np.concatenate([sizes[self_groups], sizes[nxt[has_next]]])
+        same = np.arange(len(a_start)) < int(self_groups.sum())
+
+        found_i, found_j, found_d = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)], [np.zeros(0)]
+        work = a_size * b_size
+        if len(work):
+            cum = np.cumsum(work)
+            cuts = np.searchsorted(cum, np.arange(self.block_pairs, cum[-1], self.block_pairs), side='right')
+            edges = np.unique(np.concatenate([[0], cuts, [len(work)]]))
+            for lo, hi in zip(edges[:-1], edges[1:]):
+                pa, pb = self._group_pairs(a_start[lo:hi], a_size[lo:hi], b_start[lo:hi], b_size[lo:hi],
+                                           same[lo:hi])
+                i, j = entry[pa], entry[pb]
+                # Couple retenu dans une seule cellule: celle du coin de l'intersection des rectangles
+                keep = ((np.maximum(x0[i], x0[j]) // cell == entry_cx[pa])
+                        & (np.maximum(y0[i], y0[j]) // cell == entry_cy[pa])
+                        & (np.abs(freq[i] - freq[j]) <= self.adjacent_mhz + 1e-9))
+                i, j = i[keep], j[keep]
+                distance = haversine_km(lat[i], lon[i], lat[j], lon[j])
+                overlap = distance < radii[i] + radii[j]
+                found_i.append(i[overlap])
+                found_j.append(j[overlap])
+                found_d.append(distance[overlap])
+
+        i, j = np.concatenate(found_i), np.concatenate(found_j)
+        return _conflict_frame(ids, freq, radii, np.minimum(i, j), np.maximum(i, j), np.concatenate(found_d),
+                               self.co_channel_mhz)
+
+    def _group_pairs(self, a_start, a_size, b_start, b_size, same):
+        """Positions de tous les couples entre groupes a et b (a < b au sein d'un même groupe)"""
+        work = a_size * b_size
+        total = int(work.sum())
+        self.candidates += total
+        g = np.repeat(np.arange(len(work)), work)
+        local = np.arange(total) - np.repeat(np.cumsum(work) - work, work)
+        a_off = local // b_size[g]
+        b_off = local % b_size[g]
+        keep = ~same[g] | (a_off < b_off)
+        return a_start[g][keep] + a_off[keep], b_start[g][keep] + b_off[keep]
+
+
+def _conflict_frame(ids, freq, radii, i, j, distance, co_channel_mhz):
+    gap = np.round(np.abs(freq[i] - freq[j]), 3)
+    # Identifiants en catégories: pas de chaîne matérialisée par conflit
+    names = pd.Index(ids.astype(str))
+    conflicts = pd.DataFrame({
+        'emetteur_a': pd.Categorical.from_codes(i, categories=names),
+        'emetteur_b': pd.Categorical.from_codes(j, categories=names),
+        'frequence_a': freq[i],
+        'frequence_b': freq[j],
+        'ecart_mhz': gap,
+        'distance_km': np.round(distance, 1),
+        'recouvrement_km': np.round(radii[i] + radii[j] - distance, 1),
+        'type': pd.Categorical.from_codes((gap > co_channel_mhz).astype(np.int8), categories=CONFLICT_TYPES)
+    }, columns=CONFLICT_COLUMNS)
+    return conflicts.sort_values(['type', 'recouvrement_km'], ascending=[True, False],
+                                 kind='stable', ignore_index=True)
+
+
+def brute_force_conflicts(emitters, co_channel_mhz=CO_CHANNEL_MHZ, adjacent_mhz=ADJACENT_CHANNEL_MHZ,
+                          statuses=TRANSMITTING_STATUSES):
+    """Référence en O(n²) pour vérifier l'index sur de petites flottes"""
+    subset = emitters[emitters['statut'].isin(statuses)]
+    lat = subset['latitude'].to_numpy(dtype=float)
+    lon = subset['longitude'].to_numpy(dtype=float)
+    freq = subset['frequence'].to_numpy(dtype=float)
+    radii = subset['couverture'].to_numpy(dtype=float)
+    i, j = np.triu_indices(len(subset), k=1)
+    distance = haversine_km(lat[i], lon[i], lat[j], lon[j])
+    keep = (np.abs(freq[i] - freq[j]) <= adjacent_mhz + 1e-9) & (distance < radii[i] + radii[j])
+    return _conflict_frame(subset['id'].astype(str).to_numpy(dtype=object), freq, radii,
+                           i[keep], j[keep], distance[keep], co_channel_mhz)
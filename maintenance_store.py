@@ -0,0 +1,223 @@
+# maintenance_store.py
+"""Historique et planification des interventions de maintenance, persistés en SQLite"""
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+DEFAULT_MAINTENANCE_DB = os.environ.get(
+    'FREEDOM_MAINTENANCE_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'maintenance.sqlite3')
+)
+
+# Écritures regroupées: une transaction par lot, au plus tous les FLUSH_INTERVAL_SECONDS
+BATCH_SIZE = 100
+FLUSH_INTERVAL_SECONDS = 0.5
+
+# Identifiants au plus par requête IN (...) (limite de variables des anciennes versions de SQLite)
+MAX_SQL_PARAMS = 900
+
+# Dates et heures en texte ISO: l'ordre lexicographique est l'ordre chronologique
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interventions (
+    id INTEGER PRIMARY KEY,
+    emitter_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    heure TEXT NOT NULL,
+    technicien TEXT NOT NULL,
+    duree_h REAL NOT NULL,
+    type TEXT NOT NULL,
+    taches TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT '',
+    cree_le TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_interventions_emetteur_date ON interventions (emitter_id, date);
+CREATE INDEX IF NOT EXISTS idx_interventions_date ON interventions (date);
+CREATE INDEX IF NOT EXISTS idx_interventions_technicien_date ON interventions (technicien, date);
+"""
+
+COLUMNS = ['emitter_id', 'date', 'heure', 'technicien', 'duree_h', 'type', 'taches', 'notes', 'cree_le']
+INSERT = f"INSERT INTO interventions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+SELECT = f"SELECT id, {', '.join(COLUMNS)} FROM interventions"
+
+
+class MaintenanceStore:
+    """Magasin SQLite partagé par toutes les sessions du processus
+
+    Une seule connexion (mode WAL: les lectures ne bloquent pas l'écriture),
+    protégée par un verrou. Les ajouts sont mis en file et écrits par lots,
+    en une transaction, par un thread de fond; toute lecture vide d'abord la
+    file, si bien qu'une session relit immédiatement ce qu'elle vient
+    d'enregistrer. Les requêtes par émetteur, période ou technicien
+    s'appuient sur les index (émetteur, date), (date) et (technicien, date).
+    """
+
+    def __init__(self, path=DEFAULT_MAINTENANCE_DB, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL_SECONDS):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Transactions explicites (BEGIN/COMMIT) plutôt que celles implicites du module sqlite3
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.written = 0
+        self.batches = 0
+        self._lock = threading.Lock()
+        self._pending = []
+        self._wakeup = threading.Condition()
+        self._writer = None
+
+    def add(self, emitter_id, date, heure, technicien, duree_h, type_='planifiée', taches=(), notes=''):
+        """Met une intervention en file d'écriture"""
+        record = (str(emitter_id), pd.Timestamp(date).strftime('%Y-%m-%d'), _clock(heure), str(technicien),
+                  float(duree_h), type_, '; '.join(taches), notes or '',
+                  pd.Timestamp.now().isoformat(timespec='seconds'))
+        with self._wakeup:
+            self._pending.append(record)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name='maintenance-writer', daemon=True)
+                self._writer.start()
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.notify()
+
+    def flush(self):
+        """Écrit la file en une transaction; renvoie le nombre d'interventions écrites
+
+        Le verrou de la connexion est pris avant de vider la file et tenu
+        jusqu'au COMMIT: un lecteur qui trouve la file vide attend donc la
+        fin de l'écriture en cours au lieu de lire avant elle.
+        """
+        with self._lock:
+            with self._wakeup:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.executemany(INSERT, batch)
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+            self.written += len(batch)
+            self.batches += 1
+        return len(batch)
+
+    def _write_loop(self):
+        while True:
+            with self._wakeup:
+                self._wakeup.wait(timeout=self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error:
+                time.sleep(self.flush_interval)
+
+    def query(self, where='', params=(), order='date DESC, heure DESC', limit=None):
+        """Interventions sous forme de DataFrame (la file en attente est écrite d'abord)"""
+        self.flush()
+        sql = f"{SELECT}{f' WHERE {where}' if where else ''} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            rows = cursor.fetchall()
+            columns = [c[0] for c in cursor.description]
+        return pd.DataFrame(rows, columns=columns)
+
+    def history(self, emitter_id, start=None, end=None, limit=None, ascending=False):
+        """Interventions d'un émetteur sur une période, les plus récentes d'abord (sauf `ascending`)"""
+        where, params = _date_range('emitter_id = ?', [str(emitter_id)], start, end)
+        order = 'date, heure' if ascending else 'date DESC, heure DESC'
+        return self.query(where, params, order=order, limit=limit)
+
+    def next_bookings(self, emitter_ids, start):
+        """Première intervention à partir de `start` de chaque émetteur, indexée par émetteur
+
+        Une seule requête par lot de MAX_SQL_PARAMS identifiants (et non une
+        par émetteur), servie par l'index (émetteur, date).
+        """
+        self.flush()
+        ids = [str(e) for e in dict.fromkeys(emitter_ids)]
+        day = pd.Timestamp(start).strftime('%Y-%m-%d')
+        rows, columns = [], ['id'] + COLUMNS
+        with self._lock:
+            for lo in range(0, len(ids), MAX_SQL_PARAMS):
+                chunk = ids[lo:lo + MAX_SQL_PARAMS]
+                cursor = self.conn.execute(
+                    f"SELECT {', '.join(columns)} FROM ("
+                    f"SELECT *, ROW_NUMBER() OVER (PARTITION BY emitter_id ORDER BY date, heure) AS rang "
+                    f"FROM interventions WHERE date >= ? AND emitter_id IN ({', '.join('?' * len(chunk))})"
+                    f") WHERE rang = 1",
+                    [day, *chunk])
+                rows += cursor.fetchall()
+        return pd.DataFrame(rows, columns=columns).set_index('emitter_id', drop=False)
+
+    def between(self, start=None, end=None, technicien=None):
+        """Interventions de toute la flotte (ou d'un technicien) sur une période, dans l'ordre chronologique"""
+        where, params = ('technicien = ?', [str(technicien)]) if technicien is not None else ('', [])
+        where, params = _date_range(where, params, start, end)
+        return self.query(where, params, order='date, heure')
+
+    def seed(self, emitters):
+        """Reprend la dernière maintenance connue des émetteurs encore absents du magasin"""
+        self.flush()
+        with self._lock:
+            known = {row[0] for row in self.conn.execute("SELECT DISTINCT emitter_id FROM interventions")}
+        created = pd.Timestamp.now().isoformat(timespec='seconds')
+        records = [
+            (str(emitter_id), pd.Timestamp(last).strftime('%Y-%m-%d'), '02:00', str(technicien), 2.0,
+             'préventive', '', 'Reprise des données existantes', created)
+            for emitter_id, last, technicien in zip(emitters['id'], emitters['derniere_maintenance'],
+                                                    emitters['technicien'])
+            if str(emitter_id) not in known
+        ]
+        if records:
+            with self._lock:
+                self.conn.execute('BEGIN')
+                try:
+                    self.conn.executemany(INSERT, records)
+                except Exception:
+                    self.conn.execute('ROLLBACK')
+                    raise
+                self.conn.execute('COMMIT')
+        return len(records)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.conn.close()
+
+
+def _date_range(where, params, start, end):
+    clauses = [where] if where else []
+    params = list(params)
+    if start is not None:
+        clauses.append('date >= ?')
+        params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+    if end is not None:
+        clauses.append('date <= ?')
+        params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+    return ' AND '.join(clauses), params
+
+
+def _clock(value):
+    if hasattr(value, 'strftime'):
+        return value.strftime('%H:%M')
+    return str(value)[:5]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_maintenance_store(path=DEFAULT_MAINTENANCE_DB):
+    """Magasin unique par fichier pour tout le processus (connexion partagée entre sessions)"""
+    with _stores_lock:
+        if path not in _stores:
+            _stores[path] = MaintenanceStore(path)
+        return _stores[path]
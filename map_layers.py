@@ -0,0 +1,259 @@
+# map_layers.py
+"""Couches cartographiques des émetteurs sérialisées en GeoJSON (une couche par type)"""
+import numpy as np
+import pandas as pd
+
+from coverage import EARTH_RADIUS_KM
+
+REUNION_CENTER = [-21.1151, 55.5364]
+
+STATUS_COLORS = {'Actif': 'green', 'Maintenance': 'orange', 'Inactif': 'red'}
+DEFAULT_COLOR = 'red'
+
+# Nombre de sommets des polygones approchant les cercles de couverture
+CIRCLE_VERTICES = 48
+
+# Au-delà de ce nombre d'émetteurs, les marqueurs sont regroupés par le navigateur (FastMarkerCluster)
+CLUSTER_THRESHOLD = 500
+
+CONFLICT_COLORS = {'co-canal': 'darkred', 'canal adjacent': 'purple'}
+# Conflits tracés au plus (les plus graves d'abord): au-delà la carte devient illisible
+MAX_OVERLAY_CONFLICTS = 2000
+
+# Style, popup et infobulle sont portés par les propriétés GeoJSON et appliqués
+# côté navigateur: aucune fonction Python n'est évaluée par entité
+_BIND_FEATURE_JS = """
+function(feature, layer) {
+    var props = feature.properties;
+    if (layer.setStyle) {
+        layer.setStyle({color: props.color, fillColor: props.color});
+        if (props.dash) {
+            layer.setStyle({dashArray: props.dash, weight: 3});
+        }
+    }
+    if (props.popup) {
+        layer.bindPopup(props.popup, {maxWidth: 300});
+    }
+    if (props.tooltip) {
+        layer.bindTooltip(props.tooltip);
+    }
+}
+"""
+
+# Une ligne compacte par émetteur (voir emitter_rows): marqueur, popup et infobulle
+# construits dans le navigateur, le popup seulement à l'ouverture
+_CLUSTER_MARKER_JS = """
+function callback(row) {
+    var marker = L.circleMarker([row[0], row[1]], {radius: 8, fill: true, fillOpacity: 0.9, weight: 2,
+                                                   color: row[2], fillColor: row[2]});
+    marker.bindPopup(function() {
+        return '<b>' + row[3] + '</b><br>ID: ' + row[4] + '<br>Fréquence: ' + row[5] + ' MHz<br>'
+            + 'Puissance: ' + row[6] + ' W<br>Altitude: ' + row[7] + ' m<br>Couverture: ' + row[8] + ' km<br>'
+            + 'Statut: ' + row[9] + '<br>Technicien: ' + row[10] + '<br>Dernière maintenance: ' + row[11];
+    }, {maxWidth: 300});
+    marker.bindTooltip(row[3] + ' - ' + row[5] + ' MHz');
+    return marker;
+}
+"""
+
+
+def _display_ids(emitters):
+    if 'id_original' in emitters:
+        return emitters['id_original'].astype(str).tolist()
+    return emitters['id'].str.replace('_', '-').tolist()
+
+
+def emitter_features(emitters):
+    """FeatureCollection des positions d'émetteurs avec popup pré-rendu"""
+    colors = emitters['statut'].astype(str).map(STATUS_COLORS).fillna(DEFAULT_COLOR).tolist()
+    features = []
+    for display_id, nom, lat, lon, freq, power, alt, cov, statut, tech, maint, color in zip(
+            _display_ids(emitters), emitters['nom'], emitters['latitude'], emitters['longitude'],
+            emitters['frequence'], emitters['puissance'], emitters['altitude'], emitters['couverture'],
+            emitters['statut'], emitters['technicien'], emitters['derniere_maintenance'], colors):
+        popup = (f"<b>{nom}</b><br>ID: {display_id}<br>Fréquence: {freq} MHz<br>"
+                 f"Puissance: {power} W<br>Altitude: {alt} m<br>Couverture: {cov} km<br>"
+                 f"Statut: {statut}<br>Technicien: {tech}<br>Dernière maintenance: {pd.Timestamp(maint):%Y-%m-%d}")
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [float(lon), float(lat)]},
+            'properties': {'color': color, 'popup': popup, 'tooltip': f"{nom} - {freq} MHz"}
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def emitter_rows(emitters):
+    """Une ligne [lat, lon, couleur, nom, id, fréquence, puissance, altitude, couverture, statut,
+    technicien, dernière maintenance] par émetteur, pour le regroupement côté navigateur"""
+    columns = [
+        emitters['latitude'].astype(float).round(5),
+        emitters['longitude'].astype(float).round(5),
+        emitters['statut'].astype(str).map(STATUS_COLORS).fillna(DEFAULT_COLOR),
+        emitters['nom'].astype(str),
+        pd.Series(_display_ids(emitters), index=emitters.index),
+        emitters['frequence'],
+        emitters['puissance'].astype(int),
+        emitters['altitude'].astype(int),
+        emitters['couverture'],
+        emitters['statut'].astype(str),
+        emitters['technicien'].astype(str),
+        pd.to_datetime(emitters['derniere_maintenance']).dt.strftime('%Y-%m-%d')
+    ]
+    return pd.concat(columns, axis=1, ignore_index=True).to_numpy(dtype=object).tolist()
+
+
+def emitter_layer(emitters, cluster_threshold=CLUSTER_THRESHOLD):
+    """Couche des émetteurs: FeatureCollection jusqu'au seuil, lignes à regrouper au-delà"""
+    if len(emitters) > cluster_threshold:
+        return emitter_rows(emitters)
+    return emitter_features(emitters)
+
+
+def coverage_features(emitters, vertices=CIRCLE_VERTICES):
+    """FeatureCollection des zones de couverture (cercles géodésiques en polygones)"""
+    phi = np.radians(emitters['latitude'].to_numpy(dtype=float))[:, None]
+    lam = np.radians(emitters['longitude'].to_numpy(dtype=float))[:, None]
+    delta = (emitters['couverture'].to_numpy(dtype=float) / EARTH_RADIUS_KM)[:, None]
+    theta = np.linspace(0, 2 * np.pi, vertices + 1)[None, :]
+
+    # Point à distance delta dans la direction theta, pour tous les émetteurs à la fois
+    lat = np.arcsin(np.sin(phi) * np.cos(delta) + np.cos(phi) * np.sin(delta) * np.cos(theta))
+    lon = lam + np.arctan2(np.sin(theta) * np.sin(delta) * np.cos(phi),
+                           np.cos(delta) - np.sin(phi) * np.sin(lat))
+    rings = np.round(np.stack([np.degrees(lon), np.degrees(lat)], axis=2), 5).tolist()
+
+    colors = emitters['statut'].astype(str).map(STATUS_COLORS).fillna(DEFAULT_COLOR).tolist()
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+            'properties': {'color': color, 'tooltip': f"Zone de couverture: {cov} km"}
+        }
+        for ring, color, cov in zip(rings, colors, emitters['couverture'])
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def interference_features(emitters, conflicts, limit=MAX_OVERLAY_CONFLICTS):
+    """FeatureCollection des conflits de fréquence: un segment entre les deux émetteurs"""
+    conflicts = conflicts.head(limit)
+    ids = emitters['id'].astype(str)
+    positions = pd.DataFrame({'lon': emitters['longitude'].to_numpy(dtype=float),
+                              'lat': emitters['latitude'].to_numpy(dtype=float),
+                              'label': _display_ids(emitters)}, index=ids)
+    a = positions.reindex(conflicts['emetteur_a'].astype(str))
+    b = positions.reindex(conflicts['emetteur_b'].astype(str))
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': [[lon_a, lat_a], [lon_b, lat_b]]},
+            'properties': {'color': CONFLICT_COLORS.get(kind, DEFAULT_COLOR), 'dash': '6 4',
+                           'tooltip': f"{label_a} ↔ {label_b}: {kind}, {fa} / {fb} MHz, "
+                                      f"recouvrement {overlap} km"}
+        }
+        for lon_a, lat_a, label_a, lon_b, lat_b, label_b, fa, fb, kind, overlap in zip(
+            a['lon'], a['lat'], a['label'], b['lon'], b['lat'], b['label'],
+            conflicts['frequence_a'], conflicts['frequence_b'], conflicts['type'].astype(str),
+            conflicts['recouvrement_km'])
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+class EmitterMapBuilder:
+    """Assemble la carte folium à partir de couches GeoJSON déjà calculées
+
+    Au-delà de CLUSTER_THRESHOLD émetteurs, les marqueurs sont transmis en
+    lignes compactes et regroupés par le navigateur: la charge de la carte
+    et le nombre d'objets Leaflet ne croissent plus entité par entité.
+    folium n'est importé qu'à la première construction de carte: le calcul des
+    couches et les autres vues n'en dépendent pas.
+    """
+
+    def __init__(self, center=REUNION_CENTER, zoom_start=10):
+        self.center = center
+        self.zoom_start = zoom_start
+
+    def build(self, markers, coverage=None, interference=None, tiles=None):
+        import folium
+        from folium.utilities import JsCode
+
+        bind_feature = JsCode(_BIND_FEATURE_JS)
+        m = folium.Map(location=self.center, zoom_start=self.zoom_start)
+        if tiles is not None:
+            # Tuiles précalculées: le navigateur ne demande que celles de l'emprise, agrandies au-delà du zoom maximal
+            lat_min, lat_max, lon_min, lon_max = tiles['bounds']
+            folium.TileLayer(
+                tiles=tiles['url'],
+                attr="Couverture Freedom Radio",
+                name="Carte de chaleur de couverture",
+                overlay=True,
+                opacity=0.7,
+                min_native_zoom=tiles['min_zoom'],
+                max_native_zoom=tiles['max_zoom'],
+                bounds=[[lat_min, lon_min], [lat_max, lon_max]]
+            ).add_to(m)
+        if coverage is not None:
+            folium.GeoJson(
+                coverage,
+                name="Zones de couverture",
+                on_each_feature=bind_feature
+            ).add_to(m)
+        if interference is not None:
+            folium.GeoJson(
+                interference,
+                name="Conflits de fréquence",
+                on_each_feature=bind_feature
+            ).add_to(m)
+        if isinstance(markers, list):
+            # Grande flotte (voir emitter_layer): marqueurs regroupés par zoom, créés dans le navigateur
+            from folium.plugins import FastMarkerCluster
+            FastMarkerCluster(markers, callback=_CLUSTER_MARKER_JS, name="Émetteurs").add_to(m)
+        else:
+            folium.GeoJson(
+                markers,
+                name="Émetteurs",
+                marker=folium.CircleMarker(radius=8, fill=True, fill_opacity=0.9, weight=2),
+                on_each_feature=bind_feature
+            ).add_to(m)
+        return m
+
+    def component_payload(self, markers, coverage=None, interference=None, tiles=None, key=None,
+                          returned_objects=('last_clicked',)):
+        """Arguments du composant streamlit_folium pour cette carte, prêts à être mis en cache
+
+        Reprend la préparation faite par `st_folium` à chaque appel (rendu
+        folium, script Leaflet, ressources CSS/JS): calculée une fois, la
+        charge peut être resservie telle quelle à toutes les sessions.
+        S'appuie sur des fonctions internes de streamlit_folium: la version
+        est figée dans requirements.txt, à revérifier à chaque mise à jour.
+        """
+        import streamlit_folium as stf
+
+        m = self.build(markers, coverage, interference, tiles)
+        m.get_root().render()
+        m.render()
+        html = stf._get_html(m)
+        header = stf._get_header(m)
+        leaflet = stf._get_map_string(m)
+        (south, west), (north, east) = m.get_bounds()
+        defaults = {'last_clicked': None, 'zoom': m.options.get('zoom'),
+                    'bounds': {'_southWest': {'lat': south, 'lng': west}, '_northEast': {'lat': north, 'lng': east}}}
+        css_links, js_links = [], []
+        for element in _walk(m):
+            css_links.extend(href for _, href in getattr(element, 'default_css', []))
+            js_links.extend(src for _, src in getattr(element, 'default_js', []))
+        return {
+            'script': leaflet, 'header': header, 'html': html, 'id': stf.get_full_id(m),
+            'key': stf.generate_js_hash(leaflet, key, False),
+            'returned_objects': list(returned_objects),
+            'default': {k: v for k, v in defaults.items() if k in returned_objects},
+            'css_links': list(dict.fromkeys(css_links)), 'js_links': list(dict.fromkeys(js_links)),
+            'zoom': None, 'center': None, 'feature_group': None, 'layer_control': None,
+            'return_on_hover': False, 'pixelated': False, 'wrap_longitude': False
+        }
+
+
+def _walk(element):
+    yield element
+    for child in getattr(element, '_children', {}).values():
+        yield from _walk(child)
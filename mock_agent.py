@@ -0,0 +1,92 @@
+# mock_agent.py
+"""Serveur local simulant les agents de surveillance des émetteurs (tests et démonstration)"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+
+STATUS_PATH = re.compile(r'^/agents/([A-Za-z0-9_\-]+)/status$')
+# File d'attente des connexions: un balayage ouvre jusqu'à DEFAULT_CONCURRENCY connexions d'un coup
+BACKLOG = 1024
+
+
+class MockAgentServer:
+    """Répond à GET /agents/<id>/status en JSON, connexions keep-alive, latence réglable"""
+
+    def __init__(self, host='127.0.0.1', port=8765, latency=0.0, failure_rate=0.0, seed=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.connections = 0
+        self._quality = {}
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=BACKLOG)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+    def status(self, emitter_id):
+        # Marche aléatoire de la qualité, propre à chaque émetteur
+        quality = self._quality.get(emitter_id, self.rng.uniform(70, 95))
+        quality = min(100.0, max(0.0, quality + self.rng.gauss(0, 1.5)))
+        self._quality[emitter_id] = quality
+        return {'emitter_id': emitter_id, 'qualite': round(quality, 2),
+                'puissance': round(self.rng.uniform(450, 550), 1), 'timestamp': time.time()}
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+
+                parts = request_line.decode('latin-1').split()
+                match = STATUS_PATH.match(parts[1]) if len(parts) > 1 else None
+                if match is None:
+                    code, body = 404, {'erreur': 'chemin inconnu'}
+                elif self.rng.random() < self.failure_rate:
+                    code, body = 503, {'erreur': 'agent indisponible'}
+                else:
+                    code, body = 200, self.status(match.group(1))
+
+                payload = json.dumps(body).encode()
+                reason = {200: 'OK', 404: 'Not Found', 503: 'Service Unavailable'}[code]
+                writer.write(f"HTTP/1.1 {code} {reason}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(payload)}\r\nConnection: keep-alive\r\n\r\n".encode() + payload)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Client parti ou serveur arrêté (tâches annulées à la fermeture de la boucle)
+            pass
+        finally:
+            writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agents de surveillance simulés pour Freedom Radio")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help="délai de réponse simulé (s)")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="part de réponses 503")
+    args = parser.parse_args()
+    asyncio.run(MockAgentServer(args.host, args.port, args.latency, args.failure_rate).serve_forever())
@@ -0,0 +1,210 @@
+# poller.py
+"""Collecte asynchrone de l'état des agents de surveillance des émetteurs"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+DEFAULT_AGENT_URL = os.environ.get('FREEDOM_AGENT_URL', 'http://127.0.0.1:8765/agents/{id}/status')
+
+# Requêtes simultanées d'un balayage; un balayage de n sites prend environ
+# ceil(n / min(concurrence, connexions par hôte)) allers-retours. Tous les agents
+# étant derrière le même hôte, le plafond par hôte suit la concurrence par défaut.
+DEFAULT_CONCURRENCY = 512
+DEFAULT_CONNECTIONS_PER_HOST = None
+DEFAULT_TIMEOUT_SECONDS = 2.0
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_SECONDS = 0.05
+# Durée maximale d'un balayage complet: sans elle, un agent injoignable retiendrait le rerun
+# pendant (reprises + 1) x délai par requête, soit environ 6 s avec les valeurs par défaut
+DEFAULT_SWEEP_DEADLINE_SECONDS = 2.5
+
+# Durée pendant laquelle un balayage est réutilisé par les reruns et les sessions
+SWEEP_MAX_AGE_SECONDS = 5.0
+
+
+class AgentError(Exception):
+    """Réponse invalide ou erreur HTTP d'un agent"""
+
+
+class ConnectionPool:
+    """Connexions HTTP/1.1 persistantes (keep-alive), limitées par hôte"""
+
+    def __init__(self, max_per_host=DEFAULT_CONCURRENCY):
+        self.max_per_host = max_per_host
+        self._idle = {}
+        self._slots = {}
+        self.opened = 0
+
+    async def get(self, host, port, path):
+        """Requête GET; renvoie (statut, corps)"""
+        key = (host, port)
+        slots = self._slots.setdefault(key, asyncio.Semaphore(self.max_per_host))
+        async with slots:
+            idle = self._idle.setdefault(key, [])
+            while idle:
+                reader, writer = idle.pop()
+                if writer.is_closing() or reader.at_eof():
+                    continue
+                try:
+                    return await self._exchange(key, reader, writer, path)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    # Connexion fermée par l'agent entre deux requêtes: on en ouvre une neuve
+                    break
+            reader, writer = await asyncio.open_connection(host, port)
+            self.opened += 1
+            return await self._exchange(key, reader, writer, path)
+
+    async def _exchange(self, key, reader, writer, path):
+        try:
+            host, port = key
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+                         f"Connection: keep-alive\r\nAccept: application/json\r\n\r\n".encode())
+            await writer.drain()
+
+            status_line = await reader.readline()
+            if not status_line:
+                raise ConnectionResetError("connexion fermée par l'agent")
+            status = _status_code(status_line)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+        except BaseException:
+            writer.close()
+            raise
+
+        if headers.get('connection', '').lower() == 'close':
+            writer.close()
+        else:
+            self._idle[key].append((reader, writer))
+        return status, body
+
+    def close(self):
+        for connections in self._idle.values():
+            for _, writer in connections:
+                writer.close()
+        self._idle.clear()
+
+
+class TelemetryPoller:
+    """Interroge tous les agents en parallèle: un balayage dure environ un aller-retour
+
+    Concurrence bornée par sémaphore, délai maximal par requête, reprises
+    avec attente exponentielle et délai global du balayage (les agents qui
+    n'ont pas répondu à temps sont rapportés en échec). Le pool de
+    connexions vit dans une boucle asyncio dédiée (thread de fond) pour être
+    réutilisé d'un balayage à l'autre, y compris depuis les reruns Streamlit.
+    """
+
+    def __init__(self, url_template=DEFAULT_AGENT_URL, concurrency=DEFAULT_CONCURRENCY,
+                 timeout=DEFAULT_TIMEOUT_SECONDS, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF_SECONDS,
+                 max_per_host=DEFAULT_CONNECTIONS_PER_HOST, deadline=DEFAULT_SWEEP_DEADLINE_SECONDS):
+        self.url_template = url_template
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.pool = ConnectionPool(max_per_host or concurrency)
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._last_sweep = None
+
+    async def poll_one(self, emitter_id, limit):
+        """État d'un agent, avec reprises; les erreurs sont renvoyées, pas levées"""
+        url = urlsplit(self.url_template.format(id=emitter_id))
+        path = url.path + (f"?{url.query}" if url.query else '')
+        started = time.perf_counter()
+        error = None
+        for attempt in range(self.retries + 1):
+            try:
+                async with limit:
+                    status, body = await asyncio.wait_for(
+                        self.pool.get(url.hostname, url.port or 80, path), self.timeout
+                    )
+                if status != 200:
+                    raise AgentError(f"HTTP {status}")
+                payload = json.loads(body)
+                return {
+                    'emitter_id': emitter_id,
+                    'qualite': float(payload['qualite']),
+                    'puissance': float(payload['puissance']),
+                    'latence_ms': (time.perf_counter() - started) * 1000,
+                    'erreur': None
+                }
+            except (OSError, asyncio.TimeoutError, AgentError, ValueError, KeyError) as exc:
+                error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+        return {'emitter_id': emitter_id, 'qualite': None, 'puissance': None,
+                'latence_ms': (time.perf_counter() - started) * 1000, 'erreur': error}
+
+    async def sweep(self, emitter_ids):
+        """Interroge tous les émetteurs simultanément, en au plus `deadline` secondes"""
+        limit = asyncio.Semaphore(self.concurrency)
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(self.poll_one(e, limit)) for e in emitter_ids]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.deadline)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        results = [
+            task.result() if not task.cancelled() else
+            {'emitter_id': e, 'qualite': None, 'puissance': None, 'latence_ms': elapsed_ms,
+             'erreur': 'délai du balayage dépassé'}
+            for e, task in zip(emitter_ids, tasks)
+        ]
+        return pd.DataFrame(results, columns=['emitter_id', 'qualite', 'puissance', 'latence_ms', 'erreur'])
+
+    def sweep_sync(self, emitter_ids, max_age=SWEEP_MAX_AGE_SECONDS):
+        """Balayage depuis du code synchrone; réutilise un résultat récent pour les mêmes émetteurs"""
+        key = tuple(emitter_ids)
+        last = self._last_sweep
+        if last is not None and last[0] == key and time.time() - last[1] < max_age:
+            return last[2]
+        future = asyncio.run_coroutine_threadsafe(self.sweep(emitter_ids), self._ensure_loop())
+        result = future.result()
+        self._last_sweep = (key, time.time(), result)
+        return result
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever,
+                                                name='agent-poller', daemon=True)
+                self._thread.start()
+            return self._loop
+
+
+def _status_code(status_line):
+    """Code HTTP d'une ligne de statut; AgentError si elle est mal formée (échec du relevé)"""
+    parts = status_line.split()
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise AgentError(f"ligne de statut invalide: {status_line[:60]!r}")
+    return int(parts[1])
+
+
+_pollers = {}
+_pollers_lock = threading.Lock()
+
+
+def get_poller(url_template=DEFAULT_AGENT_URL):
+    """Collecteur partagé par tout le processus (un pool de connexions par modèle d'URL)"""
+    with _pollers_lock:
+        if url_template not in _pollers:
+            _pollers[url_template] = TelemetryPoller(url_template)
+        return _pollers[url_template]
@@ -0,0 +1,254 @@
+# profiling.py
+"""Profilage léger du dashboard: durée des sections, lignes traitées, taux de succès des caches"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+METRICS_PREFIX = 'freedom_dashboard'
+METRICS_PORT = os.environ.get('FREEDOM_METRICS_PORT')  # ex. 9108; pas de serveur si absent
+METRICS_FILE = os.environ.get('FREEDOM_METRICS_FILE')  # fichier texte Prometheus (textfile collector)
+# Démarrage du processus: horodatage posé par serve.py, à défaut l'import de ce module
+PROCESS_STARTED = float(os.environ.get('FREEDOM_START_TIME') or time.time())
+
+# Bornes des histogrammes de durée (secondes)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RunRecord:
+    """Mesures d'une exécution du script (un rerun d'une session)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = None
+        self.sections = {}  # nom -> [secondes, lignes]
+        self.cache = {}     # nom -> [succès, échecs]
+        self.stack = []
+
+    def frame(self):
+        return pd.DataFrame(
+            [(name, seconds * 1000, rows) for name, (seconds, rows) in self.sections.items()],
+            columns=['section', 'duree_ms', 'lignes']
+        )
+
+
+class _Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+
+class Profiler:
+    """Agrégats pour tout le processus, alimentés par les mesures de chaque exécution
+
+    L'exécution en cours est propre au thread (Streamlit exécute chaque
+    session dans son propre thread): les lignes et accès cache enregistrés
+    au fond du code sont rattachés à la section active de ce thread.
+    """
+
+    def __init__(self):
+        self.runs = _Histogram()
+        self.sections = {}
+        self.rows = {}
+        self.cache = {}
+        self.startup = {}  # phase -> secondes, mesurée une seule fois par processus
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        return getattr(self._local, 'run', None)
+
+    @contextmanager
+    def run(self):
+        """Mesure une exécution complète du script"""
+        record = RunRecord()
+        self._local.run = record
+        try:
+            yield record
+        finally:
+            record.duration = time.perf_counter() - record.started
+            self._local.run = None
+            with self._lock:
+                self.runs.observe(record.duration)
+                if 'premier_rendu' not in self.startup:
+                    # Premier rendu complet: démarrage du processus -> fin de la première exécution
+                    self.startup['premier_rendu'] = time.time() - PROCESS_STARTED
+                    self.startup['premiere_execution'] = record.duration
+
+    @contextmanager
+    def section(self, name):
+        """Mesure une section (les sections imbriquées comptent aussi dans leur parent)"""
+        record = self.current
+        started = time.perf_counter()
+        if record is not None:
+            record.stack.append(name)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if record is not None:
+                record.stack.pop()
+                stats = record.sections.setdefault(name, [0.0, 0])
+                stats[0] += elapsed
+            with self._lock:
+                self.sections.setdefault(name, _Histogram()).observe(elapsed)
+
+    def count_rows(self, n, section=None):
+        """Lignes traitées, attribuées à la section active (ou à `section`)"""
+        record = self.current
+        if section is None:
+            section = record.stack[-1] if record is not None and record.stack else 'hors_section'
+        if record is not None:
+            record.sections.setdefault(section, [0.0, 0])[1] += int(n)
+        with self._lock:
+            self.rows[section] = self.rows.get(section, 0) + int(n)
+
+    def cache_lookup(self, name, hit):
+        """Accès à un cache nommé: succès ou échec"""
+        record = self.current
+        if record is not None:
+            record.cache.setdefault(name, [0, 0])[0 if hit else 1] += 1
+        with self._lock:
+            self.cache.setdefault(name, [0, 0])[0 if hit else 1] += 1
+
+    def record_startup(self, phase, seconds):
+        """Durée d'une phase de démarrage (préchauffage, ...), conservée à la première mesure"""
+        with self._lock:
+            self.startup.setdefault(phase, seconds)
+
+    def startup_frame(self):
+        with self._lock:
+            return pd.DataFrame(list(self.startup.items()), columns=['phase', 'secondes'])
+
+    def summary(self):
+        """Sections (nombre, moyenne, max) et caches (taux de succès) depuis le démarrage"""
+        with self._lock:
+            sections = pd.DataFrame(
+                [(name, h.count, h.sum / h.count * 1000, h.max * 1000, self.rows.get(name, 0))
+                 for name, h in self.sections.items()],
+                columns=['section', 'executions', 'moyenne_ms', 'max_ms', 'lignes']
+            )
+            cache = pd.DataFrame(
+                [(name, hits, misses, hits / max(hits + misses, 1)) for name, (hits, misses) in self.cache.items()],
+                columns=['cache', 'succes', 'echecs', 'taux_succes']
+            )
+        return sections, cache
+
+    def prometheus_text(self):
+        """Export au format texte Prometheus (exposition 0.0.4)"""
+        p = METRICS_PREFIX
+        lines = []
+        with self._lock:
+            lines += [f"# HELP {p}_run_seconds Durée d'une exécution complète du script",
+                      f"# TYPE {p}_run_seconds histogram"]
+            lines += _histogram_lines(f"{p}_run_seconds", '', self.runs)
+
+            lines += [f"# HELP {p}_startup_seconds Phases du démarrage à froid (premier rendu, préchauffage)",
+                      f"# TYPE {p}_startup_seconds gauge"]
+            lines += [f'{p}_startup_seconds{{phase="{_escape(phase)}"}} {seconds:.6f}'
+                      for phase, seconds in sorted(self.startup.items())]
+
+            lines += [f"# HELP {p}_section_seconds Durée des sections du dashboard",
+                      f"# TYPE {p}_section_seconds histogram"]
+            for name, hist in sorted(self.sections.items()):
+                lines += _histogram_lines(f"{p}_section_seconds", f'section="{_escape(name)}"', hist)
+
+            lines += [f"# HELP {p}_rows_processed_total Lignes traitées par section",
+                      f"# TYPE {p}_rows_processed_total counter"]
+            lines += [f'{p}_rows_processed_total{{section="{_escape(name)}"}} {n}'
+                      for name, n in sorted(self.rows.items())]
+
+            lines += [f"# HELP {p}_cache_requests_total Accès aux caches par résultat",
+                      f"# TYPE {p}_cache_requests_total counter"]
+            for name, (hits, misses) in sorted(self.cache.items()):
+                lines.append(f'{p}_cache_requests_total{{cache="{_escape(name)}",result="hit"}} {hits}')
+                lines.append(f'{p}_cache_requests_total{{cache="{_escape(name)}",result="miss"}} {misses}')
+        return '\n'.join(lines) + '\n'
+
+    def write_file(self, path=METRICS_FILE):
+        """Écrit l'export dans un fichier (remplacement atomique)"""
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def serve(self, port, host='127.0.0.1'):
+        """Expose /metrics en HTTP local dans un thread de fond"""
+        profiler = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = profiler.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+        return server
+
+
+def _histogram_lines(metric, labels, hist):
+    sep = ',' if labels else ''
+    lines = [f'{metric}_bucket{{{labels}{sep}le="{bound}"}} {n}' for bound, n in zip(DURATION_BUCKETS, hist.buckets)]
+    lines.append(f'{metric}_bucket{{{labels}{sep}le="+Inf"}} {hist.count}')
+    suffix = f'{{{labels}}}' if labels else ''
+    lines.append(f'{metric}_sum{suffix} {hist.sum:.6f}')
+    lines.append(f'{metric}_count{suffix} {hist.count}')
+    return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_profiler = Profiler()
+_exporters_started = False
+_exporters_lock = threading.Lock()
+
+
+def get_profiler():
+    """Profileur partagé par tout le processus"""
+    return _profiler
+
+
+def start_exporters(port=METRICS_PORT, path=METRICS_FILE):
+    """Démarre une seule fois l'endpoint /metrics et/ou l'écriture périodique du fichier"""
+    global _exporters_started
+    with _exporters_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+    if port:
+        _profiler.serve(port)
+    if path:
+        def write_loop():
+            while True:
+                try:
+                    _profiler.write_file(path)
+                except OSError:
+                    pass
+                time.sleep(15)
+        threading.Thread(target=write_loop, name='metrics-file', daemon=True).start()
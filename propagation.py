@@ -0,0 +1,350 @@
+# propagation.py
+"""Propagation radio tenant compte du relief (modèle numérique de terrain mappé en mémoire)"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from coverage import EARTH_RADIUS_KM, REUNION_BOUNDS, CoverageEngine, CoverageRaster
+
+DEFAULT_DEM_PATH = os.environ.get(
+    'FREEDOM_DEM_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'dem', 'reunion_dem.npy')
+)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'propagation')
+
+# Paramètres du modèle
+K_FACTOR = 4 / 3          # rayon terrestre effectif (atmosphère standard)
+MAST_HEIGHT_M = 30        # hauteur du pylône au-dessus du site
+RX_HEIGHT_M = 10          # hauteur de réception de référence (ITU pour la FM)
+TX_GAIN_DBI = 2.15        # dipôle demi-onde
+SENSITIVITY_DBM = -63     # ~54 dBµV/m à 100 MHz: réception stéréo exploitable (UIT-R BS.412)
+STRONG_SIGNAL_DBM = -35   # ~82 dBµV/m: signal considéré à 100 %
+
+DEFAULT_AZIMUTHS = 72
+DEFAULT_MAX_RANGE_KM = 60
+DEFAULT_STEP_KM = 0.2
+
+# En dessous de ce volume de travail, le calcul reste dans le processus courant
+PARALLEL_MIN_EMITTERS = 16
+PARALLEL_MIN_CELLS = 4_000_000
+
+# Sommets et cirques utilisés pour le relief synthétique: (lat, lon, altitude ou fond, rayon en degrés)
+_PEAKS = [(-21.0989, 55.4781, 3070, 0.30), (-21.2444, 55.7083, 2632, 0.20)]
+_CIRQUES = [(-21.1450, 55.4550, 1200, 0.040), (-21.0500, 55.4000, 900, 0.045),
+            (-21.0300, 55.5300, 900, 0.045)]
+
+
+class ElevationRaster:
+    """Modèle numérique de terrain (altitudes en m) lu par mappage mémoire
+
+    Format: tableau `.npy` (ligne 0 au nord) accompagné d'un fichier `.json`
+    donnant `lat_max`, `lon_min` et `cell_deg`. Seules les pages du fichier
+    réellement échantillonnées sont chargées par le système.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(_meta_path(path)) as f:
+            meta = json.load(f)
+        self.lat_max = meta['lat_max']
+        self.lon_min = meta['lon_min']
+        self.cell_deg = meta['cell_deg']
+        self.data = np.load(path, mmap_mode='r')
+
+    @property
+    def key(self):
+        """Identifiant du raster: change si le fichier est remplacé"""
+        return f"{os.path.abspath(self.path)}:{os.path.getmtime(self.path)}"
+
+    def sample(self, lats, lons):
+        """Altitude au plus proche voisin (0 en mer et hors emprise)"""
+        rows = np.rint((self.lat_max - np.asarray(lats)) / self.cell_deg).astype(np.int64)
+        cols = np.rint((np.asarray(lons) - self.lon_min) / self.cell_deg).astype(np.int64)
+        n_rows, n_cols = self.data.shape
+        inside = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+        heights = np.zeros(rows.shape, dtype=np.float64)
+        heights[inside] = self.data[rows[inside], cols[inside]]
+        return heights
+
+
+def build_synthetic_dem(path, cell_deg=0.002, bounds=(-21.45, -20.80, 55.15, 55.90)):
+    """Relief approché de La Réunion (deux volcans, trois cirques) pour la démonstration"""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    lats = np.arange(lat_max, lat_min, -cell_deg)[:, None]
+    lons = np.arange(lon_min, lon_max, cell_deg)[None, :]
+
+    height = np.zeros((lats.shape[0], lons.shape[1]))
+    for lat, lon, summit, radius in _PEAKS:
+        d = np.hypot(lats - lat, (lons - lon) * np.cos(np.radians(lat)))
+        height = np.maximum(height, summit * np.clip(1 - d / radius, 0, 1) ** 1.3)
+    for lat, lon, floor, radius in _CIRQUES:
+        d = np.hypot(lats - lat, (lons - lon) * np.cos(np.radians(lat)))
+        inner = d < radius
+        height[inner] = np.minimum(height[inner], floor + (height[inner] - floor) * (d[inner] / radius) ** 4)
+
+    # Trait de côte elliptique
+    shore = ((lons - 55.53) / 0.33) ** 2 + ((lats + 21.13) / 0.27) ** 2
+    height *= np.clip((1 - shore) * 8, 0, 1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    np.save(path, height.astype(np.int16))
+    with open(_meta_path(path), 'w') as f:
+        json.dump({'lat_max': lat_max, 'lon_min': lon_min, 'cell_deg': cell_deg, 'synthetic': True}, f)
+    return ElevationRaster(path)
+
+
+class RadialCoverage:
+    """Puissance reçue (dBm) le long des radiales d'un émetteur"""
+
+    def __init__(self, azimuths, distances, rx_dbm):
+        self.azimuths = azimuths    # degrés
+        self.distances = distances  # km
+        self.rx_dbm = rx_dbm        # tableau (azimuts, distances)
+
+    @property
+    def covered(self):
+        return self.rx_dbm >= SENSITIVITY_DBM
+
+    @property
+    def reach_km(self):
+        """Distance du point desservi le plus lointain, par azimut"""
+        covered = self.covered
+        last = covered.shape[1] - 1 - np.argmax(covered[:, ::-1], axis=1)
+        return np.where(covered.any(axis=1), self.distances[last], 0.0)
+
+    @property
+    def covered_fraction(self):
+        return float(self.covered.mean())
+
+
+def compute_radials(lat, lon, altitude, power_w, frequency_mhz, dem,
+                    n_azimuths=DEFAULT_AZIMUTHS, max_range_km=DEFAULT_MAX_RANGE_KM,
+                    step_km=DEFAULT_STEP_KM):
+    """Visibilité directe et affaiblissement le long de toutes les radiales d'un émetteur
+
+    Affaiblissement = espace libre + diffraction par l'obstacle dominant
+    (arête en lame de couteau, ITU-R P.526), avec courbure terrestre
+    corrigée par le facteur k = 4/3.
+    """
+    azimuths = np.arange(n_azimuths) * 360.0 / n_azimuths
+    distances = np.arange(1, int(round(max_range_km / step_km)) + 1) * step_km
+
+    # Points échantillonnés sur les radiales (formule du point de destination)
+    phi, lam = np.radians(lat), np.radians(lon)
+    theta = np.radians(azimuths)[:, None]
+    delta = distances[None, :] / EARTH_RADIUS_KM
+    phi2 = np.arcsin(np.sin(phi) * np.cos(delta) + np.cos(phi) * np.sin(delta) * np.cos(theta))
+    lam2 = lam + np.arctan2(np.sin(theta) * np.sin(delta) * np.cos(phi),
+                            np.cos(delta) - np.sin(phi) * np.sin(phi2))
+    ground = dem.sample(np.degrees(phi2), np.degrees(lam2))
+
+    tx = max(float(altitude), float(dem.sample(lat, lon))) + MAST_HEIGHT_M
+    d_m = distances * 1000.0
+    terrain = ground - d_m ** 2 / (2 * K_FACTOR * EARTH_RADIUS_KM * 1000.0)
+    receiver = terrain + RX_HEIGHT_M
+
+    # Horizon: pente maximale des obstacles situés avant chaque point
+    slope = (terrain - tx) / d_m
+    horizon = np.maximum.accumulate(slope, axis=1)
+    positions = np.broadcast_to(np.arange(len(distances)), slope.shape)
+    obstacle = np.maximum.accumulate(np.where(slope >= horizon, positions, 0), axis=1)
+    obstacle = np.concatenate([np.zeros((len(azimuths), 1), dtype=np.int64), obstacle[:, :-1]], axis=1)
+
+    # Hauteur de l'obstacle dominant au-dessus du trajet direct émetteur-récepteur
+    d1 = d_m[obstacle]
+    d2 = np.maximum(d_m[None, :] - d1, 1.0)
+    obstacle_height = np.take_along_axis(terrain, obstacle, axis=1)
+    line_height = tx + (receiver - tx) * d1 / d_m[None, :]
+    clearance = obstacle_height - line_height
+    clearance[:, 0] = -np.inf
+
+    wavelength = 299.792458 / frequency_mhz
+    nu = np.maximum(clearance * np.sqrt(2 * (d1 + d2) / (wavelength * d1 * d2)), -0.78)
+    diffraction = np.where(
+        nu > -0.78,
+        6.9 + 20 * np.log10(np.sqrt((nu - 0.1) ** 2 + 1) + nu - 0.1),
+        0.0
+    )
+
+    free_space = 32.45 + 20 * np.log10(frequency_mhz) + 20 * np.log10(distances)
+    eirp = 10 * np.log10(power_w * 1000.0) + TX_GAIN_DBI
+    rx_dbm = (eirp - free_space[None, :] - diffraction).astype(np.float32)
+    return RadialCoverage(azimuths, distances, rx_dbm)
+
+
+def signal_percent(rx_dbm):
+    """Conversion dBm -> force du signal (%) compatible avec la carte de chaleur"""
+    return np.clip((rx_dbm - SENSITIVITY_DBM) * 100.0 / (STRONG_SIGNAL_DBM - SENSITIVITY_DBM), 0, 100)
+
+
+_worker_rasters = {}
+
+
+def _open_raster(path):
+    """Raster ouvert une seule fois par processus"""
+    if path not in _worker_rasters:
+        _worker_rasters[path] = ElevationRaster(path)
+    return _worker_rasters[path]
+
+
+def _radials_task(args):
+    lat, lon, altitude, power, frequency, dem_path, settings, out_path = args
+    result = compute_radials(lat, lon, altitude, power, frequency, _open_raster(dem_path), **settings)
+    np.save(out_path, result.rx_dbm)
+    return out_path
+
+
+def _raster_tile_task(args):
+    """Force du signal maximale sur une bande de lignes de la grille"""
+    lats, lons, sites, paths, settings = args
+    step = settings['step_km']
+    n_az = settings['n_azimuths']
+    tile = np.zeros((len(lats), len(lons)), dtype=np.float32)
+    lat_grid, lon_grid = np.meshgrid(lats, lons, indexing='ij')
+
+    for (lat, lon), path in zip(sites, paths):
+        rx_dbm = np.load(path, mmap_mode='r')
+        phi1, phi2 = np.radians(lat), np.radians(lat_grid)
+        dlam = np.radians(lon_grid - lon)
+        a = np.sin((phi2 - phi1) / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+        dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+        bearing = np.degrees(np.arctan2(np.sin(dlam) * np.cos(phi2),
+                                        np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(dlam)))
+
+        az_idx = np.rint((bearing % 360) * n_az / 360).astype(np.int64) % n_az
+        d_idx = np.rint(dist / step).astype(np.int64) - 1
+        inside = d_idx < rx_dbm.shape[1]
+        d_idx = np.clip(d_idx, 0, rx_dbm.shape[1] - 1)
+        strength = np.where(inside, signal_percent(np.asarray(rx_dbm)[az_idx, d_idx]), 0)
+        np.maximum(tile, strength, out=tile)
+    return tile
+
+
+class TerrainPropagationModel:
+    """Calcule et met en cache la couverture avec relief de chaque émetteur
+
+    Un émetteur n'est recalculé que si sa position, son altitude, sa
+    puissance ou sa fréquence (ou le raster) changent; ses radiales
+    précédentes sont alors supprimées du cache. Les radiales et les
+    bandes de la grille sont réparties sur un pool de processus quand le
+    volume le justifie; les résultats transitent par des fichiers `.npy`
+    relus par mappage mémoire.
+    """
+
+    def __init__(self, dem_path=DEFAULT_DEM_PATH, cache_dir=DEFAULT_CACHE_DIR, max_workers=None,
+                 n_azimuths=DEFAULT_AZIMUTHS, max_range_km=DEFAULT_MAX_RANGE_KM, step_km=DEFAULT_STEP_KM):
+        if not os.path.exists(dem_path):
+            build_synthetic_dem(dem_path)
+        self.dem = ElevationRaster(dem_path)
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.max_workers = max_workers
+        self.settings = {'n_azimuths': n_azimuths, 'max_range_km': max_range_km, 'step_km': step_km}
+        self._results = {}  # id émetteur -> clé des paramètres déjà calculés
+        self._lock = threading.Lock()
+        self._pool = None
+        self.computed = 0
+
+    def parameters_key(self, emitter):
+        params = (round(float(emitter['latitude']), 6), round(float(emitter['longitude']), 6),
+                  float(emitter['altitude']), float(emitter['puissance']), float(emitter['frequence']),
+                  self.dem.key, sorted(self.settings.items()))
+        return hashlib.sha1(repr(params).encode()).hexdigest()[:16]
+
+    def compute(self, emitters):
+        """Couverture radiale des émetteurs: {id: RadialCoverage}"""
+        paths = self._ensure(emitters)
+        azimuths = np.arange(self.settings['n_azimuths']) * 360.0 / self.settings['n_azimuths']
+        n_steps = int(round(self.settings['max_range_km'] / self.settings['step_km']))
+        distances = np.arange(1, n_steps + 1) * self.settings['step_km']
+        return {emitter_id: RadialCoverage(azimuths, distances, np.load(path, mmap_mode='r'))
+                for emitter_id, path in paths.items()}
+
+    def raster(self, emitters, grid_points=200, bounds=REUNION_BOUNDS):
+        """Carte de chaleur de la couverture avec relief, au format CoverageRaster"""
+        lats, lons = CoverageEngine(bounds).grid(grid_points)
+        paths = self._ensure(emitters)
+        sites = list(zip(emitters['latitude'].astype(float), emitters['longitude'].astype(float)))
+        files = [paths[e] for e in emitters['id']]
+
+        signal = np.zeros((len(lats), len(lons)), dtype=np.float32)
+        if not files:
+            return CoverageRaster(lats, lons, signal, bounds)
+
+        if len(lats) * len(lons) * len(files) < PARALLEL_MIN_CELLS:
+            signal = _raster_tile_task((lats, lons, sites, files, self.settings))
+        else:
+            bands = np.array_split(np.arange(len(lats)), min(len(lats), 4 * (os.cpu_count() or 1)))
+            tasks = [(lats[band], lons, sites, files, self.settings) for band in bands if len(band)]
+            signal = np.vstack(list(self._executor().map(_raster_tile_task, tasks)))
+        return CoverageRaster(lats, lons, signal, bounds)
+
+    def _ensure(self, emitters):
+        """Calcule les émetteurs nouveaux ou modifiés; renvoie {id: fichier des radiales}"""
+        pending, paths = [], {}
+        with self._lock:
+            for emitter in emitters.to_dict('records'):
+                key = self.parameters_key(emitter)
+                path = os.path.join(self.cache_dir, f"{emitter['id']}-{key}.npy")
+                paths[emitter['id']] = path
+                if self._results.get(emitter['id']) == key or os.path.exists(path):
+                    self._results[emitter['id']] = key
+                    continue
+                task = (float(emitter['latitude']), float(emitter['longitude']), float(emitter['altitude']),
+                        float(emitter['puissance']), float(emitter['frequence']),
+                        self.dem.path, self.settings, path)
+                pending.append((emitter['id'], key, task))
+
+            tasks = [task for _, _, task in pending]
+            if len(tasks) >= PARALLEL_MIN_EMITTERS:
+                list(self._executor().map(_radials_task, tasks, chunksize=4))
+            else:
+                for task in tasks:
+                    _radials_task(task)
+            for emitter_id, key, _ in pending:
+                self._results[emitter_id] = key
+            self.computed += len(pending)
+            if pending:
+                self._evict({emitter_id: key for emitter_id, key, _ in pending})
+        return paths
+
+    def _evict(self, current):
+        """Supprime les radiales des anciens paramètres des émetteurs recalculés (une entrée par émetteur)"""
+        for name in os.listdir(self.cache_dir):
+            stem, ext = os.path.splitext(name)
+            emitter_id, _, key = stem.rpartition('-')
+            if ext == '.npy' and emitter_id in current and key != current[emitter_id]:
+                # Un lecteur qui mappe encore l'ancien fichier garde ses pages jusqu'à la fin de sa lecture
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn: pas de fork d'un serveur Streamlit multi-thread
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_propagation_model():
+    """Modèle unique pour le processus: son cache survit aux changements de version des données"""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = TerrainPropagationModel()
+        return _model
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + '.json'
@@ -0,0 +1,258 @@
+# report.py
+"""Rapport de flotte sans navigateur: indicateurs, couverture, signal et maintenance exportés sur disque
+
+Usage:
+    python report.py --output reports/ --formats csv,parquet,html,json
+"""
+import argparse
+import html
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+# Formats d'export disponibles
+FORMATS = ('csv', 'parquet', 'html', 'json')
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'reports')
+# Émetteurs par tâche du pool (les pages de chaque émetteur sont écrites par lots)
+CHUNK_SIZE = 256
+
+PAGE_STYLE = """
+<style>
+  body { font-family: sans-serif; margin: 2rem; color: #222; }
+  h1 { color: #FF6B00; }
+  table { border-collapse: collapse; margin: 1rem 0; }
+  th, td { border: 1px solid #ddd; padding: 4px 8px; text-align: right; }
+  th { background: #FFF3E0; }
+</style>
+"""
+
+
+def export_table(frame, path_stem, formats):
+    """Écrit une table dans chacun des formats demandés (même nom, extensions différentes)"""
+    written = []
+    if 'csv' in formats:
+        frame.to_csv(f"{path_stem}.csv", index=False)
+        written.append(f"{path_stem}.csv")
+    if 'parquet' in formats:
+        frame.to_parquet(f"{path_stem}.parquet", index=False)
+        written.append(f"{path_stem}.parquet")
+    if 'json' in formats:
+        frame.to_json(f"{path_stem}.json", orient='records', date_format='iso', force_ascii=False)
+        written.append(f"{path_stem}.json")
+    return written
+
+
+def html_page(title, sections):
+    """Page HTML statique: titre puis (sous-titre, contenu HTML) successifs"""
+    body = ''.join(f"<h2>{html.escape(heading)}</h2>{content}" for heading, content in sections)
+    return (f"<!DOCTYPE html><html lang='fr'><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+            f"{PAGE_STYLE}</head><body><h1>{html.escape(title)}</h1>{body}</body></html>")
+
+
+def _table_html(frame):
+    return _records_html(list(frame.columns), frame.to_dict('records'))
+
+
+def _records_html(columns, records):
+    """Tableau HTML à partir d'enregistrements (plus rapide que DataFrame.to_html par petite table)"""
+    head = ''.join(f"<th>{html.escape(str(c))}</th>" for c in columns)
+    body = ''.join(
+        '<tr>' + ''.join(f"<td>{_cell(record.get(c))}</td>" for c in columns) + '</tr>'
+        for record in records
+    )
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def _cell(value):
+    if isinstance(value, float):
+        return f"{value:.1f}"
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    return html.escape(str(value))
+
+
+def _json_value(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _records_by_emitter(frame):
+    """Enregistrements groupés par émetteur, sans la colonne emitter_id"""
+    grouped = {}
+    for record in frame.to_dict('records'):
+        grouped.setdefault(str(record.pop('emitter_id')), []).append(
+            {k: _json_value(v) for k, v in record.items()}
+        )
+    return grouped
+
+
+def _emitter_pages_task(task):
+    """Pages d'un lot d'émetteurs (exécuté dans un processus du pool)"""
+    out_dir, formats, emitters, summary, daily, maintenance = task
+    summaries = _records_by_emitter(summary)
+    daily_groups = _records_by_emitter(daily)
+    plans = _records_by_emitter(maintenance)
+    daily_columns = [c for c in daily.columns if c != 'emitter_id']
+    written = 0
+    for emitter in emitters.to_dict('records'):
+        emitter_id = str(emitter['id'])
+        record = {
+            'emetteur': {k: _json_value(v) for k, v in emitter.items()},
+            'signal': summaries.get(emitter_id, [None])[0],
+            'signal_journalier': daily_groups.get(emitter_id, []),
+            'maintenance': plans.get(emitter_id, [None])[0]
+        }
+        stem = os.path.join(out_dir, emitter_id)
+        if 'json' in formats:
+            with open(f"{stem}.json", 'w') as f:
+                json.dump(record, f, ensure_ascii=False, default=str)
+        if 'html' in formats:
+            sections = [('Fiche', _records_html(list(emitter), [emitter]))]
+            if record['signal'] is not None:
+                sections.append(('Qualité du signal sur la période',
+                                 _records_html(list(record['signal']), [record['signal']])))
+            if record['signal_journalier']:
+                sections.append(('Qualité journalière', _records_html(daily_columns, record['signal_journalier'])))
+            if record['maintenance'] is not None:
+                sections.append(('Prochaine maintenance',
+                                 _records_html(list(record['maintenance']), [record['maintenance']])))
+            with open(f"{stem}.html", 'w') as f:
+                f.write(html_page(f"{emitter['nom']} ({emitter_id})", sections))
+        written += 1
+    return written
+
+
+class FleetReport:
+    """Calculs du dashboard réutilisés hors Streamlit, puis exportés"""
+
+    def __init__(self, dashboard, start=None, end=None, grid_points=200):
+        self.dashboard = dashboard
+        self.dashboard.date_range = (start, end)
+        self.grid_points = grid_points
+
+    def compute(self):
+        """Indicateurs, raster de couverture, synthèses de signal et planning de maintenance"""
+        dashboard = self.dashboard
+        start, end = dashboard.date_range
+        raster = dashboard.get_coverage_raster(self.grid_points)
+        kpis = dashboard.compute_key_metrics()
+        kpis['taux_couverture'] = float(raster.coverage_ratio())
+        maintenance = dashboard.build_maintenance_schedule().drop(columns='priorite_order')
+        return {
+            'kpis': kpis,
+            'emitters': dashboard.emitters,
+            'coverage': raster.to_frame(),
+            'signal_summary': dashboard.rollups.summary(start, end),
+            'signal_daily': dashboard.rollups.daily(start, end),
+            'maintenance': maintenance,
+            'interference': dashboard.get_interference()
+        }
+
+    def export(self, output_dir, formats=FORMATS, workers=None):
+        """Écrit les tables de flotte puis, en parallèle, les fiches par émetteur"""
+        results = self.compute()
+        os.makedirs(output_dir, exist_ok=True)
+        written = []
+
+        with open(os.path.join(output_dir, 'kpis.json'), 'w') as f:
+            json.dump(results['kpis'], f, ensure_ascii=False, indent=2)
+        written.append(os.path.join(output_dir, 'kpis.json'))
+
+        table_formats = [fmt for fmt in formats if fmt != 'html']
+        for name in ('emitters', 'coverage', 'signal_summary', 'signal_daily', 'maintenance', 'interference'):
+            written += export_table(results[name], os.path.join(output_dir, name), table_formats)
+
+        if 'html' in formats:
+            path = os.path.join(output_dir, 'index.html')
+            with open(path, 'w') as f:
+                f.write(self._index_html(results))
+            written.append(path)
+
+        written_pages = self._export_emitter_pages(results, os.path.join(output_dir, 'emetteurs'),
+                                                   [fmt for fmt in formats if fmt in ('html', 'json')], workers)
+        return written, written_pages
+
+    def _export_emitter_pages(self, results, out_dir, formats, workers):
+        if not formats:
+            return 0
+        os.makedirs(out_dir, exist_ok=True)
+        emitters = results['emitters']
+        summary = results['signal_summary']
+        daily = results['signal_daily']
+        maintenance = results['maintenance']
+
+        tasks = []
+        for lo in range(0, len(emitters), CHUNK_SIZE):
+            chunk = emitters.iloc[lo:lo + CHUNK_SIZE]
+            ids = set(chunk['id'].astype(str))
+            tasks.append((out_dir, formats, chunk,
+                          summary[summary['emitter_id'].isin(ids)],
+                          daily[daily['emitter_id'].isin(ids)],
+                          maintenance[maintenance['emitter_id'].astype(str).isin(ids)]))
+
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        if workers <= 1:
+            return sum(_emitter_pages_task(task) for task in tasks)
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            return sum(pool.map(_emitter_pages_task, tasks))
+
+    def _index_html(self, results):
+        kpis = pd.DataFrame([results['kpis']])
+        statuses = results['emitters'].groupby('statut', observed=True).size().rename('emetteurs').reset_index()
+        worst = results['signal_summary'].sort_values('p5').head(20)
+        maintenance = results['maintenance'].head(50)
+        links = ''.join(f"<li><a href='emetteurs/{e}.html'>{e}</a></li>"
+                        for e in results['emitters']['id'].astype(str).head(500))
+        return html_page("Rapport de flotte Freedom Radio", [
+            ('Indicateurs clés', _table_html(kpis)),
+            ('Émetteurs par statut', _table_html(statuses)),
+            ('Qualité la plus faible (p5 sur la période)', _table_html(worst)),
+            ('Maintenances à venir', _table_html(maintenance)),
+            ('Conflits de fréquence les plus graves', _table_html(results['interference'].head(50))),
+            ('Fiches émetteurs', f"<ul>{links}</ul>")
+        ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rapport de flotte Freedom Radio sans navigateur")
+    parser.add_argument('--output', default=None, help="dossier de sortie (par défaut reports/AAAA-MM-JJ)")
+    parser.add_argument('--formats', default=','.join(FORMATS), help="formats séparés par des virgules")
+    parser.add_argument('--start', default=None, help="début de période (AAAA-MM-JJ)")
+    parser.add_argument('--end', default=None, help="fin de période (AAAA-MM-JJ)")
+    parser.add_argument('--grid-points', type=int, default=200, help="résolution du raster de couverture")
+    parser.add_argument('--workers', type=int, default=None, help="processus d'export (par défaut: nombre de cœurs)")
+    args = parser.parse_args(argv)
+
+    formats = [fmt.strip() for fmt in args.formats.split(',')]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"formats inconnus: {', '.join(sorted(unknown))}")
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, pd.Timestamp.now().strftime('%Y-%m-%d'))
+
+    # Import différé: les processus d'export n'ont pas besoin de Streamlit ni du dashboard
+    from Dashboard import RadioEmitterDashboard
+    from data_store import get_data_store
+    from fleet_data import load_saved_data
+
+    started = time.perf_counter()
+    # Données telles que le dashboard les a écrites, relues sans rien régénérer
+    try:
+        store = get_data_store('report', load_saved_data)
+        store.snapshot()
+    except FileNotFoundError as exc:
+        parser.error(str(exc))
+    report = FleetReport(RadioEmitterDashboard(store), args.start, args.end, args.grid_points)
+    written, pages = report.export(output, formats, args.workers)
+    print(f"{len(written)} fichier(s) de flotte et {pages} fiche(s) émetteur dans {output} "
+          f"en {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
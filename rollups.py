@@ -0,0 +1,240 @@
+# rollups.py
+"""Agrégats horaires et journaliers de la qualité du signal, tenus à jour incrémentalement"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from signals import SIGNAL_DTYPES, signal_days, signal_hours
+
+HOURS_PER_DAY = 24
+# Agrandissement des tableaux (émetteurs, jours): capacité multipliée d'autant, copie amortie
+GROWTH_FACTOR = 1.5
+
+# Histogramme de qualité (0-100 %) par pas de 1 %: rend le 5e centile fusionnable
+DEFAULT_BINS = 101
+PERCENTILE = 5
+
+
+class SignalRollups:
+    """Tables (émetteur, jour, heure) et (émetteur, jour): moyenne, min, max, nombre, p5
+
+    Chaque appel à `update` ne parcourt que les nouveaux échantillons: les
+    compteurs, sommes, extrêmes et histogrammes des cases touchées sont
+    fusionnés en place. Les lectures découpent les tableaux déjà agrégés, si
+    bien que leur coût ne dépend pas du volume d'échantillons bruts.
+
+    Les tableaux gardent de la réserve en émetteurs et en jours (capacité
+    agrandie d'un facteur GROWTH_FACTOR): un nouveau jour ou un nouvel
+    émetteur ne provoque qu'exceptionnellement une recopie. `follow` branche
+    les agrégats sur la télémétrie temps réel.
+    """
+
+    def __init__(self, bins=DEFAULT_BINS):
+        self.bins = bins
+        self.emitter_ids = []
+        self._emitter_index = {}
+        self._day0 = None  # premier jour couvert (datetime64[D])
+        self._n_days = 0
+        self._col0 = 0     # colonne du premier jour dans les tableaux
+        self._tables = {}
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def update(self, frame):
+        """Intègre de nouveaux échantillons (colonnes emitter_id, t, qualite)"""
+        if len(frame) == 0:
+            return
+        with self._lock:
+            codes, uniques = pd.factorize(frame['emitter_id'])
+            remap = np.array([self._emitter_slot(e) for e in uniques], dtype=np.int64)
+            emitters = remap[codes]
+
+            days = signal_days(frame)
+            self._ensure_days(days.min(), days.max())
+            columns = self._col0 + (days - self._day0).astype(np.int64)
+            hours = signal_hours(frame)
+            quality = frame['qualite'].to_numpy(dtype=np.float64)
+            bin_idx = np.clip(np.rint(quality * (self.bins - 1) / 100), 0, self.bins - 1).astype(np.int64)
+
+            daily_key = emitters * self._tables['daily']['count'].shape[1] + columns
+            hourly_key = daily_key * HOURS_PER_DAY + hours
+            self._merge('daily', daily_key, quality, bin_idx)
+            self._merge('hourly', hourly_key, quality, bin_idx)
+            self.samples += len(frame)
+
+    def update_telemetry(self, batch):
+        """Intègre un lot de télémétrie (t en secondes epoch, voir telemetry.py)"""
+        self.update(pd.DataFrame({
+            'emitter_id': batch['emitter_id'].to_numpy(),
+            't': (batch['t'].to_numpy(dtype=np.float64) // 60).astype(SIGNAL_DTYPES['t']),
+            'qualite': batch['qualite'].to_numpy()
+        }))
+
+    def follow(self, ingestor, name='rollups'):
+        """Abonne les agrégats aux lots de l'ingesteur (remplace l'abonné précédent du même nom)"""
+        ingestor.subscribe(name, self.update_telemetry)
+        return self
+
+    def hourly(self, start=None, end=None, emitter_ids=None):
+        """Table horaire: une ligne par (émetteur, jour, heure) renseignée"""
+        return self._read('hourly', start, end, emitter_ids)
+
+    def daily(self, start=None, end=None, emitter_ids=None):
+        """Table journalière: une ligne par (émetteur, jour) renseigné"""
+        return self._read('daily', start, end, emitter_ids)
+
+    def summary(self, start=None, end=None):
+        """Une ligne par émetteur sur la période (histogrammes journaliers fusionnés pour le p5)"""
+        columns = ['emitter_id', 'mean', 'min', 'max', 'count', 'p5']
+        with self._lock:
+            if self._day0 is None:
+                return pd.DataFrame(columns=columns)
+            lo, hi = self._day_bounds(start, end)
+            table = self._tables['daily']
+            count = table['count'][:len(self.emitter_ids), lo:hi].sum(axis=1)
+            rows = np.flatnonzero(count)
+            count = count[rows]
+            hist = table['hist'][rows, lo:hi].sum(axis=1)
+            p5_bin = np.argmax(np.cumsum(hist, axis=1) >= np.ceil(count * PERCENTILE / 100)[:, None], axis=1)
+            return pd.DataFrame({
+                'emitter_id': np.array(self.emitter_ids, dtype=object)[rows],
+                'mean': table['sum'][rows, lo:hi].sum(axis=1) / count,
+                'min': table['min'][rows, lo:hi].min(axis=1),
+                'max': table['max'][rows, lo:hi].max(axis=1),
+                'count': count,
+                'p5': p5_bin * 100.0 / (self.bins - 1)
+            }, columns=columns)
+
+    def hourly_profile(self, emitter_id, start=None, end=None):
+        """Qualité moyenne par heure de la journée sur la période, pour un émetteur"""
+        with self._lock:
+            if emitter_id not in self._emitter_index or self._day0 is None:
+                return pd.DataFrame({'heure': [], 'qualite': []})
+            e = self._emitter_index[emitter_id]
+            lo, hi = self._day_bounds(start, end)
+            counts = self._tables['hourly']['count'][e, lo:hi].sum(axis=0)
+            sums = self._tables['hourly']['sum'][e, lo:hi].sum(axis=0)
+        hours = np.flatnonzero(counts)
+        return pd.DataFrame({'heure': hours, 'qualite': sums[hours] / counts[hours]})
+
+    def _emitter_slot(self, emitter_id):
+        if emitter_id not in self._emitter_index:
+            self._emitter_index[emitter_id] = len(self.emitter_ids)
+            self.emitter_ids.append(emitter_id)
+        return self._emitter_index[emitter_id]
+
+    def _ensure_days(self, first, last):
+        """Couvre les émetteurs et jours demandés, en n'agrandissant les tableaux qu'au-delà de leur capacité"""
+        if self._day0 is None:
+            new_day0, new_last = first, last
+        else:
+            new_day0 = min(self._day0, first)
+            new_last = max(self._day0 + self._n_days - 1, last)
+        new_days = int((new_last - new_day0).astype(int)) + 1
+        n_emitters = len(self.emitter_ids)
+
+        if self._tables:
+            cap_emitters, cap_days = self._tables['daily']['count'].shape
+            col0 = self._col0 - int((self._day0 - new_day0).astype(int))
+            if n_emitters <= cap_emitters and col0 >= 0 and col0 + new_days <= cap_days:
+                self._day0, self._n_days, self._col0 = new_day0, new_days, col0
+                return
+            if n_emitters > cap_emitters:
+                cap_emitters = max(n_emitters, int(cap_emitters * GROWTH_FACTOR))
+            if new_days > cap_days or col0 < 0:
+                cap_days = max(new_days, int(cap_days * GROWTH_FACTOR))
+        else:
+            cap_emitters, cap_days = n_emitters, new_days
+
+        # Réserve placée du côté où l'historique s'étend (vers le passé si l'on remonte le temps)
+        growing_back = self._day0 is not None and new_day0 < self._day0
+        col0 = cap_days - new_days if growing_back else 0
+        for name, shape in (('daily', ()), ('hourly', (HOURS_PER_DAY,))):
+            old = self._tables.get(name)
+            table = self._allocate(cap_emitters, cap_days, shape, name)
+            if old is not None:
+                e_old = len(old['count'])
+                shift = col0 + int((self._day0 - new_day0).astype(int))
+                src = slice(self._col0, self._col0 + self._n_days)
+                for field, values in old.items():
+                    table[field][:e_old, shift:shift + self._n_days] = values[:, src]
+            self._tables[name] = table
+        self._day0, self._n_days, self._col0 = new_day0, new_days, col0
+
+    def _allocate(self, n_emitters, n_days, shape, name):
+        dims = (n_emitters, n_days) + shape
+        # uint32 pour les deux tables: la télémétrie temps réel (`follow`) peut dépasser
+        # 65 535 échantillons par case horaire (18 Hz), qu'un uint16 ferait reboucler
+        return {
+            'count': np.zeros(dims, dtype=np.uint32),
+            'sum': np.zeros(dims, dtype=np.float64),
+            'min': np.full(dims, np.inf, dtype=np.float32),
+            'max': np.full(dims, -np.inf, dtype=np.float32),
+            'hist': np.zeros(dims + (self.bins,), dtype=np.uint32)
+        }
+
+    def _merge(self, name, keys, quality, bin_idx):
+        table = self._tables[name]
+        count = table['count'].reshape(-1)
+        total = table['sum'].reshape(-1)
+        lowest = table['min'].reshape(-1)
+        highest = table['max'].reshape(-1)
+        hist = table['hist'].reshape(-1)
+
+        touched, inverse = np.unique(keys, return_inverse=True)
+        count[touched] += np.bincount(inverse).astype(np.uint32)
+        total[touched] += np.bincount(inverse, weights=quality)
+        np.minimum.at(lowest, keys, quality.astype(np.float32))
+        np.maximum.at(highest, keys, quality.astype(np.float32))
+
+        hist_keys, hist_counts = np.unique(keys * self.bins + bin_idx, return_counts=True)
+        hist[hist_keys] += hist_counts.astype(hist.dtype)
+
+    def _day_bounds(self, start, end):
+        """Colonnes [lo, hi) des tableaux couvrant la période"""
+        lo = 0 if start is None else int((np.datetime64(pd.Timestamp(start).date()) - self._day0).astype(int))
+        hi = self._n_days if end is None else int((np.datetime64(pd.Timestamp(end).date()) - self._day0).astype(int)) + 1
+        lo, hi = max(0, lo), min(self._n_days, max(0, hi))
+        return self._col0 + lo, self._col0 + max(lo, hi)
+
+    def _read(self, name, start, end, emitter_ids):
+        columns = ['emitter_id', 'date'] + (['heure'] if name == 'hourly' else []) + \
+                  ['mean', 'min', 'max', 'count', 'p5']
+        with self._lock:
+            if self._day0 is None:
+                return pd.DataFrame(columns=columns)
+
+            lo, hi = self._day_bounds(start, end)
+            if emitter_ids is None:
+                rows = np.arange(len(self.emitter_ids))
+            else:
+                rows = np.array([self._emitter_index[e] for e in emitter_ids if e in self._emitter_index],
+                                dtype=np.int64)
+            table = {field: values[rows, lo:hi] for field, values in self._tables[name].items()}
+            first_day = self._day0 + (lo - self._col0)
+            ids = np.array(self.emitter_ids, dtype=object)
+        filled = table['count'] > 0
+        positions = np.nonzero(filled)
+
+        count = table['count'][filled]
+        hist = table['hist'][filled]
+        cumulative = np.cumsum(hist, axis=1)
+        p5_bin = np.argmax(cumulative >= np.ceil(count * PERCENTILE / 100)[:, None], axis=1)
+
+        data = {
+            'emitter_id': ids[rows[positions[0]]],
+            'date': first_day + positions[1]
+        }
+        if name == 'hourly':
+            data['heure'] = positions[2]
+        data.update({
+            'mean': table['sum'][filled] / count,
+            'min': table['min'][filled],
+            'max': table['max'][filled],
+            'count': count,
+            'p5': p5_bin * 100.0 / (self.bins - 1)
+        })
+        frame = pd.DataFrame(data, columns=columns)
+        frame['date'] = pd.to_datetime(frame['date'])
+        return frame
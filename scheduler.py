@@ -0,0 +1,299 @@
+# scheduler.py
+"""Planification des maintenances: affectation aux techniciens et tournées dans les créneaux de nuit"""
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from coverage import haversine_km
+from signals import MAINTENANCE_HOURS
+
+# Techniciens, base de départ et nuits travaillées au plus par semaine
+TECHNICIANS = {
+    'Tech-01': {'base': 'Saint-Denis', 'latitude': -20.8789, 'longitude': 55.4481, 'nuits_par_semaine': 4},
+    'Tech-02': {'base': 'Saint-Paul', 'latitude': -21.0073, 'longitude': 55.2854, 'nuits_par_semaine': 4},
+    'Tech-03': {'base': 'Saint-Pierre', 'latitude': -21.3429, 'longitude': 55.4787, 'nuits_par_semaine': 4},
+    'Tech-04': {'base': 'Saint-André', 'latitude': -20.9667, 'longitude': 55.6333, 'nuits_par_semaine': 4},
+    'Tech-05': {'base': 'Le Tampon', 'latitude': -21.3583, 'longitude': 55.5250, 'nuits_par_semaine': 4},
+}
+
+# Tâches et durée d'interruption de l'émetteur (minutes); les tâches préventives se succèdent par cycle
+MAINTENANCE_TASKS = {
+    "Vérification antenne": 45,
+    "Calibrage fréquence": 30,
+    "Remplacement pièces": 75,
+    "Mise à jour logiciel": 20,
+}
+REPAIR_TASK = "Remplacement pièces"
+MAINTENANCE_INTERVAL_DAYS = 90
+
+# Créneau de coupure autorisé, le même que celui de l'historique de signal (02:00–04:00)
+MAINTENANCE_WINDOW = (MAINTENANCE_HOURS[0] * 60, MAINTENANCE_HOURS[-1] * 60)
+
+PRIORITIES = ("Élevée", "Moyenne", "Basse")
+# Échéance (jours) en dessous de laquelle la priorité est élevée, puis moyenne
+PRIORITY_DAYS = (7, 30)
+# Une maintenance préventive peut être avancée d'au plus ce nombre de jours
+EARLY_DAYS = 14
+PLANNING_HORIZON_DAYS = 90
+
+# Trajets sur les routes de l'île: distance à vol d'oiseau allongée, vitesse moyenne
+ROAD_FACTOR = 1.4
+TRAVEL_SPEED_KMH = 45.0
+# Coût (minutes de trajet équivalentes) d'une nuit de travail supplémentaire pour un technicien
+NIGHT_OPENING_COST = 20.0
+# Maintenances les plus urgentes examinées chaque nuit
+CANDIDATES_PER_NIGHT = 48
+MAX_LOCAL_SEARCH_PASSES = 10
+
+PLAN_COLUMNS = ['emitter_id', 'technicien', 'date', 'debut', 'fin', 'ordre', 'tache', 'duree_min',
+                'trajet_min', 'priorite', 'echeance', 'retard_j']
+
+
+def maintenance_jobs(emitters, today=None):
+    """Une maintenance par émetteur: tâche, durée, échéance et priorité déduites des données
+
+    Maintenance préventive tous les MAINTENANCE_INTERVAL_DAYS jours depuis la
+    dernière intervention; un émetteur en maintenance ou inactif est à
+    traiter immédiatement.
+    """
+    today = pd.Timestamp.now().normalize() if today is None else pd.Timestamp(today).normalize()
+    last = pd.to_datetime(emitters['derniere_maintenance']).to_numpy(dtype='datetime64[D]')
+    elapsed = np.maximum((np.datetime64(today.date(), 'D') - last).astype(np.int64), 0)
+    cycles = elapsed // MAINTENANCE_INTERVAL_DAYS + 1
+    due_in = cycles * MAINTENANCE_INTERVAL_DAYS - elapsed
+
+    tasks = np.array(list(MAINTENANCE_TASKS), dtype=object)[cycles % len(MAINTENANCE_TASKS)]
+    status = emitters['statut'].astype(str).to_numpy()
+    urgent = status != 'Actif'
+    due_in[urgent] = 0
+    tasks[status == 'Inactif'] = REPAIR_TASK
+
+    priority = np.where(urgent | (due_in < PRIORITY_DAYS[0]), 0, np.where(due_in < PRIORITY_DAYS[1], 1, 2))
+    return pd.DataFrame({
+        'emitter_id': emitters['id'].astype(str).to_numpy(),
+        'latitude': emitters['latitude'].to_numpy(dtype=float),
+        'longitude': emitters['longitude'].to_numpy(dtype=float),
+        'tache': tasks,
+        'duree_min': np.array([MAINTENANCE_TASKS[t] for t in tasks], dtype=np.int64),
+        'echeance_j': due_in,
+        'priorite_rang': priority,
+    })
+
+
+class MaintenanceScheduler:
+    """Planificateur glouton par nuit, amélioré par recherche locale
+
+    Nuit après nuit, les maintenances disponibles les plus urgentes
+    (priorité, puis échéance) sont insérées une à une là où elles
+    allongent le moins les trajets, chez le technicien et à la position
+    qui respectent le créneau de coupure (durées et trajets entre sites
+    compris) et sa limite de nuits par semaine. Les tournées de la nuit
+    sont ensuite améliorées par déplacements et échanges entre
+    techniciens et par réordonnancement des sites. Une maintenance qui ne
+    trouve pas place avant l'horizon reste non planifiée.
+    """
+
+    def __init__(self, technicians=TECHNICIANS, window=MAINTENANCE_WINDOW, horizon_days=PLANNING_HORIZON_DAYS,
+                 candidates=CANDIDATES_PER_NIGHT):
+        self.technicians = dict(technicians)
+        self.window = window
+        self.horizon_days = horizon_days
+        self.candidates = candidates
+
+    def plan_for(self, emitters, today=None):
+        """Raccourci à partir du DataFrame des émetteurs (une ligne par émetteur, dans le même ordre)"""
+        today = pd.Timestamp.now().normalize() if today is None else pd.Timestamp(today).normalize()
+        return self.plan(maintenance_jobs(emitters, today), today)
+
+    def plan(self, jobs, today):
+        """Technicien, nuit, horaire et ordre de passage de chaque maintenance"""
+        names = list(self.technicians)
+        bases_lat = np.array([self.technicians[t]['latitude'] for t in names])
+        bases_lon = np.array([self.technicians[t]['longitude'] for t in names])
+        nights_per_week = [self.technicians[t]['nuits_par_semaine'] for t in names]
+
+        lat = jobs['latitude'].to_numpy(dtype=float)
+        lon = jobs['longitude'].to_numpy(dtype=float)
+        duration = jobs['duree_min'].to_numpy(dtype=np.int64)
+        due = jobs['echeance_j'].to_numpy(dtype=np.int64)
+        rank = jobs['priorite_rang'].to_numpy(dtype=np.int64)
+        release = np.where(rank == 0, 0, np.maximum(due - EARLY_DAYS, 0))
+        urgency = rank * (self.horizon_days + MAINTENANCE_INTERVAL_DAYS + 1) + due
+
+        n = len(jobs)
+        night = np.full(n, -1, dtype=np.int64)
+        tech = np.full(n, -1, dtype=np.int64)
+        order = np.zeros(n, dtype=np.int64)
+        start = np.zeros(n, dtype=np.int64)
+        leg = np.zeros(n, dtype=np.float64)
+        scheduled = np.zeros(n, dtype=bool)
+        worked = {}  # (technicien, semaine) -> nuits travaillées
+        first_weekday = today.weekday()
+
+        for d in range(self.horizon_days):
+            if scheduled.all():
+                break
+            week = (first_weekday + d) // 7
+            techs = [k for k in range(len(names)) if worked.get((k, week), 0) < nights_per_week[k]]
+            pool = np.flatnonzero(~scheduled & (release <= d))
+            if not techs or len(pool) == 0:
+                continue
+            if len(pool) > self.candidates:
+                pool = pool[np.argpartition(urgency[pool], self.candidates)[:self.candidates]]
+            pool = pool[np.argsort(urgency[pool], kind='stable')]
+
+            # Temps de trajet (minutes) entre les sites candidats puis les bases des techniciens
+            node_lat = np.concatenate([lat[pool], bases_lat])
+            node_lon = np.concatenate([lon[pool], bases_lon])
+            km = haversine_km(node_lat[:, None], node_lon[:, None], node_lat[None, :], node_lon[None, :])
+            travel = (km * ROAD_FACTOR / TRAVEL_SPEED_KMH * 60).tolist()
+            routes = _NightRoutes(travel, duration[pool].tolist(), len(pool), techs,
+                                  self.window[1] - self.window[0])
+            for c in range(len(pool)):
+                routes.insert_best(c)
+                if routes.full():
+                    break
+            routes.improve()
+
+            for k, route in routes.routes.items():
+                if not route:
+                    continue
+                worked[(k, week)] = worked.get((k, week), 0) + 1
+                clock = self.window[0]
+                previous = routes.base(k)
+                for position, c in enumerate(route):
+                    if position:
+                        clock += travel[previous][c]
+                    job = pool[c]
+                    night[job], tech[job], order[job] = d, k, position + 1
+                    start[job], leg[job] = int(round(clock)), travel[previous][c]
+                    scheduled[job] = True
+                    clock += duration[job]
+                    previous = c
+
+        dates = np.full(n, np.datetime64('NaT'), dtype='datetime64[s]')
+        dates[scheduled] = np.datetime64(today.date(), 'D') + night[scheduled]
+        return pd.DataFrame({
+            'emitter_id': jobs['emitter_id'].to_numpy(),
+            'technicien': pd.Categorical.from_codes(tech, categories=names),
+            'date': dates,
+            'debut': np.where(scheduled, _clock_labels(start), None),
+            'fin': np.where(scheduled, _clock_labels(start + duration), None),
+            'ordre': np.where(scheduled, order, 0),
+            'tache': jobs['tache'].to_numpy(),
+            'duree_min': duration,
+            'trajet_min': np.round(leg, 1),
+            'priorite': np.array(PRIORITIES, dtype=object)[rank],
+            'echeance': (np.datetime64(today.date(), 'D') + due).astype('datetime64[s]'),
+            'retard_j': np.where(scheduled, np.maximum(night - due, 0), 0),
+        }, columns=PLAN_COLUMNS)
+
+
+class _NightRoutes:
+    """Tournées d'une nuit: une liste ordonnée de sites candidats par technicien disponible"""
+
+    def __init__(self, travel, durations, n_sites, techs, window_minutes):
+        self.travel = travel
+        self.durations = durations
+        self.n_sites = n_sites
+        self.window = window_minutes
+        self.routes = {k: [] for k in techs}
+        self.used = {k: 0.0 for k in techs}
+        self.shortest = min(durations) if durations else 0
+
+    def base(self, k):
+        return self.n_sites + k
+
+    def cost(self, k, route):
+        """Trajets de la tournée, base comprise, et coût d'ouverture de la nuit"""
+        if not route:
+            return 0.0
+        t = self.travel
+        base = self.base(k)
+        inner = sum(t[a][b] for a, b in zip(route, route[1:]))
+        return t[base][route[0]] + inner + t[route[-1]][base] + NIGHT_OPENING_COST
+
+    def busy(self, route):
+        """Minutes du créneau occupées: interventions et trajets entre sites"""
+        t = self.travel
+        return sum(self.durations[c] for c in route) + sum(t[a][b] for a, b in zip(route, route[1:]))
+
+    def insert_best(self, c):
+        best = None
+        for k, route in self.routes.items():
+            before = self.cost(k, route)
+            for position in range(len(route) + 1):
+                candidate = route[:position] + [c] + route[position:]
+                busy = self.busy(candidate)
+                if busy > self.window:
+                    continue
+                delta = self.cost(k, candidate) - before
+                if best is None or delta < best[0]:
+                    best = (delta, k, candidate, busy)
+        if best is not None:
+            _, k, candidate, busy = best
+            self.routes[k] = candidate
+            self.used[k] = busy
+
+    def full(self):
+        return all(self.window - used < self.shortest for used in self.used.values())
+
+    def improve(self):
+        """Recherche locale: déplacement et échange entre techniciens, ordre de passage optimal"""
+        for _ in range(MAX_LOCAL_SEARCH_PASSES):
+            if not (self._relocate_or_swap() | self._reorder()):
+                break
+
+    def _relocate_or_swap(self):
+        improved = False
+        techs = list(self.routes)
+        for a, b in itertools.permutations(techs, 2):
+            ra, rb = self.routes[a], self.routes[b]
+            if not ra:
+                continue
+            current = self.cost(a, ra) + self.cost(b, rb)
+            best = None
+            for i, x in enumerate(ra):
+                rest = ra[:i] + ra[i + 1:]
+                # Déplacement de x vers la tournée b
+                for j in range(len(rb) + 1):
+                    nb = rb[:j] + [x] + rb[j:]
+                    gain = current - self.cost(a, rest) - self.cost(b, nb)
+                    if gain > 1e-6 and (best is None or gain > best[0]) and self.busy(nb) <= self.window:
+                        best = (gain, rest, nb)
+                # Échange de x avec un site y de la tournée b
+                for j, y in enumerate(rb):
+                    na = ra[:i] + [y] + ra[i + 1:]
+                    nb = rb[:j] + [x] + rb[j + 1:]
+                    gain = current - self.cost(a, na) - self.cost(b, nb)
+                    if (gain > 1e-6 and (best is None or gain > best[0])
+                            and self.busy(na) <= self.window and self.busy(nb) <= self.window):
+                        best = (gain, na, nb)
+            if best is not None:
+                _, self.routes[a], self.routes[b] = best
+                self.used[a], self.used[b] = self.busy(self.routes[a]), self.busy(self.routes[b])
+                improved = True
+        return improved
+
+    def _reorder(self):
+        improved = False
+        for k, route in self.routes.items():
+            if len(route) < 2 or len(route) > 5:
+                continue
+            best_cost, best_route = self.cost(k, route) - 1e-6, None
+            for candidate in itertools.permutations(route):
+                candidate = list(candidate)
+                cost = self.cost(k, candidate)
+                if cost < best_cost and self.busy(candidate) <= self.window:
+                    best_cost, best_route = cost, candidate
+            if best_route is not None:
+                self.routes[k] = best_route
+                self.used[k] = self.busy(best_route)
+                improved = True
+        return improved
+
+
+def _clock_labels(minutes):
+    minutes = np.asarray(minutes, dtype=np.int64)
+    return np.array([f"{m // 60:02d}:{m % 60:02d}" for m in minutes.tolist()], dtype=object)
@@ -0,0 +1,55 @@
+# serve.py
+"""Lancement du dashboard avec préchauffage: données et caches construits dès le démarrage du serveur
+
+Usage:
+    python serve.py                          # équivaut à `streamlit run Dashboard.py`, préchauffé
+    python serve.py --no-prewarm             # démarrage à froid (comparaison)
+    python serve.py -- --server.port 8502    # options transmises à Streamlit
+"""
+import os
+import time
+
+# Posé avant tout import lourd: référence du temps jusqu'au premier rendu (profiling.py)
+os.environ.setdefault('FREEDOM_START_TIME', repr(time.time()))
+
+import argparse  # noqa: E402
+import sys  # noqa: E402
+import threading  # noqa: E402
+
+DASHBOARD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Dashboard.py')
+
+
+def prewarm():
+    """Charge le magasin partagé et les caches de la vue par défaut (thread de fond)"""
+    started = time.perf_counter()
+    # Même processus que le serveur Streamlit: les registres de modules sont partagés avec les sessions
+    from Dashboard import DATA_TTL_SECONDS, load_dashboard_data, prewarm as prewarm_dashboard
+    from data_store import get_data_store
+    from profiling import get_profiler
+
+    store = get_data_store('dashboard', load_dashboard_data, ttl_seconds=DATA_TTL_SECONDS)
+    prewarm_dashboard(store)
+    elapsed = time.perf_counter() - started
+    get_profiler().record_startup('prechauffage', elapsed)
+    print(f"Préchauffage terminé en {elapsed:.1f} s", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dashboard Freedom Radio avec préchauffage au démarrage")
+    parser.add_argument('--no-prewarm', action='store_true', help="ne pas construire les données d'avance")
+    parser.add_argument('streamlit_args', nargs='*', help="options transmises à `streamlit run` (après --)")
+    args = parser.parse_args(argv)
+
+    if not args.no_prewarm:
+        # Le serveur écoute pendant le préchauffage; une session arrivée avant la fin
+        # attend le même chargement (verrou du magasin) au lieu de le refaire
+        threading.Thread(target=prewarm, name='prewarm', daemon=True).start()
+
+    from streamlit.web import cli as stcli
+
+    sys.argv = ['streamlit', 'run', DASHBOARD_PATH, *args.streamlit_args]
+    return stcli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# signal_store.py
+"""Stockage colonnaire sur disque de l'historique de signal (NumPy mappé en mémoire)"""
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from signals import SIGNAL_COLUMNS, signal_days
+
+DAY_FORMAT = '%Y-%m-%d'
+META_FILE = 'meta.json'
+# Version du schéma des segments; les segments d'une autre version sont ignorés
+SCHEMA_VERSION = 2
+
+
+class SignalStore:
+    """Historique de signal partitionné par jour puis par émetteur
+
+    Arborescence: `<racine>/<AAAA-MM-JJ>/<segment>/<colonne>.npy` + `meta.json`.
+    Un segment regroupe les émetteurs écrits ensemble pour un jour, triés par
+    émetteur; `meta.json` donne la plage de lignes de chaque émetteur. Une
+    partition (émetteur, jour) est donc une tranche d'un fichier mappé en
+    mémoire: seules les partitions demandées sont lues, sans multiplier les
+    fichiers pour les grandes flottes.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def days(self, start=None, end=None):
+        """Jours présents dans le magasin (bornes incluses)"""
+        start = _day_key(start) if start is not None else None
+        end = _day_key(end) if end is not None else None
+        found = []
+        for name in sorted(os.listdir(self.root)):
+            if name.startswith('.') or not os.path.isdir(os.path.join(self.root, name)):
+                continue
+            if (start is None or name >= start) and (end is None or name <= end):
+                found.append(name)
+        return found
+
+    def segments(self, day):
+        day_dir = os.path.join(self.root, _day_key(day))
+        if not os.path.isdir(day_dir):
+            return []
+        return sorted(name for name in os.listdir(day_dir) if not name.startswith('.'))
+
+    def write(self, frame, segment='main'):
+        """Écrit un historique, un segment par jour (remplace un segment de même nom)"""
+        day_keys = signal_days(frame)
+        columns = [c for c in frame.columns if c != 'emitter_id']
+        for col in columns:
+            if not pd.api.types.is_numeric_dtype(frame[col]):
+                raise ValueError(f"Colonne non numérique impossible à mapper en mémoire: {col}")
+
+        for day in np.unique(day_keys):
+            part = frame[day_keys == day]
+            day = str(day)
+            codes, ids = pd.factorize(part['emitter_id'], sort=True)
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes, minlength=len(ids))
+            offsets = np.concatenate([[0], np.cumsum(counts)])
+
+            meta = {
+                'schema': SCHEMA_VERSION,
+                'columns': columns,
+                'emitters': [str(i) for i in ids],
+                'offsets': offsets.tolist()
+            }
+            arrays = {col: part[col].to_numpy()[order] for col in columns}
+            self._replace_segment(day, segment, meta, arrays)
+
+    def load(self, start=None, end=None, emitter_ids=None):
+        """Historique de la période [start, end], éventuellement limité à certains émetteurs"""
+        wanted = None if emitter_ids is None else set(emitter_ids)
+        pieces = {}
+        ids, lengths = [], []
+        columns = None
+
+        for day in self.days(start, end):
+            for segment in self.segments(day):
+                seg_dir = os.path.join(self.root, day, segment)
+                with open(os.path.join(seg_dir, META_FILE)) as f:
+                    meta = json.load(f)
+                if meta.get('schema') != SCHEMA_VERSION:
+                    continue
+                columns = columns or meta['columns']
+                offsets = meta['offsets']
+                mapped = {col: np.load(os.path.join(seg_dir, f"{col}.npy"), mmap_mode='r')
+                          for col in columns}
+
+                if wanted is None:
+                    # Segment complet: une seule lecture par colonne
+                    ids.extend(meta['emitters'])
+                    lengths.extend(np.diff(offsets).tolist())
+                    for col in columns:
+                        pieces.setdefault(col, []).append(mapped[col])
+                    continue
+
+                for i, emitter_id in enumerate(meta['emitters']):
+                    if emitter_id not in wanted:
+                        continue
+                    lo, hi = offsets[i], offsets[i + 1]
+                    ids.append(emitter_id)
+                    lengths.append(hi - lo)
+                    for col in columns:
+                        pieces.setdefault(col, []).append(mapped[col][lo:hi])
+
+        if columns is None:
+            return pd.DataFrame(columns=SIGNAL_COLUMNS)
+
+        codes, categories = pd.factorize(np.array(ids, dtype=object))
+        data = {'emitter_id': pd.Categorical.from_codes(np.repeat(codes, lengths), categories=categories)}
+        for col in columns:
+            data[col] = np.concatenate(pieces[col]) if pieces.get(col) else np.array([])
+        return pd.DataFrame(data)
+
+    def _replace_segment(self, day, segment, meta, arrays):
+        day_dir = os.path.join(self.root, day)
+        os.makedirs(day_dir, exist_ok=True)
+        tmp_dir = os.path.join(day_dir, f".tmp-{segment}-{uuid.uuid4().hex}")
+        os.makedirs(tmp_dir)
+        for col, values in arrays.items():
+            np.save(os.path.join(tmp_dir, f"{col}.npy"), values)
+        with open(os.path.join(tmp_dir, META_FILE), 'w') as f:
+            json.dump(meta, f)
+
+        # Remplacement quasi atomique: les lecteurs voient l'ancien ou le nouveau segment
+        target = os.path.join(day_dir, segment)
+        if os.path.exists(target):
+            trash = os.path.join(day_dir, f".old-{segment}-{uuid.uuid4().hex}")
+            os.rename(target, trash)
+            os.rename(tmp_dir, target)
+            shutil.rmtree(trash, ignore_errors=True)
+        else:
+            os.rename(tmp_dir, target)
+
+
+def _day_key(value):
+    if isinstance(value, str):
+        return value
+    return pd.Timestamp(value).strftime(DAY_FORMAT)
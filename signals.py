@@ -0,0 +1,188 @@
+# signals.py
+"""Génération vectorisée et schéma compact de l'historique de qualité du signal"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 24 * 60
+
+# Schéma compact d'un échantillon (≈ 9 octets par ligne au lieu de 48):
+# emitter_id catégoriel, t en minutes entières depuis l'epoch Unix,
+# qualité en % entier, puissance en W entiers
+SIGNAL_COLUMNS = ['emitter_id', 't', 'qualite', 'puissance']
+SIGNAL_DTYPES = {'t': np.int32, 'qualite': np.uint8, 'puissance': np.uint16}
+
+# Types compacts de la table des émetteurs (textes répétés catégoriels, dates natives)
+EMITTER_DTYPES = {
+    'ville': 'category',
+    'statut': 'category',
+    'technicien': 'category',
+    'puissance': np.uint16,
+    'altitude': np.int16,
+    'date_installation': 'datetime64[s]',
+    'derniere_maintenance': 'datetime64[s]'
+}
+
+# Heures de maintenance programmée (signal coupé pour les émetteurs en maintenance)
+MAINTENANCE_HOURS = (2, 3, 4)
+
+# Heures de nuit où la qualité est atténuée
+NIGHT_HOURS = (0, 1, 2, 3, 4, 5)
+NIGHT_ATTENUATION = 0.9
+
+
+def samples_per_day(interval_minutes):
+    """Nombre d'échantillons par jour; le pas doit diviser la journée (pas de créneau tronqué)"""
+    if not 1 <= interval_minutes <= MINUTES_PER_DAY or MINUTES_PER_DAY % interval_minutes:
+        raise ValueError(f"Intervalle d'échantillonnage invalide: {interval_minutes} min "
+                         f"(doit diviser {MINUTES_PER_DAY} min)")
+    return MINUTES_PER_DAY // interval_minutes
+
+
+def generate_signal_history(emitters, days=7, interval_minutes=60, now=None, rng=None):
+    """Historique simulé (emitter_id, t, qualite, puissance) calculé tableau par tableau
+
+    Pour chaque émetteur et chaque jour, une qualité de base est tirée entre
+    70 et 95 %, puis chaque échantillon varie de ±10 points. Les émetteurs en
+    maintenance sont coupés de 2h à 4h et la qualité est réduite de 10 % la
+    nuit. Les jours couverts sont les `days` derniers jours jusqu'à `now`.
+    """
+    per_day = samples_per_day(interval_minutes)
+    rng = rng if rng is not None else np.random.default_rng()
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+
+    ids = emitters['id'].to_numpy()
+    in_maintenance = (emitters['statut'] == 'Maintenance').to_numpy()
+    power = emitters['puissance'].to_numpy(dtype=np.float64)
+
+    n_emitters = len(ids)
+    minutes = np.arange(per_day) * interval_minutes
+    hours = minutes // 60
+
+    # Qualité: base par (émetteur, jour) + bruit par échantillon
+    base = rng.uniform(70, 95, size=(n_emitters, days, 1))
+    quality = base + rng.uniform(-10, 10, size=(n_emitters, days, per_day))
+
+    maintenance_slot = np.isin(hours, MAINTENANCE_HOURS)
+    quality[np.ix_(in_maintenance, np.ones(days, dtype=bool), maintenance_slot)] = 0
+    quality[:, :, np.isin(hours, NIGHT_HOURS)] *= NIGHT_ATTENUATION
+    np.clip(quality, 0, 100, out=quality)
+
+    emitted = power[:, None, None] * rng.uniform(0.9, 1.1, size=(n_emitters, days, per_day))
+
+    today = to_epoch_minutes(now.normalize())
+    day_starts = today - np.arange(days) * MINUTES_PER_DAY
+    t = day_starts[:, None] + minutes[None, :]
+
+    codes, categories = pd.factorize(ids)
+    return pd.DataFrame({
+        'emitter_id': pd.Categorical.from_codes(np.repeat(codes, days * per_day), categories=categories),
+        't': np.tile(t.ravel(), n_emitters).astype(SIGNAL_DTYPES['t']),
+        'qualite': np.rint(quality.ravel()).astype(SIGNAL_DTYPES['qualite']),
+        'puissance': np.rint(np.clip(emitted.ravel(), 0, np.iinfo(np.uint16).max)).astype(SIGNAL_DTYPES['puissance'])
+    })
+
+
+def to_epoch_minutes(value):
+    """Instant(s) -> minutes entières depuis l'epoch Unix"""
+    return np.asarray(pd.to_datetime(value), dtype='datetime64[m]').astype(np.int64)
+
+
+def signal_instants(frame):
+    """Horodatage de chaque échantillon"""
+    return pd.to_datetime(frame['t'].to_numpy(dtype=np.int64), unit='m')
+
+
+def signal_days(frame):
+    """Jour (datetime64[D]) de chaque échantillon"""
+    return (frame['t'].to_numpy(dtype=np.int64) // MINUTES_PER_DAY).astype('datetime64[D]')
+
+
+def signal_hours(frame):
+    """Heure de la journée de chaque échantillon"""
+    return frame['t'].to_numpy(dtype=np.int64) % MINUTES_PER_DAY // 60
+
+
+def expanded_signal_frame(frame):
+    """Ancien schéma large (id texte, date, heure, float64), pour comparaison et export"""
+    return pd.DataFrame({
+        'emitter_id': frame['emitter_id'].astype(str).to_numpy(),
+        'date': pd.to_datetime(signal_days(frame)),
+        'heure': signal_hours(frame),
+        'qualite': frame['qualite'].to_numpy(dtype=np.float64),
+        'puissance': frame['puissance'].to_numpy(dtype=np.float64)
+    })
+
+
+def memory_report(frames):
+    """Empreinte mémoire de plusieurs tables: lignes, octets, octets par ligne, détail par colonne"""
+    rows = []
+    for name, frame in frames.items():
+        usage = frame.memory_usage(deep=True, index=False)
+        rows.append({
+            'table': name,
+            'lignes': len(frame),
+            'octets': int(usage.sum()),
+            'octets_par_ligne': usage.sum() / max(len(frame), 1),
+            'colonnes': ', '.join(f"{col}={frame[col].dtype}:{int(size)}" for col, size in usage.items())
+        })
+    return pd.DataFrame(rows)
+
+
+class EmitterSignalIndex:
+    """Historique regroupé par émetteur, avec une table des plages de lignes
+
+    La clé `emitter_id` devient catégorielle et les lignes sont triées par
+    émetteur (tri stable: l'ordre chronologique est conservé). `get` renvoie
+    en O(1) une tranche de lignes contiguës, sans copie des données.
+    """
+
+    def __init__(self, frame):
+        keys = pd.Categorical(frame['emitter_id'])
+        codes = keys.codes
+        if len(codes) > 1 and np.any(codes[1:] < codes[:-1]):
+            order = np.argsort(codes, kind='stable')
+            frame = frame.iloc[order]
+            codes = codes[order]
+        self.frame = frame.reset_index(drop=True)
+        self.frame['emitter_id'] = pd.Categorical.from_codes(codes, categories=keys.categories)
+
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(keys.categories)))])
+        self._slices = {
+            emitter_id: (int(offsets[i]), int(offsets[i + 1]))
+            for i, emitter_id in enumerate(keys.categories)
+        }
+
+    def __len__(self):
+        return len(self.frame)
+
+    def __contains__(self, emitter_id):
+        return emitter_id in self._slices
+
+    @property
+    def emitter_ids(self):
+        return list(self._slices)
+
+    def get(self, emitter_id):
+        """Historique d'un émetteur (vide s'il est inconnu)"""
+        lo, hi = self._slices.get(emitter_id, (0, 0))
+        return self.frame.iloc[lo:hi]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Empreinte mémoire de l'historique de signal")
+    parser.add_argument('--emitters', type=int, default=2000, help="nombre d'émetteurs simulés")
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--interval', type=int, default=60, help="pas d'échantillonnage (min)")
+    args = parser.parse_args()
+
+    fleet = pd.DataFrame({
+        'id': [f"FR_{i:06d}" for i in range(1, args.emitters + 1)],
+        'statut': 'Actif',
+        'puissance': 1000
+    })
+    compact = generate_signal_history(fleet, days=args.days, interval_minutes=args.interval)
+    report = memory_report({'ancien schéma': expanded_signal_frame(compact), 'schéma compact': compact})
+    print(report.to_string(index=False))
+    print(f"Réduction: {report['octets'].iloc[0] / report['octets'].iloc[1]:.1f}x")
@@ -0,0 +1,281 @@
+# telemetry.py
+"""Ingestion continue de la télémétrie des émetteurs dans des tampons circulaires NumPy"""
+import argparse
+import io
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TELEMETRY_FILE = os.environ.get(
+    'FREEDOM_TELEMETRY_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'telemetry.csv')
+)
+
+# Échantillons conservés par émetteur (1 h à 1 Hz)
+DEFAULT_CAPACITY = 3600
+POLL_INTERVAL_SECONDS = 0.2
+# Octets lus au plus par passage: un long arriéré est intégré par morceaux, mémoire bornée
+MAX_READ_BYTES = 4 * 1024 * 1024
+
+# Format d'une ligne: horodatage epoch (s), id émetteur, qualité (%), puissance (W)
+COLUMNS = ['t', 'emitter_id', 'qualite', 'puissance']
+NUMERIC_COLUMNS = ['t', 'qualite', 'puissance']
+
+logger = logging.getLogger(__name__)
+
+
+class RingBufferSet:
+    """Tampons circulaires de taille fixe, un par émetteur, stockés en tableaux 2D
+
+    L'ajout d'un lot se fait en quelques opérations vectorisées sans jamais
+    reconstruire de DataFrame; la lecture des `window` derniers échantillons
+    d'un émetteur coûte O(window).
+    """
+
+    def __init__(self, emitter_ids=(), capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.emitter_ids = []
+        self._index = {}
+        self.t = np.zeros((0, capacity), dtype=np.float64)
+        self.qualite = np.zeros((0, capacity), dtype=np.float32)
+        self.puissance = np.zeros((0, capacity), dtype=np.float32)
+        self.head = np.zeros(0, dtype=np.int64)   # prochaine position d'écriture
+        self.count = np.zeros(0, dtype=np.int64)  # échantillons valides
+        self.total = 0
+        self._lock = threading.Lock()
+        self._add_emitters(list(emitter_ids))
+
+    def append(self, emitter_ids, t, qualite, puissance):
+        """Ajoute un lot d'échantillons (tableaux alignés, ordre chronologique)"""
+        if len(emitter_ids) == 0:
+            return
+        with self._lock:
+            codes, uniques = pd.factorize(np.asarray(emitter_ids))
+            self._add_emitters([e for e in uniques if e not in self._index])
+            rows = np.array([self._index[e] for e in uniques], dtype=np.int64)[codes]
+
+            # Rang de chaque échantillon au sein de son émetteur dans le lot
+            order = np.argsort(rows, kind='stable')
+            sorted_rows = rows[order]
+            per_row = np.bincount(sorted_rows, minlength=len(self.head))
+            starts = np.concatenate([[0], np.cumsum(per_row)[:-1]])
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order)) - starts[sorted_rows]
+
+            # Au-delà de la capacité, seuls les derniers échantillons du lot comptent
+            keep = rank >= per_row[rows] - self.capacity
+            rows, rank = rows[keep], rank[keep]
+            cols = (self.head[rows] + rank) % self.capacity
+            self.t[rows, cols] = np.asarray(t, dtype=np.float64)[keep]
+            self.qualite[rows, cols] = np.asarray(qualite, dtype=np.float32)[keep]
+            self.puissance[rows, cols] = np.asarray(puissance, dtype=np.float32)[keep]
+
+            self.head = (self.head + per_row) % self.capacity
+            self.count = np.minimum(self.count + per_row, self.capacity)
+            self.total += len(emitter_ids)
+
+    def latest(self, emitter_id, window):
+        """Les `window` derniers échantillons d'un émetteur (t, qualite, puissance)"""
+        with self._lock:
+            if emitter_id not in self._index:
+                return pd.DataFrame(columns=['t', 'qualite', 'puissance'])
+            row = self._index[emitter_id]
+            n = int(min(window, self.count[row]))
+            cols = (self.head[row] - n + np.arange(n)) % self.capacity
+            return pd.DataFrame({
+                't': self.t[row, cols],
+                'qualite': self.qualite[row, cols],
+                'puissance': self.puissance[row, cols]
+            })
+
+    def window_matrix(self, window):
+        """Derniers échantillons de tous les émetteurs: tableaux (émetteurs, window) + nombre valide"""
+        with self._lock:
+            n = min(window, self.capacity)
+            cols = (self.head[:, None] - n + np.arange(n)[None, :]) % self.capacity
+            rows = np.arange(len(self.head))[:, None]
+            return (self.t[rows, cols], self.qualite[rows, cols], self.puissance[rows, cols],
+                    np.minimum(self.count, n))
+
+    def _add_emitters(self, new_ids):
+        if not new_ids:
+            return
+        for emitter_id in new_ids:
+            self._index[emitter_id] = len(self.emitter_ids)
+            self.emitter_ids.append(emitter_id)
+        extra = len(new_ids)
+        self.t = np.vstack([self.t, np.zeros((extra, self.capacity), dtype=self.t.dtype)])
+        self.qualite = np.vstack([self.qualite, np.zeros((extra, self.capacity), dtype=self.qualite.dtype)])
+        self.puissance = np.vstack([self.puissance, np.zeros((extra, self.capacity), dtype=self.puissance.dtype)])
+        self.head = np.concatenate([self.head, np.zeros(extra, dtype=np.int64)])
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+
+
+class FileTailer:
+    """Lit les lignes complètes ajoutées à un fichier depuis la dernière lecture
+
+    Chaque lecture porte sur au plus `max_bytes` octets: un fichier
+    existant volumineux est repris morceau par morceau au fil des passages
+    au lieu d'être chargé d'un bloc. Un fichier remplacé (rotation) est
+    reconnu à son inode, même s'il est déjà plus grand que l'ancien.
+    """
+
+    def __init__(self, path, max_bytes=MAX_READ_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.offset = 0
+        self._partial = b''
+        # (périphérique, inode) du fichier lu: un changement signale une rotation ou un remplacement
+        self._identity = None
+
+    @property
+    def pending(self):
+        """Vrai s'il reste des octets à lire (ou un nouveau fichier à reprendre)"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_dev, stat.st_ino) != self._identity or stat.st_size > self.offset
+
+    def read_new(self):
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return b''
+        with f:
+            # Identité et taille lues sur le fichier ouvert: pas de course avec un remplacement
+            stat = os.fstat(f.fileno())
+            identity = (stat.st_dev, stat.st_ino)
+            if identity != self._identity or stat.st_size < self.offset:
+                # Nouveau fichier (rotation, remplacement) ou fichier tronqué: reprise au début
+                self._identity, self.offset, self._partial = identity, 0, b''
+            if stat.st_size == self.offset:
+                return b''
+            f.seek(self.offset)
+            chunk = f.read(min(stat.st_size - self.offset, self.max_bytes))
+        self.offset += len(chunk)
+        data = self._partial + chunk
+        cut = data.rfind(b'\n') + 1
+        self._partial = data[cut:]
+        return data[:cut]
+
+
+class TelemetryIngestor:
+    """Suit un fichier de télémétrie en tâche de fond et alimente les tampons circulaires"""
+
+    def __init__(self, path=DEFAULT_TELEMETRY_FILE, buffers=None, poll_interval=POLL_INTERVAL_SECONDS):
+        self.path = path
+        self.buffers = buffers if buffers is not None else RingBufferSet()
+        self.poll_interval = poll_interval
+        self.tailer = FileTailer(path)
+        self.last_receive = None
+        self.errors = 0
+        self._listeners = {}
+        # Ajout aux tampons et diffusion aux abonnés d'un même lot: indivisibles vis-à-vis de `subscribe`
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, name, callback, prime=None):
+        """Appelle `callback(batch)` à chaque lot reçu (un abonné par nom)
+
+        `prime(buffers)`, s'il est fourni, est appelé sur les tampons sous le
+        même verrou que l'abonnement: aucun lot n'est perdu ni vu deux fois
+        entre l'amorçage et le suivi.
+        """
+        with self._lock:
+            if prime is not None:
+                prime(self.buffers)
+            self._listeners[name] = callback
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='telemetry-ingestor', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def poll(self):
+        """Intègre les lignes arrivées depuis le dernier passage; renvoie le nombre d'échantillons"""
+        data = self.tailer.read_new()
+        if not data:
+            return 0
+        try:
+            batch = pd.read_csv(io.BytesIO(data), header=None, names=COLUMNS,
+                                dtype={'emitter_id': str}, on_bad_lines='skip')
+        except (ValueError, pd.errors.ParserError):
+            self.errors += 1
+            return 0
+        # Champ non numérique (ligne corrompue): la ligne est écartée, pas le lot
+        for column in NUMERIC_COLUMNS:
+            batch[column] = pd.to_numeric(batch[column], errors='coerce')
+        batch = batch.dropna()
+        if batch.empty:
+            return 0
+        with self._lock:
+            self.buffers.append(batch['emitter_id'].to_numpy(), batch['t'].to_numpy(),
+                                batch['qualite'].to_numpy(), batch['puissance'].to_numpy())
+            self.last_receive = time.time()
+            for callback in list(self._listeners.values()):
+                callback(batch)
+        return len(batch)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                received = self.poll()
+            except Exception:
+                # Un lot en échec ne doit pas arrêter l'ingestion (ni les alertes qui en dépendent)
+                self.errors += 1
+                logger.exception("Échec de l'intégration d'un lot de télémétrie (%s)", self.path)
+                self._stop.wait(self.poll_interval)
+                continue
+            if received == 0 and not self.tailer.pending:
+                self._stop.wait(self.poll_interval)
+
+
+_ingestors = {}
+_ingestors_lock = threading.Lock()
+
+
+def get_telemetry_ingestor(path=DEFAULT_TELEMETRY_FILE, capacity=DEFAULT_CAPACITY):
+    """Ingesteur démarré une seule fois par fichier pour tout le processus"""
+    with _ingestors_lock:
+        if path not in _ingestors:
+            _ingestors[path] = TelemetryIngestor(path, RingBufferSet(capacity=capacity)).start()
+        return _ingestors[path]
+
+
+def simulate(path, n_emitters=12, rate_hz=1.0, duration=None, seed=None):
+    """Agent local de substitution: écrit des mesures simulées dans le fichier de télémétrie"""
+    rng = np.random.default_rng(seed)
+    ids = np.array([f"FR_{i:03d}" for i in range(1, n_emitters + 1)])
+    quality = rng.uniform(70, 95, n_emitters)
+    power = rng.choice([100, 250, 500, 1000, 2000, 5000], n_emitters).astype(float)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    started = time.time()
+    with open(path, 'a') as f:
+        while duration is None or time.time() - started < duration:
+            quality = np.clip(quality + rng.normal(0, 1.5, n_emitters), 0, 100)
+            emitted = power * rng.uniform(0.9, 1.1, n_emitters)
+            now = time.time()
+            f.write(''.join(f"{now:.3f},{e},{q:.2f},{p:.1f}\n" for e, q, p in zip(ids, quality, emitted)))
+            f.flush()
+            time.sleep(1.0 / rate_hz)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Agent de télémétrie simulé pour Freedom Radio")
+    parser.add_argument('--file', default=DEFAULT_TELEMETRY_FILE, help="fichier de télémétrie à alimenter")
+    parser.add_argument('--emitters', type=int, default=12, help="nombre d'émetteurs simulés")
+    parser.add_argument('--rate', type=float, default=1.0, help="mesures par seconde et par émetteur")
+    parser.add_argument('--duration', type=float, default=None, help="durée en secondes (illimitée par défaut)")
+    args = parser.parse_args()
+    simulate(args.file, args.emitters, args.rate, args.duration)
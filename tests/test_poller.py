@@ -0,0 +1,75 @@
+# tests/test_poller.py
+"""Balayage des agents contre le serveur simulé (mock_agent.py)
+
+    python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_agent import MockAgentServer  # noqa: E402
+from poller import TelemetryPoller  # noqa: E402
+
+LATENCY = 0.1
+AGENTS = 200
+
+
+class SweepTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # Le mode debug d'asyncio (activé par unittest) fausserait les durées mesurées
+        asyncio.get_running_loop().set_debug(False)
+
+    async def start_agents(self, **options):
+        server = await MockAgentServer(port=0, seed=0, **options).start()
+        self.addCleanup(server.close)
+        return server
+
+    def poller(self, server, **options):
+        poller = TelemetryPoller(f"http://127.0.0.1:{server.port}/agents/{{id}}/status", **options)
+        self.addCleanup(poller.pool.close)
+        return poller
+
+    async def timed_sweep(self, poller, ids):
+        started = time.perf_counter()
+        result = await poller.sweep(ids)
+        return result, time.perf_counter() - started
+
+    async def test_sweep_takes_about_one_round_trip(self):
+        server = await self.start_agents(latency=LATENCY)
+        ids = [f"FR_{i:04d}" for i in range(AGENTS)]
+        result, elapsed = await self.timed_sweep(self.poller(server), ids)
+        self.assertEqual(result['emitter_id'].tolist(), ids)
+        self.assertTrue(result['erreur'].isna().all())
+        # Tous les agents en parallèle: un aller-retour, pas AGENTS
+        self.assertLess(elapsed, 3 * LATENCY)
+        self.assertEqual(server.requests, AGENTS)
+
+    async def test_slow_agents_time_out(self):
+        server = await self.start_agents(latency=1.0)
+        poller = self.poller(server, timeout=0.1, retries=0)
+        result, elapsed = await self.timed_sweep(poller, ['FR_001', 'FR_002'])
+        self.assertTrue(result['qualite'].isna().all())
+        self.assertTrue(result['erreur'].str.startswith('TimeoutError').all())
+        self.assertLess(elapsed, 0.5)
+
+    async def test_failed_requests_are_retried(self):
+        server = await self.start_agents(failure_rate=0.5)
+        poller = self.poller(server, retries=8, backoff=0.001)
+        result, _ = await self.timed_sweep(poller, [f"FR_{i:03d}" for i in range(50)])
+        self.assertTrue(result['erreur'].isna().all())
+        self.assertGreater(server.requests, 50)
+
+    async def test_sweep_deadline_caps_unresponsive_agents(self):
+        server = await self.start_agents(latency=10.0)
+        poller = self.poller(server, timeout=2.0, retries=2, deadline=0.3)
+        result, elapsed = await self.timed_sweep(poller, ['FR_001', 'FR_002'])
+        self.assertTrue((result['erreur'] == 'délai du balayage dépassé').all())
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
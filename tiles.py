@@ -0,0 +1,272 @@
+# tiles.py
+"""Pyramide de tuiles XYZ (PNG) de la carte de chaleur de couverture, servie en fichiers statiques
+
+Usage:
+    python tiles.py --max-zoom 14        # met à jour les tuiles de la flotte enregistrée par le dashboard
+"""
+import argparse
+import json
+import os
+import shutil
+import struct
+import threading
+import time
+import uuid
+import zlib
+
+import numpy as np
+
+from coverage import EARTH_RADIUS_KM, REUNION_BOUNDS, CoverageEngine
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+# Servi par Streamlit (server.enableStaticServing) sous /app/static/...
+DEFAULT_TILE_DIR = os.path.join(APP_DIR, 'static', 'tiles', 'coverage')
+STATIC_URL_PATH = 'app/static/tiles/coverage'
+MANIFEST_FILE = 'manifest.json'
+
+TILE_SIZE = 256
+MIN_ZOOM = 8
+MAX_ZOOM = 12
+# Version du rendu (échelle de couleurs, modèle): une autre version régénère toute la pyramide
+RENDER_VERSION = 1
+
+# Échelle Viridis (points d'ancrage), interpolée en 256 couleurs; signal nul transparent
+_VIRIDIS = np.array([(68, 1, 84), (72, 40, 120), (62, 74, 137), (49, 104, 142), (38, 130, 142),
+                     (31, 158, 137), (53, 183, 121), (109, 205, 89), (180, 222, 44), (253, 231, 37)])
+TILE_ALPHA = 170
+
+
+def _colormap():
+    positions = np.linspace(0, 255, len(_VIRIDIS))
+    lut = np.empty((256, 4), dtype=np.uint8)
+    for channel in range(3):
+        lut[:, channel] = np.rint(np.interp(np.arange(256), positions, _VIRIDIS[:, channel]))
+    lut[:, 3] = TILE_ALPHA
+    lut[0, 3] = 0
+    return lut
+
+
+COLORMAP = _colormap()
+
+
+def lon_to_x(lon, zoom):
+    """Abscisse de tuile (fractionnaire) d'une longitude, projection Web Mercator"""
+    return (np.asarray(lon, dtype=np.float64) + 180.0) / 360.0 * 2 ** zoom
+
+
+def lat_to_y(lat, zoom):
+    """Ordonnée de tuile (fractionnaire, croissante vers le sud) d'une latitude"""
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    return (1.0 - np.log(np.tan(phi) + 1.0 / np.cos(phi)) / np.pi) / 2.0 * 2 ** zoom
+
+
+def y_to_lat(y, zoom):
+    return np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * np.asarray(y, dtype=np.float64) / 2 ** zoom))))
+
+
+def tile_range(bounds, zoom):
+    """Tuiles (x0, x1, y0, y1), bornes incluses, qui couvrent une emprise (lat_min, lat_max, lon_min, lon_max)"""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    limit = 2 ** zoom - 1
+    x0, x1 = (int(np.clip(np.floor(lon_to_x(v, zoom)), 0, limit)) for v in (lon_min, lon_max))
+    y0, y1 = (int(np.clip(np.floor(lat_to_y(v, zoom)), 0, limit)) for v in (lat_max, lat_min))
+    return x0, x1, y0, y1
+
+
+def png_bytes(rgba):
+    """Encodage PNG (RGBA 8 bits, sans filtre) d'un tableau (hauteur, largeur, 4)"""
+    height, width, _ = rgba.shape
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, -1)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) + chunk(b'IEND', b''))
+
+
+class CoverageTilePyramid:
+    """Carte de chaleur de couverture découpée en tuiles XYZ sur disque
+
+    `manifest.json` garde, pour chaque émetteur rendu, sa position et son
+    rayon. À chaque mise à jour, seules les tuiles que recoupe l'ancienne
+    ou la nouvelle zone d'un émetteur ajouté, retiré ou modifié (statut
+    compris) sont recalculées; les autres restent telles quelles sur
+    disque. Le signal suit le modèle de la carte de chaleur (100 % au pied
+    de l'émetteur, 0 % au bord de la zone); une tuile sans signal n'est pas
+    écrite. Le numéro de révision, ajouté à l'URL des tuiles, invalide le
+    cache du navigateur après chaque régénération.
+    """
+
+    def __init__(self, root=DEFAULT_TILE_DIR, min_zoom=MIN_ZOOM, max_zoom=MAX_ZOOM, bounds=REUNION_BOUNDS,
+                 statuses=('Actif',)):
+        if not 0 <= min_zoom <= max_zoom <= 20:
+            raise ValueError(f"Niveaux de zoom invalides: {min_zoom}-{max_zoom}")
+        self.root = root
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.bounds = tuple(float(v) for v in bounds)
+        self.statuses = tuple(statuses)
+        self.engine = CoverageEngine()
+        self.revision = 0
+        self.rendered = 0  # tuiles recalculées lors de la dernière mise à jour
+        self._emitters = {}
+        self._lock = threading.Lock()
+        self._load_manifest()
+
+    @property
+    def settings(self):
+        return {'render': RENDER_VERSION, 'tile_size': TILE_SIZE, 'zooms': [self.min_zoom, self.max_zoom],
+                'bounds': list(self.bounds), 'statuses': list(self.statuses)}
+
+    def url_template(self, base_url=''):
+        """Gabarit d'URL Leaflet des tuiles servies par Streamlit"""
+        return f"{base_url.rstrip('/')}/{STATIC_URL_PATH}/{{z}}/{{x}}/{{y}}.png?v={self.revision}"
+
+    def tile_count(self):
+        total = 0
+        for zoom in range(self.min_zoom, self.max_zoom + 1):
+            x0, x1, y0, y1 = tile_range(self.bounds, zoom)
+            total += (x1 - x0 + 1) * (y1 - y0 + 1)
+        return total
+
+    def update(self, emitters):
+        """Met la pyramide en accord avec la flotte; renvoie le nombre de tuiles recalculées"""
+        current = _footprints(emitters, self.statuses)
+        with self._lock:
+            changed = {key for key in current.keys() | self._emitters.keys()
+                       if current.get(key) != self._emitters.get(key)}
+            if not changed:
+                self.rendered = 0
+                return 0
+            footprints = [self._emitters[key] for key in changed if key in self._emitters]
+            footprints += [current[key] for key in changed if key in current]
+
+            lat, lon, radii = (np.array([f[i] for f in current.values()], dtype=np.float64) for i in range(3))
+            boxes = _boxes(lat, lon, radii)
+            touched = self._touched_tiles(np.array(footprints, dtype=np.float64))
+            for zoom, x, y in touched:
+                self._render_tile(zoom, x, y, lat, lon, radii, boxes)
+
+            self._emitters = current
+            self.revision += 1
+            self.rendered = len(touched)
+            self._save_manifest()
+            return len(touched)
+
+    def _touched_tiles(self, footprints):
+        """Tuiles de la pyramide que recoupe le rectangle englobant d'au moins une zone"""
+        lat_lo, lat_hi, lon_lo, lon_hi = _boxes(*footprints.T)
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        inside = (lat_hi >= lat_min) & (lat_lo <= lat_max) & (lon_hi >= lon_min) & (lon_lo <= lon_max)
+        touched = []
+        for zoom in range(self.min_zoom, self.max_zoom + 1):
+            x0, x1, y0, y1 = tile_range(self.bounds, zoom)
+            marks = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=bool)
+            for i in np.flatnonzero(inside):
+                bx0, bx1, by0, by1 = tile_range((max(lat_lo[i], lat_min), min(lat_hi[i], lat_max),
+                                                 max(lon_lo[i], lon_min), min(lon_hi[i], lon_max)), zoom)
+                marks[by0 - y0:by1 - y0 + 1, bx0 - x0:bx1 - x0 + 1] = True
+            ys, xs = np.nonzero(marks)
+            touched += [(zoom, int(x + x0), int(y + y0)) for y, x in zip(ys, xs)]
+        return touched
+
+    def _render_tile(self, zoom, x, y, lat, lon, radii, boxes):
+        # Centres des pixels; latitudes croissantes pour le moteur, retournées ensuite (nord en haut)
+        pixels = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+        lons = (x + pixels) / 2 ** zoom * 360.0 - 180.0
+        lats = y_to_lat(y + pixels, zoom)[::-1]
+        lat_lo, lat_hi, lon_lo, lon_hi = boxes
+        near = (lat_hi >= lats[0]) & (lat_lo <= lats[-1]) & (lon_hi >= lons[0]) & (lon_lo <= lons[-1])
+
+        path = os.path.join(self.root, str(zoom), str(x), f"{y}.png")
+        signal = self.engine.compute_on(lats, lons, lat[near], lon[near], radii[near])[::-1]
+        if not (signal > 0).any():
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        levels = np.clip(np.ceil(signal * 2.55), 0, 255).astype(np.uint8)
+        _write_atomic(path, png_bytes(COLORMAP[levels]))
+
+    def _load_manifest(self):
+        path = os.path.join(self.root, MANIFEST_FILE)
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get('settings') != self.settings:
+            # Autre rendu ou autre pyramide: tout est à refaire
+            for name in os.listdir(self.root):
+                if name.isdigit():
+                    shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            self.revision = int(manifest.get('revision', 0))
+            return
+        self.revision = int(manifest.get('revision', 0))
+        self._emitters = {key: tuple(value) for key, value in manifest['emitters'].items()}
+
+    def _save_manifest(self):
+        manifest = {'settings': self.settings, 'revision': self.revision,
+                    'updated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'emitters': {key: list(value) for key, value in self._emitters.items()}}
+        _write_atomic(os.path.join(self.root, MANIFEST_FILE), json.dumps(manifest).encode())
+
+
+def _footprints(emitters, statuses):
+    """Zone rendue de chaque émetteur: (lat, lon, rayon), pour ceux qui émettent"""
+    subset = emitters[emitters['statut'].isin(statuses) & (emitters['couverture'] > 0)]
+    return {str(key): (float(lat), float(lon), float(radius)) for key, lat, lon, radius in zip(
+        subset['id'], subset['latitude'], subset['longitude'], subset['couverture'])}
+
+
+def _boxes(lat, lon, radii):
+    """Rectangles englobants (degrés) des zones de couverture"""
+    d_lat = np.degrees(radii / EARTH_RADIUS_KM)
+    d_lon = d_lat / np.maximum(np.cos(np.radians(np.abs(lat) + d_lat).clip(max=89.0)), 1e-6)
+    return lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+_pyramids = {}
+_pyramids_lock = threading.Lock()
+
+
+def get_tile_pyramid(root=DEFAULT_TILE_DIR):
+    """Pyramide unique par dossier pour tout le processus"""
+    with _pyramids_lock:
+        if root not in _pyramids:
+            _pyramids[root] = CoverageTilePyramid(root)
+        return _pyramids[root]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tuiles de la carte de chaleur de couverture Freedom Radio")
+    parser.add_argument('--output', default=DEFAULT_TILE_DIR, help="dossier de la pyramide")
+    parser.add_argument('--min-zoom', type=int, default=MIN_ZOOM)
+    parser.add_argument('--max-zoom', type=int, default=MAX_ZOOM)
+    args = parser.parse_args(argv)
+
+    # Table des émetteurs enregistrée par le dashboard, relue sans rien régénérer
+    from fleet_data import load_saved_emitters
+    try:
+        emitters = load_saved_emitters()
+        pyramid = CoverageTilePyramid(args.output, args.min_zoom, args.max_zoom)
+    except (FileNotFoundError, ValueError) as exc:
+        parser.error(str(exc))
+    started = time.perf_counter()
+    rendered = pyramid.update(emitters)
+    print(f"{rendered} tuile(s) recalculée(s) sur {pyramid.tile_count()} (révision {pyramid.revision}) "
+          f"dans {args.output} en {time.perf_counter() - started:.1f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())